@@ -17,8 +17,11 @@ from .admin import (
     EnrollmentTrend,
     DepartmentDistribution,
     CGPADistribution,
+    LatencyPercentiles,
     AIUsageStats,
-    DashboardData
+    DashboardData,
+    AttendanceRiskEntry,
+    AttendanceShortageReport
 )
 
 __all__ = [
@@ -35,6 +38,9 @@ __all__ = [
     "EnrollmentTrend",
     "DepartmentDistribution",
     "CGPADistribution",
+    "LatencyPercentiles",
     "AIUsageStats",
-    "DashboardData"
+    "DashboardData",
+    "AttendanceRiskEntry",
+    "AttendanceShortageReport"
 ]
@@ -140,6 +140,15 @@ class CGPADistribution(BaseModel):
     count: int
 
 
+class LatencyPercentiles(BaseModel):
+    """Latency summary for one agent stage or tool (milliseconds)"""
+    count: int
+    avg_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
 class AIUsageStats(BaseModel):
     """AI agent usage statistics"""
     total_queries: int
@@ -147,6 +156,14 @@ class AIUsageStats(BaseModel):
     most_asked_category: str
     average_response_time: float
     tool_usage: Dict[str, int]  # tool_name -> count
+    window_hours: Optional[int] = None  # Window the fields below cover
+    request_latency: Optional[LatencyPercentiles] = None
+    stage_latency: Dict[str, LatencyPercentiles] = {}  # intent/tool/retrieval/synthesis
+    tool_latency: Dict[str, LatencyPercentiles] = {}  # tool_name -> latency
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    llm_calls: int = 0
+    cache_hits: int = 0
     
 
 class DashboardData(BaseModel):
@@ -156,3 +173,36 @@ class DashboardData(BaseModel):
     department_distribution: List[DepartmentDistribution]
     cgpa_distribution: List[CGPADistribution]
     ai_usage: AIUsageStats
+
+
+class AttendanceRiskEntry(BaseModel):
+    """One student/subject pair below (or heading below) the attendance threshold"""
+    student_id: str
+    roll_number: Optional[str] = None
+    full_name: Optional[str] = None
+    department: Optional[str] = None
+    semester: Optional[int] = None
+    subject_id: str
+    subject_name: Optional[str] = None
+    subject_code: Optional[str] = None
+    attended: int
+    total_classes: int
+    percentage: float
+    classes_needed: int  # Consecutive classes to attend to reach the threshold
+    projected_percentage: float  # End of term at the recent attendance rate
+    max_achievable_percentage: Optional[float] = None  # Attending every remaining class
+    status: str  # "unrecoverable", "at_risk" or "recovering"
+
+
+class AttendanceShortageReport(BaseModel):
+    """Cohort-wide attendance shortage report"""
+    generated_at: str
+    department: Optional[str] = None
+    semester: Optional[int] = None
+    threshold: float
+    students_scanned: int
+    records_scanned: int
+    pairs_evaluated: int
+    students_at_risk: int
+    projection_available: bool  # False when the term end date is unknown
+    at_risk: List[AttendanceRiskEntry]
@@ -0,0 +1,255 @@
+"""
+Admission Control for Agent Requests
+Bounds concurrent agent work so a burst degrades into fast rejections
+instead of provider rate limits and timeouts.
+
+- Token buckets: per-student (or per-IP for anonymous users) request rates.
+- Concurrency gate: at most ADMISSION_MAX_CONCURRENT agent runs at once.
+  Extra requests wait in a priority queue - authenticated students ahead of
+  anonymous users, first come first served within each class.
+- Overload: rate-limited callers get 429, a full queue or a queue wait past
+  the deadline gets 503, both with a Retry-After estimate.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_STUDENT = 0
+PRIORITY_ANONYMOUS = 1
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is not admitted (maps to 429 or 503)"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: float):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def try_take(self) -> float:
+        """
+        Take one token if available.
+
+        Returns:
+            0.0 on success, otherwise seconds until a token is available
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate if self.rate > 0 else 60.0
+
+
+class RateLimiter:
+    """
+    Token buckets keyed by caller, with a bounded LRU so idle callers
+    don't accumulate forever.
+    """
+
+    def __init__(self, per_minute: float, burst: int, max_keys: int = 10000):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def check(self, key: str) -> float:
+        """Take a token for `key`; returns 0.0 or the seconds to wait."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.burst)
+            self._buckets[key] = bucket
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket.try_take()
+
+
+class AdmissionController:
+    """
+    Concurrency gate with a priority wait queue.
+
+    A released slot is handed directly to the best waiter, so queued
+    requests can't be overtaken by new arrivals.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queue: int,
+        max_anonymous_queue: int,
+        queue_timeout: float
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_anonymous_queue = max_anonymous_queue
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._queued = {PRIORITY_STUDENT: 0, PRIORITY_ANONYMOUS: 0}
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._avg_service = 2.0  # seconds, EWMA of time spent holding a slot
+        self.stats = {
+            "admitted": 0,
+            "queued": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0
+        }
+
+    def _queue_length(self) -> int:
+        return sum(self._queued.values())
+
+    def estimate_wait(self) -> float:
+        """Rough seconds until a newly queued request would be served."""
+        ahead = self._queue_length() + 1
+        return self._avg_service * ahead / self.max_concurrent
+
+    async def acquire(self, priority: int) -> None:
+        """
+        Wait for a slot.
+
+        Raises:
+            AdmissionRejected: Queue full or the wait exceeded queue_timeout
+        """
+        if self._active < self.max_concurrent and not self._queue_length():
+            self._active += 1
+            self.stats["admitted"] += 1
+            return
+
+        limit = self.max_anonymous_queue if priority == PRIORITY_ANONYMOUS else self.max_queue
+        if self._queue_length() >= self.max_queue or self._queued[priority] >= limit:
+            self.stats["rejected_queue_full"] += 1
+            raise AdmissionRejected(503, "Server is busy, please retry shortly", self.estimate_wait())
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._queued[priority] += 1
+        self.stats["queued"] += 1
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we gave up - pass it on
+                self._release_slot()
+            else:
+                future.cancel()
+                self._queued[priority] -= 1
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.stats["rejected_timeout"] += 1
+            raise AdmissionRejected(503, "Server is busy, please retry shortly", self.estimate_wait())
+
+        self.stats["admitted"] += 1
+
+    def _release_slot(self) -> None:
+        while self._waiters:
+            priority, _, future = heapq.heappop(self._waiters)
+            if future.cancelled():
+                continue
+            self._queued[priority] -= 1
+            future.set_result(None)
+            return
+        self._active -= 1
+
+    def release(self, held_seconds: float) -> None:
+        self._avg_service = 0.8 * self._avg_service + 0.2 * held_seconds
+        self._release_slot()
+
+    @asynccontextmanager
+    async def slot(self, priority: int):
+        """Hold one agent slot for the duration of the block."""
+        await self.acquire(priority)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "active": self._active,
+            "waiting": self._queue_length(),
+            "max_concurrent": self.max_concurrent,
+            "avg_service_seconds": round(self._avg_service, 3)
+        }
+
+
+class AgentAdmission:
+    """Rate limits plus the concurrency gate, as used by /ask."""
+
+    def __init__(self):
+        self.student_limiter = RateLimiter(
+            settings.STUDENT_RATE_LIMIT_PER_MINUTE, settings.STUDENT_RATE_LIMIT_BURST
+        )
+        self.anonymous_limiter = RateLimiter(
+            settings.ANON_RATE_LIMIT_PER_MINUTE, settings.ANON_RATE_LIMIT_BURST
+        )
+        self.gate = AdmissionController(
+            max_concurrent=settings.ADMISSION_MAX_CONCURRENT,
+            max_queue=settings.ADMISSION_MAX_QUEUE,
+            max_anonymous_queue=settings.ADMISSION_MAX_ANONYMOUS_QUEUE,
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS
+        )
+        self.rate_limited = 0
+
+    def check_rate(self, student_id: Optional[str], client_ip: Optional[str]) -> None:
+        """
+        Apply the caller's token bucket.
+
+        Raises:
+            AdmissionRejected: 429 when the caller is over its rate
+        """
+        if student_id:
+            wait = self.student_limiter.check(student_id)
+        else:
+            wait = self.anonymous_limiter.check(client_ip or "unknown")
+        if wait > 0:
+            self.rate_limited += 1
+            raise AdmissionRejected(429, "Too many questions, please slow down", wait)
+
+    def slot(self, student_id: Optional[str]):
+        return self.gate.slot(PRIORITY_STUDENT if student_id else PRIORITY_ANONYMOUS)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.gate.get_stats(), "rate_limited": self.rate_limited}
+
+
+_admission: Optional[AgentAdmission] = None
+
+
+def get_agent_admission() -> AgentAdmission:
+    """Get the process-wide admission controller."""
+    global _admission
+    if _admission is None:
+        _admission = AgentAdmission()
+    return _admission
@@ -0,0 +1,331 @@
+"""
+Agent Pipeline Metrics
+Stage-level latency and token accounting for SuperSmartAgent.
+
+Each /ask request gets a trace made of spans (intent analysis, each tool,
+retrieval, synthesis). Spans carry wall time, prompt/completion token
+counts and whether the LLM call was served from the prompt cache. Traces
+are written to the local SQLite store and aggregated into p50/p95/p99
+latencies per stage and per tool for the admin dashboard.
+"""
+
+import asyncio
+import contextvars
+import logging
+import math
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from local_store import LocalStore, get_local_store
+
+logger = logging.getLogger(__name__)
+
+STAGE_INTENT = "intent"
+STAGE_TOOL = "tool"
+STAGE_RETRIEVAL = "retrieval"
+STAGE_SYNTHESIS = "synthesis"
+
+# Tool name keyword -> dashboard category
+TOOL_CATEGORIES = [
+    ("attendance", "Attendance"),
+    ("marks", "Marks"),
+    ("cgpa", "Marks"),
+    ("rank", "Marks"),
+    ("fee", "Fees"),
+    ("timetable", "Timetable"),
+    ("class", "Timetable"),
+    ("book", "Library"),
+    ("loan", "Library"),
+    ("event", "Events"),
+    ("knowledge", "General Knowledge"),
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS agent_requests (
+    request_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    user_type TEXT NOT NULL,
+    duration_ms REAL NOT NULL,
+    success INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS agent_spans (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    request_id TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    name TEXT,
+    duration_ms REAL NOT NULL,
+    prompt_tokens INTEGER,
+    completion_tokens INTEGER,
+    cache_hit INTEGER NOT NULL DEFAULT 0,
+    success INTEGER NOT NULL DEFAULT 1
+);
+
+CREATE INDEX IF NOT EXISTS idx_agent_requests_created ON agent_requests(created_at);
+CREATE INDEX IF NOT EXISTS idx_agent_spans_created ON agent_spans(created_at, stage);
+"""
+
+
+class RequestTrace:
+    """Spans collected for one agent request"""
+
+    def __init__(self, user_type: str):
+        self.request_id = str(uuid.uuid4())
+        self.user_type = user_type
+        self.created_at = datetime.utcnow()
+        self.started = time.perf_counter()
+        self.duration_ms = 0.0
+        self.success = True
+        self.spans: List[Dict[str, Any]] = []
+        self.active_span: Optional[Dict[str, Any]] = None
+
+
+_current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar(
+    "agent_trace", default=None
+)
+
+
+def start_trace(user_type: str) -> RequestTrace:
+    """Begin a trace for the current request (bound to the running task)."""
+    trace = RequestTrace(user_type)
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def span(stage: str, name: Optional[str] = None):
+    """
+    Time one pipeline stage of the current trace.
+
+    Yields the span dict so callers can attach token counts. A no-op
+    (but still yields a dict) when no trace is active.
+    """
+    trace = _current_trace.get()
+    record = {
+        "stage": stage,
+        "name": name,
+        "duration_ms": 0.0,
+        "prompt_tokens": None,
+        "completion_tokens": None,
+        "cache_hit": False,
+        "success": True
+    }
+    previous = trace.active_span if trace else None
+    if trace:
+        trace.active_span = record
+    started = time.perf_counter()
+    try:
+        yield record
+    except Exception:
+        record["success"] = False
+        raise
+    finally:
+        record["duration_ms"] = (time.perf_counter() - started) * 1000
+        if trace:
+            trace.active_span = previous
+            trace.spans.append(record)
+
+
+def mark_cache_hit() -> None:
+    """Flag the active span as served from the prompt cache / a shared call."""
+    trace = _current_trace.get()
+    if trace and trace.active_span is not None:
+        trace.active_span["cache_hit"] = True
+
+
+def record_token_usage(record: Dict[str, Any], response: Any, prompt: str) -> None:
+    """
+    Attach prompt/completion token counts to a span.
+
+    Uses Gemini's usage_metadata when present, otherwise estimates at
+    roughly four characters per token. Spans served from the cache or a
+    shared call record zero tokens, since no model call was billed.
+    """
+    if record.get("cache_hit"):
+        record["prompt_tokens"] = 0
+        record["completion_tokens"] = 0
+        return
+
+    usage = None
+    raw = getattr(response, "raw", None)
+    if isinstance(raw, dict):
+        usage = raw.get("usage_metadata")
+
+    if usage:
+        record["prompt_tokens"] = usage.get("prompt_token_count")
+        record["completion_tokens"] = usage.get("candidates_token_count")
+    else:
+        record["prompt_tokens"] = len(prompt) // 4
+        record["completion_tokens"] = len(str(response)) // 4
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize_latencies(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "avg_ms": round(sum(ordered) / len(ordered), 2) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50), 2),
+        "p95_ms": round(percentile(ordered, 95), 2),
+        "p99_ms": round(percentile(ordered, 99), 2)
+    }
+
+
+def tool_category(tool_name: str) -> str:
+    lowered = tool_name.lower()
+    for keyword, category in TOOL_CATEGORIES:
+        if keyword in lowered:
+            return category
+    return "Other"
+
+
+class AgentMetricsStore:
+    """
+    Persists request traces in the local store and computes aggregates.
+    """
+
+    def __init__(self, store: LocalStore):
+        self.store = store
+        self.store.executescript(SCHEMA)
+
+    def record_trace(self, trace: RequestTrace) -> None:
+        created = trace.created_at.isoformat()
+        self.store.execute(
+            "INSERT INTO agent_requests (request_id, created_at, user_type, duration_ms, success) VALUES (?, ?, ?, ?, ?)",
+            (trace.request_id, created, trace.user_type, trace.duration_ms, int(trace.success))
+        )
+        self.store.executemany(
+            """INSERT INTO agent_spans
+               (request_id, created_at, stage, name, duration_ms, prompt_tokens, completion_tokens, cache_hit, success)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            [
+                (
+                    trace.request_id, created, s["stage"], s["name"], s["duration_ms"],
+                    s["prompt_tokens"], s["completion_tokens"], int(s["cache_hit"]), int(s["success"])
+                )
+                for s in trace.spans
+            ]
+        )
+
+    def prune(self, retention_days: int) -> None:
+        """Delete traces older than the retention window."""
+        cutoff = (datetime.utcnow() - timedelta(days=retention_days)).isoformat()
+        self.store.execute("DELETE FROM agent_spans WHERE created_at < ?", (cutoff,))
+        self.store.execute("DELETE FROM agent_requests WHERE created_at < ?", (cutoff,))
+
+    def get_usage_stats(self, window_hours: int = 24) -> Dict[str, Any]:
+        """
+        Aggregate traces for the dashboard.
+
+        Args:
+            window_hours: Latency/token aggregates cover this many recent hours
+
+        Returns:
+            Dictionary matching the AIUsageStats model
+        """
+        since = (datetime.utcnow() - timedelta(hours=window_hours)).isoformat()
+        today = datetime.utcnow().date().isoformat()
+
+        total = self.store.fetchone("SELECT COUNT(*) AS n FROM agent_requests")["n"]
+        queries_today = self.store.fetchone(
+            "SELECT COUNT(*) AS n FROM agent_requests WHERE created_at >= ?", (today,)
+        )["n"]
+
+        requests = self.store.fetchall(
+            "SELECT duration_ms FROM agent_requests WHERE created_at >= ?", (since,)
+        )
+        spans = self.store.fetchall(
+            """SELECT stage, name, duration_ms, prompt_tokens, completion_tokens, cache_hit
+               FROM agent_spans WHERE created_at >= ?""",
+            (since,)
+        )
+
+        stage_values: Dict[str, List[float]] = {}
+        tool_values: Dict[str, List[float]] = {}
+        prompt_tokens = 0
+        completion_tokens = 0
+        cache_hits = 0
+        llm_calls = 0
+
+        for s in spans:
+            stage_values.setdefault(s["stage"], []).append(s["duration_ms"])
+            if s["stage"] == STAGE_TOOL and s["name"]:
+                tool_values.setdefault(s["name"], []).append(s["duration_ms"])
+            if s["stage"] in (STAGE_INTENT, STAGE_SYNTHESIS):
+                llm_calls += 1
+                cache_hits += s["cache_hit"]
+                prompt_tokens += s["prompt_tokens"] or 0
+                completion_tokens += s["completion_tokens"] or 0
+
+        tool_usage = {name: len(values) for name, values in tool_values.items()}
+        category_counts: Dict[str, int] = {}
+        for name, count in tool_usage.items():
+            category = tool_category(name)
+            category_counts[category] = category_counts.get(category, 0) + count
+
+        request_latency = summarize_latencies([r["duration_ms"] for r in requests])
+
+        return {
+            "total_queries": total,
+            "queries_today": queries_today,
+            "most_asked_category": max(category_counts, key=category_counts.get) if category_counts else "N/A",
+            "average_response_time": round(request_latency["avg_ms"] / 1000, 3),
+            "tool_usage": tool_usage,
+            "window_hours": window_hours,
+            "request_latency": request_latency,
+            "stage_latency": {stage: summarize_latencies(v) for stage, v in stage_values.items()},
+            "tool_latency": {name: summarize_latencies(v) for name, v in tool_values.items()},
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "llm_calls": llm_calls,
+            "cache_hits": cache_hits
+        }
+
+
+_metrics_store: Optional[AgentMetricsStore] = None
+
+
+def get_metrics_store() -> AgentMetricsStore:
+    """Get the process-wide agent metrics store."""
+    global _metrics_store
+    if _metrics_store is None:
+        _metrics_store = AgentMetricsStore(get_local_store())
+    return _metrics_store
+
+
+def finish_trace(trace: RequestTrace, success: bool = True) -> None:
+    """
+    Close a trace and persist it without blocking the event loop.
+    """
+    trace.duration_ms = (time.perf_counter() - trace.started) * 1000
+    trace.success = success
+    _current_trace.set(None)
+
+    store = get_metrics_store()
+    try:
+        loop = asyncio.get_running_loop()
+        loop.run_in_executor(None, _safe_record, store, trace)
+    except RuntimeError:
+        _safe_record(store, trace)
+
+
+def _safe_record(store: AgentMetricsStore, trace: RequestTrace) -> None:
+    try:
+        store.record_trace(trace)
+    except Exception as e:
+        logger.error(f"Failed to record agent trace: {str(e)}")
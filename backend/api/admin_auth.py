@@ -5,11 +5,13 @@ Handles admin login, registration, and permission management
 
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import Dict
-import bcrypt
+from typing import Dict, Optional, Tuple
 import jwt
+import threading
+import time
 from datetime import datetime, timedelta
 from database import get_supabase_admin
+from auth import hash_password_async, verify_password_async
 from admin_models.admin import (
     AdminCreate, AdminLogin, AdminResponse, AdminToken,
     AdminUpdate, AdminRole, AdminPermissions
@@ -20,16 +22,6 @@ router = APIRouter(prefix="/admin", tags=["Admin"])
 security = HTTPBearer()
 
 
-def hash_password(password: str) -> str:
-    """Hash password with bcrypt"""
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
-
-
-def verify_password(password: str, hashed: str) -> bool:
-    """Verify password against hash"""
-    return bcrypt.checkpw(password.encode(), hashed.encode())
-
-
 def create_admin_token(admin_id: str, email: str, role: str) -> str:
     """Create JWT token for admin"""
     payload = {
@@ -58,21 +50,55 @@ async def verify_admin_token(credentials: HTTPAuthorizationCredentials = Depends
         raise HTTPException(status_code=401, detail="Invalid token")
 
 
+# Admin rows (without password_hash) by id, so guarded calls skip the
+# admin_users lookup. Entries expire after ADMIN_CACHE_TTL_SECONDS and are
+# replaced whenever this module writes the row.
+_admin_cache: Dict[str, Tuple[float, Dict]] = {}
+_admin_cache_lock = threading.Lock()
+
+
+def _cache_admin(admin_info: Dict) -> None:
+    row = {k: v for k, v in admin_info.items() if k != "password_hash"}
+    with _admin_cache_lock:
+        _admin_cache[row["id"]] = (time.monotonic(), row)
+
+
+def get_admin_record(admin_id: str) -> Optional[Dict]:
+    """Get an admin's row (role, permissions, profile), cached per admin id"""
+    with _admin_cache_lock:
+        entry = _admin_cache.get(admin_id)
+    if entry is not None and time.monotonic() - entry[0] < settings.ADMIN_CACHE_TTL_SECONDS:
+        return dict(entry[1])
+    
+    supabase = get_supabase_admin()
+    admin = supabase.table("admin_users").select("*").eq("id", admin_id).execute()
+    if not admin.data:
+        invalidate_admin_cache(admin_id)
+        return None
+    
+    _cache_admin(admin.data[0])
+    return {k: v for k, v in admin.data[0].items() if k != "password_hash"}
+
+
+def invalidate_admin_cache(admin_id: Optional[str] = None) -> None:
+    """Drop one admin's cached row (or all of them) after it changes"""
+    with _admin_cache_lock:
+        if admin_id is None:
+            _admin_cache.clear()
+        else:
+            _admin_cache.pop(admin_id, None)
+
+
 async def check_permission(
     permission: str,
     admin_data: Dict = Depends(verify_admin_token)
 ) -> Dict:
     """Check if admin has specific permission"""
-    supabase = get_supabase_admin()
-    
-    # Fetch admin permissions
-    admin = supabase.table("admin_users").select("*").eq("id", admin_data["admin_id"]).execute()
+    admin_info = get_admin_record(admin_data["admin_id"])
     
-    if not admin.data:
+    if not admin_info:
         raise HTTPException(status_code=404, detail="Admin not found")
     
-    admin_info = admin.data[0]
-    
     # Super admin has all permissions
     if admin_info["role"] == "super_admin":
         return admin_info
@@ -144,7 +170,7 @@ async def register_admin(admin_data: AdminCreate):
             permissions = admin_data.permissions
         
         # Hash password
-        password_hash = hash_password(admin_data.password)
+        password_hash = await hash_password_async(admin_data.password)
         
         # Create admin
         result = supabase.table("admin_users").insert({
@@ -187,7 +213,7 @@ async def admin_login(credentials: AdminLogin):
             raise HTTPException(status_code=403, detail="Account is deactivated")
         
         # Verify password
-        if not verify_password(credentials.password, admin_data["password_hash"]):
+        if not await verify_password_async(credentials.password, admin_data["password_hash"]):
             raise HTTPException(status_code=401, detail="Invalid credentials")
         
         # Generate token
@@ -199,6 +225,7 @@ async def admin_login(credentials: AdminLogin):
         
         # Remove password hash from response
         admin_data.pop("password_hash")
+        _cache_admin(admin_data)
         
         return AdminToken(
             access_token=token,
@@ -216,16 +243,11 @@ async def get_current_admin(admin_data: Dict = Depends(verify_admin_token)):
     """
     Get current admin user info
     """
-    supabase = get_supabase_admin()
+    admin_info = get_admin_record(admin_data["admin_id"])
     
-    admin = supabase.table("admin_users").select("*").eq("id", admin_data["admin_id"]).execute()
-    
-    if not admin.data:
+    if not admin_info:
         raise HTTPException(status_code=404, detail="Admin not found")
     
-    admin_info = admin.data[0]
-    admin_info.pop("password_hash", None)
-    
     return AdminResponse(**admin_info)
 
 
@@ -250,6 +272,7 @@ async def update_admin_profile(
     updates["updated_at"] = datetime.utcnow().isoformat()
     
     # Update admin
+    invalidate_admin_cache(admin_data["admin_id"])
     result = supabase.table("admin_users").update(updates).eq("id", admin_data["admin_id"]).execute()
     
     if not result.data:
@@ -257,6 +280,7 @@ async def update_admin_profile(
     
     admin_info = result.data[0]
     admin_info.pop("password_hash", None)
+    _cache_admin(admin_info)
     
     return AdminResponse(**admin_info)
 
@@ -266,14 +290,12 @@ async def get_admin_permissions(admin_data: Dict = Depends(verify_admin_token))
     """
     Get current admin permissions
     """
-    supabase = get_supabase_admin()
-    
-    admin = supabase.table("admin_users").select("role, permissions").eq("id", admin_data["admin_id"]).execute()
+    admin_info = get_admin_record(admin_data["admin_id"])
     
-    if not admin.data:
+    if not admin_info:
         raise HTTPException(status_code=404, detail="Admin not found")
     
     return {
-        "role": admin.data[0]["role"],
-        "permissions": admin.data[0]["permissions"]
+        "role": admin_info["role"],
+        "permissions": admin_info["permissions"]
     }
@@ -3,10 +3,13 @@ Admin Dashboard API
 Provides analytics and statistics for admin panel
 """
 
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException
 from typing import Dict, List
 from database import get_supabase_admin
 from api.admin_auth import verify_admin_token
+from agent_metrics import get_metrics_store
+from batch.attendance_shortage import count_students_below
 from admin_models.admin import (
     DashboardData, DashboardStats, EnrollmentTrend,
     DepartmentDistribution, CGPADistribution, AIUsageStats
@@ -72,20 +75,11 @@ async def get_dashboard_stats(admin_data: Dict = Depends(verify_admin_token)):
         attendance_summary = supabase.table("attendance").select("student_id, status").execute()
         students_with_shortage = 0
         if attendance_summary.data:
-            student_attendance = {}
-            for record in attendance_summary.data:
-                sid = record["student_id"]
-                if sid not in student_attendance:
-                    student_attendance[sid] = {"present": 0, "total": 0}
-                student_attendance[sid]["total"] += 1
-                if record["status"] == "present":
-                    student_attendance[sid]["present"] += 1
-            
-            for sid, data in student_attendance.items():
-                if data["total"] > 0:
-                    percentage = (data["present"] / data["total"]) * 100
-                    if percentage < 75:
-                        students_with_shortage += 1
+            students_with_shortage = count_students_below(
+                (a["student_id"] for a in attendance_summary.data),
+                (a["status"] == "present" for a in attendance_summary.data),
+                threshold=75
+            )
         
         return DashboardStats(
             total_students=total_students,
@@ -219,27 +213,21 @@ async def get_cgpa_distribution(admin_data: Dict = Depends(verify_admin_token)):
 
 
 @router.get("/ai-usage", response_model=AIUsageStats)
-async def get_ai_usage_stats(admin_data: Dict = Depends(verify_admin_token)):
+async def get_ai_usage_stats(admin_data: Dict = Depends(verify_admin_token), window_hours: int = 24):
     """
     Get AI agent usage statistics
-    (Mock data for now - implement actual tracking later)
-    """
-    # TODO: Implement actual AI usage tracking
-    # This would require logging AI queries to database
     
-    return AIUsageStats(
-        total_queries=1250,
-        queries_today=47,
-        most_asked_category="Attendance",
-        average_response_time=1.2,
-        tool_usage={
-            "get_student_attendance": 450,
-            "get_student_marks": 320,
-            "search_knowledge_base": 280,
-            "get_student_fees": 150,
-            "get_upcoming_events": 50
-        }
-    )
+    Counts, per-stage and per-tool p50/p95/p99 latency and token totals
+    come from the agent's request traces over the last window_hours.
+    """
+    try:
+        # SQLite aggregation - keep it off the event loop
+        stats = await asyncio.to_thread(
+            get_metrics_store().get_usage_stats, window_hours=max(1, min(window_hours, 24 * 30))
+        )
+        return AIUsageStats(**stats)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("", response_model=DashboardData)
@@ -0,0 +1,109 @@
+"""
+Admin Reports API
+Cohort-wide batch reports for the admin panel
+"""
+
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Dict, Optional
+from api.admin_auth import verify_admin_token
+from admin_models.admin import AttendanceShortageReport
+from batch.attendance_shortage import build_shortage_report, get_report_store
+from batch.fee_clearance import build_clearance, iter_clearance_rows, stream_csv, stream_json
+from batch.scheduler import get_scheduler
+
+router = APIRouter(prefix="/admin/reports", tags=["Admin Reports"])
+
+SHORTAGE_JOB = "attendance_shortage"
+
+
+@router.get("/attendance-shortage", response_model=AttendanceShortageReport)
+async def get_attendance_shortage(
+    department: Optional[str] = None,
+    semester: Optional[int] = None,
+    threshold: Optional[float] = Query(None, gt=0, lt=100),
+    remaining_weeks: Optional[float] = Query(None, ge=0),
+    limit: int = Query(500, ge=1, le=100000),
+    admin_data: Dict = Depends(verify_admin_token)
+):
+    """
+    Compute the at-risk attendance list for a cohort now
+    """
+    try:
+        return await asyncio.to_thread(
+            build_shortage_report, department, semester, threshold, remaining_weeks, limit
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/attendance-shortage/latest", response_model=AttendanceShortageReport)
+async def get_latest_attendance_shortage(
+    department: Optional[str] = None,
+    semester: Optional[int] = None,
+    admin_data: Dict = Depends(verify_admin_token)
+):
+    """
+    Latest stored report for a cohort (stored by the scheduled job, at most 500 entries)
+    """
+    report = await asyncio.to_thread(get_report_store().latest, department, semester)
+    if not report:
+        raise HTTPException(
+            status_code=404,
+            detail="No stored attendance shortage report for this cohort yet; "
+                   "run the job (POST /attendance-shortage/run) or query /attendance-shortage"
+        )
+    return report
+
+
+@router.post("/attendance-shortage/run", response_model=AttendanceShortageReport)
+async def run_attendance_shortage(admin_data: Dict = Depends(verify_admin_token)):
+    """
+    Run the scheduled campus-wide report immediately and store it
+    """
+    scheduler = get_scheduler()
+    if SHORTAGE_JOB not in scheduler.jobs:
+        raise HTTPException(status_code=503, detail="Attendance shortage job is not registered")
+    report = await scheduler.run_now(SHORTAGE_JOB)
+    if report is None:
+        raise HTTPException(
+            status_code=409,
+            detail=scheduler.jobs[SHORTAGE_JOB].last_error or "Report is already being generated"
+        )
+    return report
+
+
+@router.get("/fee-clearance")
+async def get_fee_clearance(
+    department: Optional[str] = None,
+    semester: Optional[int] = None,
+    format: str = Query("json", pattern="^(json|csv)$"),
+    only_blocked: bool = False,
+    admin_data: Dict = Depends(verify_admin_token)
+):
+    """
+    Exam fee clearance for every student in a cohort, streamed as JSON or CSV
+    """
+    try:
+        clearance = await asyncio.to_thread(build_clearance, department, semester)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    rows = iter_clearance_rows(clearance, only_blocked=only_blocked)
+    scope = "-".join(str(part) for part in (department, semester) if part) or "all"
+    if format == "csv":
+        return StreamingResponse(
+            stream_csv(rows),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="fee-clearance-{scope}.csv"'}
+        )
+    return StreamingResponse(stream_json(clearance["summary"], rows), media_type="application/json")
+
+
+@router.get("/jobs")
+async def get_job_status(admin_data: Dict = Depends(verify_admin_token)):
+    """
+    Status of the background batch jobs
+    """
+    return get_scheduler().status()
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime, date
 from database import get_supabase_admin
 from auth import get_current_user
+from tools.timetable_index import invalidate_timetable_index, time_to_seconds
+from tools.event_index import invalidate_event_index
+from tools.events_feed import invalidate_events_feed
+from tools.timetable_conflicts import (
+    find_conflicts, find_free_rooms, load_timetable_entries, normalize_new_entries
+)
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -63,6 +69,9 @@ class PaymentRecord(BaseModel):
     amount: float
     payment_date: date
     payment_method: Optional[str] = "cash"
+    transaction_id: Optional[str] = None
+    remarks: Optional[str] = None
+    idempotency_key: Optional[str] = None  # Retries with the same key are recorded once
 
 class SubjectCreate(BaseModel):
     subject_name: str
@@ -93,6 +102,16 @@ class LoanCreate(BaseModel):
     book_id: str
     due_date: date
 
+class TimetableEntryCreate(BaseModel):
+    subject_id: str
+    semester: int
+    day_of_week: int = Field(..., ge=0, le=6)  # 0=Sunday, 1=Monday, etc.
+    start_time: str  # HH:MM or HH:MM:SS
+    end_time: str
+    room_number: Optional[str] = None
+    session_type: str = 'lecture'  # lecture, lab, tutorial, practical
+    institution_id: Optional[str] = None
+
 
 # ================== Student Management ==================
 
@@ -403,34 +422,51 @@ async def create_fee(fee: FeeCreate):
     response = supabase.table('fees').insert(fee_data).execute()
     return {"fee": response.data[0]}
 
+PAYMENT_ERROR_STATUS = {
+    "fee_not_found": 404,
+    "invalid_amount": 400,
+    "invalid_method": 400,
+    "key_conflict": 409,
+    "duplicate_transaction": 409,
+}
+
 @router.post("/fees/{fee_id}/payment")
-async def record_payment(fee_id: str, payment: PaymentRecord):
-    """Record fee payment"""
-    supabase = get_supabase_admin()
-    
-    # Get current fee
-    fee_response = supabase.table('fees').select('*').eq('id', fee_id).execute()
-    if not fee_response.data:
-        raise HTTPException(status_code=404, detail="Fee record not found")
-    
-    fee = fee_response.data[0]
-    new_paid_amount = fee.get('amount_paid', 0) + payment.amount
-    
-    # Determine new status
-    if new_paid_amount >= fee['total_amount']:
-        new_status = 'paid'
-    elif new_paid_amount > 0:
-        new_status = 'partial'
-    else:
-        new_status = 'overdue'
-    
-    # Update fee
-    update_response = supabase.table('fees').update({
-        'amount_paid': new_paid_amount,
-        'payment_status': new_status
-    }).eq('id', fee_id).execute()
+async def record_payment(
+    fee_id: str,
+    payment: PaymentRecord,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """
+    Record fee payment.
+
+    The increment, the fee_transactions row and the payment_status update
+    happen in one server-side transaction (migrations/fee_payment_rpc.sql).
+    A repeated idempotency key (body field or Idempotency-Key header)
+    returns the original payment instead of counting it again.
+    """
+    supabase = get_supabase_admin()
+    
+    result = supabase.rpc('record_fee_payment', {
+        'p_fee_id': fee_id,
+        'p_amount': payment.amount,
+        'p_idempotency_key': payment.idempotency_key or idempotency_key,
+        'p_payment_method': payment.payment_method,
+        'p_payment_date': str(payment.payment_date),
+        'p_transaction_id': payment.transaction_id,
+        'p_remarks': payment.remarks,
+    }).execute().data or {}
+    
+    if not result.get('success'):
+        raise HTTPException(
+            status_code=PAYMENT_ERROR_STATUS.get(result.get('code'), 400),
+            detail=result.get('message', 'Payment could not be recorded')
+        )
     
-    return {"fee": update_response.data[0]}
+    return {
+        "fee": result['fee'],
+        "transaction": result['transaction'],
+        "duplicate": result.get('status') == 'duplicate'
+    }
 
 @router.delete("/fees/{fee_id}")
 async def delete_fee(fee_id: str):
@@ -481,6 +517,9 @@ async def update_subject(subject_id: str, subject: SubjectCreate):
     if not response.data:
         raise HTTPException(status_code=404, detail="Subject not found")
     
+    # Indexed timetable entries embed the subject (and may change semester)
+    invalidate_timetable_index()
+    
     return {"subject": response.data[0]}
 
 @router.delete("/subjects/{subject_id}")
@@ -493,9 +532,119 @@ async def delete_subject(subject_id: str):
     if not response.data:
         raise HTTPException(status_code=404, detail="Subject not found")
     
+    invalidate_timetable_index()
+    
     return {"message": "Subject deleted successfully"}
 
 
+# ================== Timetable Management ==================
+
+def _timetable_rows(entries: List[TimetableEntryCreate]) -> List[dict]:
+    """Validate time ranges and build insert payloads"""
+    rows = []
+    for position, entry in enumerate(entries):
+        try:
+            valid = time_to_seconds(entry.end_time) > time_to_seconds(entry.start_time)
+        except (ValueError, IndexError):
+            valid = False
+        if not valid:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Entry {position}: invalid time range {entry.start_time}-{entry.end_time}"
+            )
+        rows.append(entry.dict(exclude_none=True))
+    return rows
+
+def _write_timetable(rows: List[dict], allow_conflicts: bool, dry_run: bool = False) -> dict:
+    """Check rows against the stored timetable (and each other), then insert them"""
+    conflicts = find_conflicts(load_timetable_entries(), normalize_new_entries(rows))
+    total_conflicts = len(conflicts['room']) + len(conflicts['instructor'])
+    
+    if dry_run:
+        return {"count": 0, "timetable": [], "conflicts": conflicts}
+    if total_conflicts and not allow_conflicts:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": f"{total_conflicts} timetable clash(es) found", "conflicts": conflicts}
+        )
+    
+    supabase = get_supabase_admin()
+    response = supabase.table('timetable').insert(rows).execute()
+    for semester in {row['semester'] for row in rows}:
+        invalidate_timetable_index(semester)
+    
+    return {"count": len(response.data), "timetable": response.data, "conflicts": conflicts}
+
+@router.get("/timetable")
+async def get_timetable_entries(semester: Optional[int] = None, day_of_week: Optional[int] = None):
+    """Get timetable entries with optional filters"""
+    supabase = get_supabase_admin()
+    
+    query = supabase.table('timetable').select('*, subjects(subject_name, subject_code, instructor_name)')
+    
+    if semester:
+        query = query.eq('semester', semester)
+    if day_of_week is not None:
+        query = query.eq('day_of_week', day_of_week)
+    
+    response = query.order('day_of_week').order('start_time').execute()
+    return {"timetable": response.data}
+
+@router.post("/timetable")
+async def create_timetable_entry(entry: TimetableEntryCreate, allow_conflicts: bool = False):
+    """Create a timetable entry (409 if it clashes on room or instructor)"""
+    result = _write_timetable(_timetable_rows([entry]), allow_conflicts)
+    return {"timetable": result['timetable'][0], "conflicts": result['conflicts']}
+
+@router.post("/timetable/bulk")
+async def create_bulk_timetable(
+    entries: List[TimetableEntryCreate],
+    allow_conflicts: bool = False,
+    dry_run: bool = False
+):
+    """Import many timetable entries (e.g. a term) after clash-checking the whole batch"""
+    return _write_timetable(_timetable_rows(entries), allow_conflicts, dry_run)
+
+@router.delete("/timetable/{entry_id}")
+async def delete_timetable_entry(entry_id: str):
+    """Delete timetable entry"""
+    supabase = get_supabase_admin()
+    
+    response = supabase.table('timetable').delete().eq('id', entry_id).execute()
+    
+    if not response.data:
+        raise HTTPException(status_code=404, detail="Timetable entry not found")
+    
+    invalidate_timetable_index(response.data[0].get('semester'))
+    return {"message": "Timetable entry deleted successfully"}
+
+@router.get("/timetable/conflicts")
+async def get_timetable_conflicts():
+    """Report every room and instructor clash in the stored timetable"""
+    conflicts = find_conflicts(load_timetable_entries())
+    return {
+        "room_conflicts": conflicts['room'],
+        "instructor_conflicts": conflicts['instructor'],
+        "total_conflicts": len(conflicts['room']) + len(conflicts['instructor'])
+    }
+
+@router.get("/timetable/free-rooms")
+async def get_free_rooms(
+    day_of_week: int = Query(..., ge=0, le=6),
+    start_time: str = Query(...),
+    end_time: str = Query(...)
+):
+    """Rooms (among those used in the timetable) free for the whole slot"""
+    try:
+        if time_to_seconds(end_time) <= time_to_seconds(start_time):
+            raise ValueError
+    except (ValueError, IndexError):
+        raise HTTPException(status_code=400, detail=f"Invalid time range {start_time}-{end_time}")
+    
+    rooms = find_free_rooms(load_timetable_entries(), day_of_week, start_time, end_time)
+    return {"day_of_week": day_of_week, "start_time": start_time, "end_time": end_time, **rooms}
+
+
 # ================== Event Management ==================
 
 @router.get("/events")
@@ -503,25 +652,18 @@ async def get_all_events(event_type: Optional[str] = None):
     """Get all events with participant counts"""
     supabase = get_supabase_admin()
     
-    # Get events with participant count
-    query = supabase.table('events').select('*, event_participation(count)').order('start_date', desc=True)
+    # registered_count is maintained on the event row, no per-event count needed
+    query = supabase.table('events').select('*').order('start_date', desc=True)
     
     if event_type:
         query = query.eq('event_type', event_type)
     
     response = query.execute()
     
-    # Process data to add registered_count
     events = []
     for event in response.data:
-        # Extract participant count from the nested query result
-        participant_data = event.get('event_participation', [])
-        registered_count = participant_data[0].get('count', 0) if participant_data else 0
-        
-        # Remove the nested event_participation and add registered_count
-        event_copy = {k: v for k, v in event.items() if k != 'event_participation'}
-        event_copy['registered_count'] = registered_count
-        events.append(event_copy)
+        event['registered_count'] = event.get('registered_count') or 0
+        events.append(event)
     
     return {"events": events}
 
@@ -536,6 +678,8 @@ async def create_event(event: EventCreate):
     }
     
     response = supabase.table('events').insert(event_data).execute()
+    invalidate_event_index()
+    invalidate_events_feed()
     return {"event": response.data[0]}
 
 @router.put("/events/{event_id}")
@@ -553,6 +697,8 @@ async def update_event(event_id: str, event: EventCreate):
     if not response.data:
         raise HTTPException(status_code=404, detail="Event not found")
     
+    invalidate_event_index()
+    invalidate_events_feed()
     return {"event": response.data[0]}
 
 @router.delete("/events/{event_id}")
@@ -565,6 +711,8 @@ async def delete_event(event_id: str):
     if not response.data:
         raise HTTPException(status_code=404, detail="Event not found")
     
+    invalidate_event_index()
+    invalidate_events_feed()
     return {"message": "Event deleted successfully"}
 
 @router.get("/events/{event_id}/participants")
@@ -8,23 +8,17 @@ from datetime import datetime, timedelta
 import uuid
 import logging
 from typing import Optional
-from supabase import create_client
 import os
 
 from models import LoginRequest, SignupRequest, TokenResponse
-from database import get_supabase
-from auth import hash_password, verify_password, create_access_token
+from database import get_supabase, get_supabase_admin
+from auth import hash_password_async, verify_password_async, create_access_token
 from settings import settings
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
-def get_supabase_admin():
-    """Get Supabase client with admin (service role) access to bypass RLS for authentication"""
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
-
-
 @router.post("/signup", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 async def signup(request: SignupRequest):
     """
@@ -65,7 +59,7 @@ async def signup(request: SignupRequest):
             )
         
         # Hash password
-        hashed_password = hash_password(request.password)
+        hashed_password = await hash_password_async(request.password)
         
         # Get or create default institution (for MVP, using single institution)
         institution_response = supabase.table("institutions")\
@@ -192,7 +186,7 @@ async def login(request: LoginRequest):
                 )
         
         # Verify password
-        if not verify_password(request.password, user['password_hash']):
+        if not await verify_password_async(request.password, user['password_hash']):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid email or password"
@@ -5,9 +5,11 @@ Direct database queries - no AI overhead
 
 from fastapi import APIRouter, Depends, HTTPException
 from typing import List, Dict, Any
-from datetime import datetime, date, timedelta
+from datetime import datetime, date
 from database import get_supabase_admin
 from auth import get_current_user, AuthUser
+from tools.timetable_index import get_timetable_index
+from tools.events_feed import get_upcoming_feed
 
 router = APIRouter(prefix="/student", tags=["student"])
 
@@ -101,9 +103,6 @@ async def get_fee_status(current_user: AuthUser = Depends(get_current_user)):
 @router.get("/timetable/today")
 async def get_today_timetable(current_user: AuthUser = Depends(get_current_user)):
     """Get today's class schedule for logged-in student"""
-    supabase = get_supabase_admin()
-    student_id = current_user.student_id
-    
     try:
         # Get current day of week
         today = datetime.now()
@@ -114,54 +113,19 @@ async def get_today_timetable(current_user: AuthUser = Depends(get_current_user)
         # Get student's semester
         student_semester = current_user.student_data.get('semester', 1)
         
-        # Get timetable for today (without join first)
-        try:
-            timetable_response = supabase.table('timetable')\
-                .select('*')\
-                .eq('semester', student_semester)\
-                .eq('day_of_week', day_number)\
-                .order('start_time')\
-                .execute()
-        except Exception as query_error:
-            # If query fails, return empty schedule
-            print(f"Timetable query error: {str(query_error)}")
-            return []
-        
-        if not timetable_response.data:
-            return []
-        
-        # Get subject IDs
-        subject_ids = [entry['subject_id'] for entry in timetable_response.data if entry.get('subject_id')]
-        
-        # Fetch subjects separately
-        subjects_dict = {}
-        if subject_ids:
-            try:
-                subjects_response = supabase.table('subjects')\
-                    .select('*')\
-                    .in_('id', subject_ids)\
-                    .execute()
-                
-                for subject in subjects_response.data:
-                    subjects_dict[subject['id']] = subject
-            except Exception as subject_error:
-                print(f"Subjects query error: {str(subject_error)}")
-                # Continue without subject details
+        # Served from the in-memory semester index (no per-request queries)
+        entries = get_timetable_index(student_semester).day(day_number)
         
-        # Build schedule with subject details
         schedule = []
-        for entry in timetable_response.data:
-            subject_id = entry.get('subject_id')
-            subject = subjects_dict.get(subject_id, {})
-            
+        for entry in entries:
             schedule.append({
                 "id": entry['id'],
-                "subject_name": subject.get('subject_name', 'Unknown Subject'),
-                "subject_code": subject.get('subject_code', 'N/A'),
-                "room": entry.get('room_number', 'TBA'),
+                "subject_name": entry.get('subject_name') or 'Unknown Subject',
+                "subject_code": entry.get('subject_code') or 'N/A',
+                "room": entry.get('room_number') or 'TBA',
                 "start_time": entry.get('start_time', ''),
                 "end_time": entry.get('end_time', ''),
-                "session_type": entry.get('session_type', 'lecture')
+                "session_type": entry.get('session_type') or 'lecture'
             })
         
         return schedule
@@ -215,23 +179,13 @@ async def get_library_loans(current_user: AuthUser = Depends(get_current_user)):
 @router.get("/events/upcoming")
 async def get_upcoming_events():
     """Get upcoming events (next 30 days)"""
-    supabase = get_supabase_admin()
-    
     try:
-        # Get events from today onwards
-        today = date.today().isoformat()
-        end_date = (date.today() + timedelta(days=30)).isoformat()
-        
-        events_response = supabase.table('events')\
-            .select('*')\
-            .gte('start_date', today)\
-            .lte('start_date', end_date)\
-            .order('start_date')\
-            .execute()
+        # Shared in-memory snapshot, no per-request query
+        feed = get_upcoming_feed(days_ahead=30)
         
         return {
-            "events": events_response.data,
-            "count": len(events_response.data)
+            "events": feed['events'],
+            "count": feed['total_events']
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching events: {str(e)}")
@@ -5,13 +5,17 @@ Handles JWT verification, user authentication, and role-based access control.
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+import weakref
 import jwt
 from datetime import datetime
 import logging
 
 from settings import settings
-from database import get_supabase
+from database import get_supabase, get_supabase_admin
 
 logger = logging.getLogger(__name__)
 
@@ -132,9 +136,7 @@ async def get_current_user(
             )
         
         # Fetch student profile from database using service role to bypass RLS
-        from supabase import create_client
-        from settings import settings
-        supabase = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+        supabase = get_supabase_admin()
         
         # Query by id (which is the UUID we stored in JWT sub claim)
         response = supabase.table("students").select("*").eq("id", user_id).execute()
@@ -267,9 +269,7 @@ class OptionalAuth:
             email = payload.get("email")
             
             # Use service role to bypass RLS for fetching user data
-            from supabase import create_client
-            from settings import settings
-            supabase = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_ROLE_KEY)
+            supabase = get_supabase_admin()
             
             # Query by id (which is the UUID we stored in JWT sub claim)
             response = supabase.table("students").select("*").eq("id", user_id).execute()
@@ -354,3 +354,61 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         plain_password.encode('utf-8'),
         hashed_password.encode('utf-8')
     )
+
+
+# bcrypt costs ~100-300 ms of CPU per call. Async handlers run it on this
+# bounded pool instead of the event loop; the per-loop semaphore caps how
+# many hashes are in flight, so a login storm queues coroutines (cheap)
+# rather than pool work items, and other requests keep being served.
+_hash_pool: Optional[ThreadPoolExecutor] = None
+_hash_pool_lock = threading.Lock()
+_hash_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _get_hash_pool() -> Tuple[ThreadPoolExecutor, asyncio.Semaphore]:
+    global _hash_pool
+    if _hash_pool is None:
+        with _hash_pool_lock:
+            if _hash_pool is None:
+                _hash_pool = ThreadPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS,
+                    thread_name_prefix="bcrypt"
+                )
+    loop = asyncio.get_running_loop()
+    slots = _hash_slots.get(loop)
+    if slots is None:
+        slots = _hash_slots.setdefault(loop, asyncio.Semaphore(settings.PASSWORD_HASH_WORKERS))
+    return _hash_pool, slots
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password on the bcrypt worker pool.
+    
+    Args:
+        password: Plain text password
+        
+    Returns:
+        Hashed password string
+    """
+    pool, slots = _get_hash_pool()
+    async with slots:
+        return await asyncio.get_running_loop().run_in_executor(pool, hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verify a password against a hash on the bcrypt worker pool.
+    
+    Args:
+        plain_password: Plain text password
+        hashed_password: Hashed password from database
+        
+    Returns:
+        True if password matches, False otherwise
+    """
+    pool, slots = _get_hash_pool()
+    async with slots:
+        return await asyncio.get_running_loop().run_in_executor(
+            pool, verify_password, plain_password, hashed_password
+        )
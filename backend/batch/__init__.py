@@ -0,0 +1,26 @@
+"""
+Batch Jobs Package
+Cohort-wide analytics computed over columnar data, plus the background
+scheduler that runs them periodically.
+"""
+
+from .scheduler import PeriodicJob, JobScheduler, get_scheduler
+from .attendance_shortage import build_shortage_report, compute_shortage, count_students_below
+from .event_counts import reconcile_event_counts
+from .accruals import compute_late_fees, compute_library_fines, run_accrual_job
+from .fee_clearance import build_clearance, iter_clearance_rows
+
+__all__ = [
+    'PeriodicJob',
+    'JobScheduler',
+    'get_scheduler',
+    'build_shortage_report',
+    'compute_shortage',
+    'count_students_below',
+    'reconcile_event_counts',
+    'compute_late_fees',
+    'compute_library_fines',
+    'run_accrual_job',
+    'build_clearance',
+    'iter_clearance_rows',
+]
@@ -0,0 +1,159 @@
+"""
+Late Fee and Fine Accrual Engine
+Campus-wide late fees and library fines computed in one vectorized pass.
+
+calculate_late_fee() and return_library_book() price one record at a time,
+when someone asks. This job loads every outstanding fee and open loan that
+is past due into NumPy columns, prices them all at once, and persists the
+results through apply_accruals() (migrations/accruals_rpc.sql):
+- fees.late_fee / late_fee_accrued_on: ₹100/day for the first 7 days,
+  then ₹200/day, capped at 20% of the outstanding amount
+- book_loans.fine_amount: ₹5/day, loan marked overdue
+
+Per-request tools then read the stored values instead of recomputing.
+The job runs once a day; a run on a day that was already accrued is a
+no-op.
+"""
+
+import logging
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from database import get_supabase_admin
+from .attendance_shortage import _fetch_all
+
+logger = logging.getLogger(__name__)
+
+LATE_FEE_FIRST_WEEK_RATE = 100.0  # ₹ per day for the first week overdue
+LATE_FEE_RATE = 200.0  # ₹ per day after that
+LATE_FEE_FIRST_WEEK_DAYS = 7
+LATE_FEE_CAP = 0.20  # Fraction of the outstanding amount
+LIBRARY_FINE_PER_DAY = 5.0
+
+APPLY_CHUNK = 1000  # Rows per apply_accruals() call
+
+OUTSTANDING_FEE_STATUSES = ["pending", "partial", "overdue"]
+OPEN_LOAN_STATUSES = ["active", "overdue"]
+
+
+# ============================================================================
+# Vectorized core
+# ============================================================================
+
+def compute_late_fees(days_overdue: np.ndarray, outstanding: np.ndarray) -> np.ndarray:
+    """
+    Late fee per fee record.
+
+    Args:
+        days_overdue: int array, days past the due date (<= 0 means not overdue)
+        outstanding: float array, unpaid amount
+
+    Returns:
+        float array of late fees, rounded to paise
+    """
+    days = np.maximum(days_overdue, 0).astype(np.float64)
+    first_week = np.minimum(days, LATE_FEE_FIRST_WEEK_DAYS)
+    accrued = first_week * LATE_FEE_FIRST_WEEK_RATE + (days - first_week) * LATE_FEE_RATE
+    cap = np.maximum(outstanding, 0) * LATE_FEE_CAP
+    return np.round(np.minimum(accrued, cap), 2)
+
+
+def compute_library_fines(days_overdue: np.ndarray) -> np.ndarray:
+    """
+    Fine per loan.
+
+    Args:
+        days_overdue: int array, days past the due date
+
+    Returns:
+        float array of fines
+    """
+    return np.maximum(days_overdue, 0).astype(np.float64) * LIBRARY_FINE_PER_DAY
+
+
+def _days_overdue(due_dates: List[Any], today: np.datetime64) -> np.ndarray:
+    due = np.array([str(d)[:10] for d in due_dates], dtype="datetime64[D]")
+    return (today - due).astype(np.int64)
+
+
+# ============================================================================
+# Job
+# ============================================================================
+
+def run_accrual_job(today: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Price and persist late fees for overdue fees and fines for overdue loans.
+
+    Args:
+        today: Reference date (defaults to today)
+
+    Returns:
+        Summary with row counts and campus-wide totals
+    """
+    supabase = get_supabase_admin()
+    today = today or date.today()
+    day = np.datetime64(today, "D")
+
+    already_accrued = (
+        supabase.table("fees").select("id")
+        .eq("late_fee_accrued_on", today.isoformat())
+        .limit(1)
+        .execute()
+    )
+    if already_accrued.data:
+        logger.info(f"⏭️  Late fees already accrued on {today.isoformat()}, skipping")
+        return {"accrued_on": today.isoformat(), "skipped": True, "fees_updated": 0, "loans_updated": 0}
+
+    fees = _fetch_all(
+        lambda: supabase.table("fees").select("id, total_amount, amount_paid, due_date")
+        .in_("payment_status", OUTSTANDING_FEE_STATUSES)
+        .lt("due_date", today.isoformat())
+        .order("id")
+    )
+    loans = _fetch_all(
+        lambda: supabase.table("book_loans").select("id, due_date")
+        .in_("loan_status", OPEN_LOAN_STATUSES)
+        .lt("due_date", today.isoformat())
+        .order("id")
+    )
+
+    late_fees = np.zeros(0)
+    if fees:
+        outstanding = np.fromiter(
+            (float(f["total_amount"] or 0) - float(f["amount_paid"] or 0) for f in fees),
+            dtype=np.float64, count=len(fees)
+        )
+        late_fees = compute_late_fees(_days_overdue([f["due_date"] for f in fees], day), outstanding)
+
+    fines = np.zeros(0)
+    if loans:
+        fines = compute_library_fines(_days_overdue([l["due_date"] for l in loans], day))
+
+    fee_rows = [{"id": f["id"], "late_fee": float(v)} for f, v in zip(fees, late_fees)]
+    loan_rows = [{"id": l["id"], "fine_amount": float(v)} for l, v in zip(loans, fines)]
+
+    fees_updated = loans_updated = 0
+    for start in range(0, max(len(fee_rows), len(loan_rows)), APPLY_CHUNK):
+        result = supabase.rpc("apply_accruals", {
+            "p_fees": fee_rows[start:start + APPLY_CHUNK],
+            "p_loans": loan_rows[start:start + APPLY_CHUNK],
+            "p_accrued_on": today.isoformat(),
+        }).execute().data or {}
+        fees_updated += result.get("fees_updated", 0)
+        loans_updated += result.get("loans_updated", 0)
+
+    summary = {
+        "accrued_on": today.isoformat(),
+        "skipped": False,
+        "fees_updated": fees_updated,
+        "loans_updated": loans_updated,
+        "total_late_fees": round(float(late_fees.sum()), 2),
+        "total_library_fines": round(float(fines.sum()), 2),
+    }
+    logger.info(
+        f"💸 Accrued late fees on {fees_updated} fees (₹{summary['total_late_fees']:.2f}) "
+        f"and fines on {loans_updated} loans (₹{summary['total_library_fines']:.2f})"
+    )
+    return summary
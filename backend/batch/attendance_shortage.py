@@ -0,0 +1,441 @@
+"""
+Attendance Shortage Batch Engine
+Cohort-wide attendance risk computed in one vectorized pass.
+
+check_attendance_shortage() answers for one student at a time. This module
+loads the attendance of a whole department (or the whole campus) into
+NumPy columns and computes, for every student/subject pair at once:
+- attendance percentage (present + late count as attended)
+- classes needed to reach the threshold
+- projected end-of-term percentage at the student's recent rate
+- best achievable percentage if every remaining class is attended
+
+The scheduled job scans the campus once and stores a capped report for
+the whole campus and for every department / semester slice, so the latest
+at-risk list of any cohort can be served without recomputing.
+"""
+
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from database import get_supabase_admin
+from local_store import LocalStore, get_local_store
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000  # PostgREST's default max rows per response
+ID_CHUNK = 200  # Student ids per in_() filter, keeps URLs short
+RECENT_DAYS = 28  # Window for the "current rate" used in projections
+KEEP_REPORTS = 30  # Per department/semester scope
+STORED_REPORT_LIMIT = 500  # At-risk entries kept per stored report (the endpoint's default limit)
+
+ATTENDED_STATUSES = ("present", "late")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS attendance_shortage_reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    department TEXT,
+    semester INTEGER,
+    threshold REAL NOT NULL,
+    at_risk_count INTEGER NOT NULL,
+    report_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_shortage_reports_created ON attendance_shortage_reports(created_at);
+"""
+
+
+# ============================================================================
+# Vectorized core
+# ============================================================================
+
+def compute_shortage(
+    student_codes: np.ndarray,
+    subject_codes: np.ndarray,
+    attended: np.ndarray,
+    days: np.ndarray,
+    n_students: int,
+    n_subjects: int,
+    threshold: float = 75.0,
+    remaining_per_subject: Optional[np.ndarray] = None,
+    today: Optional[np.datetime64] = None,
+    recent_days: int = RECENT_DAYS
+) -> Dict[str, np.ndarray]:
+    """
+    Per student/subject attendance statistics for a whole cohort.
+
+    Args:
+        student_codes: int array, student index per attendance row
+        subject_codes: int array, subject index per attendance row
+        attended: bool array, row counts as attended
+        days: datetime64[D] array, class date per row
+        n_students: Number of distinct students (code range)
+        n_subjects: Number of distinct subjects (code range)
+        threshold: Required attendance percentage (0 < threshold < 100)
+        remaining_per_subject: Classes left this term per subject code;
+            None when the term end is unknown (projection = current)
+        today: Reference date for the recent-rate window
+        recent_days: Length of the recent-rate window
+
+    Returns:
+        Dictionary of equal-length arrays, one entry per pair with classes:
+        student, subject, total, attended, percentage, classes_needed,
+        projected, max_achievable (NaN when the term end is unknown)
+    """
+    size = n_students * n_subjects
+    key = student_codes.astype(np.int64) * n_subjects + subject_codes
+    weights = attended.astype(np.float64)
+
+    total = np.bincount(key, minlength=size)
+    present = np.bincount(key, weights=weights, minlength=size)
+
+    today = today if today is not None else np.datetime64(date.today(), "D")
+    recent = days >= today - np.timedelta64(recent_days, "D")
+    recent_total = np.bincount(key[recent], minlength=size)
+    recent_present = np.bincount(key[recent], weights=weights[recent], minlength=size)
+
+    pairs = np.flatnonzero(total)
+    total = total[pairs].astype(np.float64)
+    present = present[pairs]
+    recent_total = recent_total[pairs]
+    recent_present = recent_present[pairs]
+    subject = pairs % n_subjects
+
+    percentage = present / total * 100
+    # (present + x) / (total + x) >= t / 100  =>  x >= (t * total - 100 * present) / (100 - t)
+    classes_needed = np.maximum(np.ceil((threshold * total - 100 * present) / (100 - threshold)), 0)
+
+    if remaining_per_subject is None:
+        projected = percentage.copy()
+        max_achievable = np.full(len(pairs), np.nan)
+    else:
+        remaining = remaining_per_subject[subject].astype(np.float64)
+        rate = np.where(recent_total > 0, recent_present / np.maximum(recent_total, 1), present / total)
+        projected = (present + rate * remaining) / (total + remaining) * 100
+        max_achievable = (present + remaining) / (total + remaining) * 100
+
+    return {
+        "student": pairs // n_subjects,
+        "subject": subject,
+        "total": total.astype(np.int64),
+        "attended": present.astype(np.int64),
+        "percentage": percentage,
+        "classes_needed": classes_needed.astype(np.int64),
+        "projected": projected,
+        "max_achievable": max_achievable,
+    }
+
+
+def count_students_below(student_ids: Iterable[Any], present: Iterable[bool], threshold: float = 75.0) -> int:
+    """
+    Number of students whose overall attendance is below threshold.
+
+    Args:
+        student_ids: Student id per attendance row
+        present: Whether each row counts as attended
+        threshold: Percentage cut-off
+
+    Returns:
+        Count of students under the threshold
+    """
+    codes: Dict[Any, int] = {}
+    student_codes = np.fromiter((codes.setdefault(sid, len(codes)) for sid in student_ids), dtype=np.int64)
+    if student_codes.size == 0:
+        return 0
+    total = np.bincount(student_codes)
+    attended = np.bincount(student_codes, weights=np.fromiter(present, dtype=bool, count=student_codes.size))
+    return int(np.count_nonzero(attended / total * 100 < threshold))
+
+
+# ============================================================================
+# Loading
+# ============================================================================
+
+def _fetch_all(make_query) -> List[Dict[str, Any]]:
+    """Page through a PostgREST query with range() until it runs dry."""
+    rows: List[Dict[str, Any]] = []
+    start = 0
+    while True:
+        page = make_query().range(start, start + PAGE_SIZE - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            return rows
+        start += PAGE_SIZE
+
+
+def _remaining_per_subject(
+    supabase,
+    subjects: List[Dict[str, Any]],
+    remaining_weeks: Optional[float]
+) -> Optional[np.ndarray]:
+    """Classes left per subject: weekly timetable meetings x weeks remaining."""
+    if remaining_weeks is None:
+        if not settings.ACADEMIC_TERM_END_DATE:
+            return None
+        term_end = date.fromisoformat(settings.ACADEMIC_TERM_END_DATE)
+        remaining_weeks = max((term_end - date.today()).days, 0) / 7
+    codes = {s["id"]: i for i, s in enumerate(subjects)}
+    meetings = np.zeros(len(subjects), dtype=np.float64)
+    for entry in _fetch_all(lambda: supabase.table("timetable").select("subject_id")):
+        code = codes.get(entry.get("subject_id"))
+        if code is not None:
+            meetings[code] += 1
+    return np.floor(meetings * remaining_weeks)
+
+
+def _load_cohort(department: Optional[str], semester: Optional[int], threshold: float,
+                 remaining_weeks: Optional[float]) -> Dict[str, Any]:
+    """Fetch a cohort and run compute_shortage over it once."""
+    supabase = get_supabase_admin()
+
+    def students_query():
+        query = supabase.table("students").select("id, full_name, roll_number, department, semester")
+        if department:
+            query = query.eq("department", department)
+        if semester:
+            query = query.eq("semester", semester)
+        return query.order("id")
+
+    students = _fetch_all(students_query)
+    subjects = _fetch_all(lambda: supabase.table("subjects").select("id, subject_name, subject_code").order("id"))
+    student_codes = {s["id"]: i for i, s in enumerate(students)}
+    subject_codes = {s["id"]: i for i, s in enumerate(subjects)}
+
+    rows: List[Dict[str, Any]] = []
+    if department or semester:
+        ids = list(student_codes)
+        for i in range(0, len(ids), ID_CHUNK):
+            chunk = ids[i:i + ID_CHUNK]
+            rows.extend(_fetch_all(
+                lambda: supabase.table("attendance").select("student_id, subject_id, date, status")
+                .in_("student_id", chunk).order("id")
+            ))
+    else:
+        rows = _fetch_all(
+            lambda: supabase.table("attendance").select("student_id, subject_id, date, status").order("id")
+        )
+    rows = [r for r in rows if r["student_id"] in student_codes and r["subject_id"] in subject_codes]
+
+    cohort: Dict[str, Any] = {
+        "students": students,
+        "subjects": subjects,
+        "row_students": np.fromiter((student_codes[r["student_id"]] for r in rows), dtype=np.int64, count=len(rows)),
+        "remaining": None,
+        "result": None,
+    }
+    if not rows:
+        return cohort
+
+    cohort["remaining"] = _remaining_per_subject(supabase, subjects, remaining_weeks)
+    cohort["result"] = compute_shortage(
+        student_codes=cohort["row_students"],
+        subject_codes=np.fromiter((subject_codes[r["subject_id"]] for r in rows), dtype=np.int64, count=len(rows)),
+        attended=np.fromiter((r["status"] in ATTENDED_STATUSES for r in rows), dtype=bool, count=len(rows)),
+        days=np.array([str(r["date"])[:10] for r in rows], dtype="datetime64[D]"),
+        n_students=len(students),
+        n_subjects=len(subjects),
+        threshold=threshold,
+        remaining_per_subject=cohort["remaining"],
+    )
+    return cohort
+
+
+def _report(
+    cohort: Dict[str, Any],
+    threshold: float,
+    department: Optional[str],
+    semester: Optional[int],
+    limit: Optional[int],
+    in_scope: Optional[np.ndarray] = None
+) -> Dict[str, Any]:
+    """
+    Report dictionary for the students selected by `in_scope`.
+
+    Args:
+        cohort: Result of _load_cohort()
+        in_scope: bool array over cohort students (None = all of them)
+    """
+    students, subjects, result = cohort["students"], cohort["subjects"], cohort["result"]
+    if in_scope is None:
+        in_scope = np.ones(len(students), dtype=bool)
+
+    report: Dict[str, Any] = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "department": department,
+        "semester": semester,
+        "threshold": threshold,
+        "students_scanned": int(in_scope.sum()),
+        "records_scanned": int(in_scope[cohort["row_students"]].sum()),
+        "pairs_evaluated": 0,
+        "students_at_risk": 0,
+        "projection_available": False,
+        "at_risk": [],
+    }
+    if result is None:
+        return report
+
+    pairs = in_scope[result["student"]]
+    risky = np.flatnonzero(pairs & ((result["percentage"] < threshold) | (result["projected"] < threshold)))
+    risky = risky[np.argsort(result["projected"][risky], kind="stable")]
+
+    entries = []
+    for i in (risky if limit is None else risky[:limit]):
+        student = students[result["student"][i]]
+        subject = subjects[result["subject"][i]]
+        max_achievable = result["max_achievable"][i]
+        if not np.isnan(max_achievable) and max_achievable < threshold:
+            status = "unrecoverable"
+        elif result["projected"][i] < threshold:
+            status = "at_risk"
+        else:
+            status = "recovering"
+        entries.append({
+            "student_id": student["id"],
+            "roll_number": student.get("roll_number"),
+            "full_name": student.get("full_name"),
+            "department": student.get("department"),
+            "semester": student.get("semester"),
+            "subject_id": subject["id"],
+            "subject_name": subject.get("subject_name"),
+            "subject_code": subject.get("subject_code"),
+            "attended": int(result["attended"][i]),
+            "total_classes": int(result["total"][i]),
+            "percentage": round(float(result["percentage"][i]), 2),
+            "classes_needed": int(result["classes_needed"][i]),
+            "projected_percentage": round(float(result["projected"][i]), 2),
+            "max_achievable_percentage": None if np.isnan(max_achievable) else round(float(max_achievable), 2),
+            "status": status,
+        })
+
+    report.update({
+        "pairs_evaluated": int(pairs.sum()),
+        "students_at_risk": int(len(np.unique(result["student"][risky]))),
+        "projection_available": cohort["remaining"] is not None,
+        "at_risk": entries,
+    })
+    return report
+
+
+def build_shortage_report(
+    department: Optional[str] = None,
+    semester: Optional[int] = None,
+    threshold: Optional[float] = None,
+    remaining_weeks: Optional[float] = None,
+    limit: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Build the at-risk attendance list for a department/semester cohort.
+
+    Args:
+        department: Restrict to one department (None = all)
+        semester: Restrict to one semester (None = all)
+        threshold: Required percentage (default ATTENDANCE_SHORTAGE_THRESHOLD)
+        remaining_weeks: Weeks left in term; defaults to ACADEMIC_TERM_END_DATE
+        limit: Max at-risk entries returned (worst projections first)
+
+    Returns:
+        Report dictionary matching the AttendanceShortageReport model
+    """
+    threshold = threshold if threshold is not None else settings.ATTENDANCE_SHORTAGE_THRESHOLD
+    cohort = _load_cohort(department, semester, threshold, remaining_weeks)
+    report = _report(cohort, threshold, department, semester, limit)
+    logger.info(
+        f"📉 Attendance shortage: {report['students_at_risk']} students at risk "
+        f"({len(report['at_risk'])} subject pairs listed) out of {report['students_scanned']}"
+    )
+    return report
+
+
+def build_scoped_reports(limit: int = STORED_REPORT_LIMIT) -> List[Dict[str, Any]]:
+    """
+    Campus-wide report plus one per department, semester and department/semester
+    pair, all from a single campus scan.
+
+    Args:
+        limit: Max at-risk entries kept per report
+    """
+    threshold = settings.ATTENDANCE_SHORTAGE_THRESHOLD
+    cohort = _load_cohort(None, None, threshold, None)
+    departments = np.array([s.get("department") for s in cohort["students"]], dtype=object)
+    semesters = np.array([s.get("semester") for s in cohort["students"]], dtype=object)
+
+    scopes = {(None, None)}
+    for department, semester in zip(departments, semesters):
+        scopes.update({(department, None), (None, semester), (department, semester)})
+
+    reports = []
+    for department, semester in sorted(scopes, key=lambda scope: (str(scope[0] or ""), scope[1] or 0)):
+        in_scope = np.ones(len(departments), dtype=bool)
+        if department is not None:
+            in_scope &= departments == department
+        if semester is not None:
+            in_scope &= semesters == semester
+        reports.append(_report(cohort, threshold, department, semester, limit, in_scope))
+    logger.info(f"📉 Attendance shortage: {reports[0]['students_at_risk']} students at risk campus-wide, "
+                f"{len(reports)} scoped reports")
+    return reports
+
+
+# ============================================================================
+# Report storage
+# ============================================================================
+
+class ShortageReportStore:
+    """
+    Keeps the most recent shortage reports in the local store.
+    """
+
+    def __init__(self, store: LocalStore):
+        self.store = store
+        self.store.executescript(SCHEMA)
+
+    def save(self, report: Dict[str, Any]) -> None:
+        self.store.execute(
+            """INSERT INTO attendance_shortage_reports
+               (created_at, department, semester, threshold, at_risk_count, report_json)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (
+                report["generated_at"], report["department"], report["semester"],
+                report["threshold"], report["students_at_risk"], json.dumps(report)
+            )
+        )
+        self.store.execute(
+            """DELETE FROM attendance_shortage_reports
+               WHERE department IS ? AND semester IS ? AND id NOT IN
+               (SELECT id FROM attendance_shortage_reports
+                WHERE department IS ? AND semester IS ? ORDER BY id DESC LIMIT ?)""",
+            (report["department"], report["semester"], report["department"], report["semester"], KEEP_REPORTS)
+        )
+
+    def latest(self, department: Optional[str] = None, semester: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        row = self.store.fetchone(
+            """SELECT report_json FROM attendance_shortage_reports
+               WHERE department IS ? AND semester IS ? ORDER BY id DESC LIMIT 1""",
+            (department, semester)
+        )
+        return json.loads(row["report_json"]) if row else None
+
+
+_report_store: Optional[ShortageReportStore] = None
+
+
+def get_report_store() -> ShortageReportStore:
+    """Get the process-wide shortage report store."""
+    global _report_store
+    if _report_store is None:
+        _report_store = ShortageReportStore(get_local_store())
+    return _report_store
+
+
+def run_shortage_job() -> Dict[str, Any]:
+    """Scheduled job: store the campus-wide and per-department/semester reports."""
+    reports = build_scoped_reports()
+    store = get_report_store()
+    for report in reports:
+        store.save(report)
+    return reports[0]
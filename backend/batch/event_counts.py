@@ -0,0 +1,34 @@
+"""
+Event Participant Count Reconciliation
+Periodic check that events.registered_count matches the registrations.
+
+The counter is kept transactionally by the registration functions, so
+drift only comes from rows written around them (seed scripts, manual
+edits). The recount runs server-side in reconcile_event_registered_counts()
+(migrations/event_count_reconciliation.sql), one call per run.
+"""
+
+import logging
+from typing import Any, Dict
+
+from database import get_supabase_admin
+from tools.events_feed import invalidate_events_feed
+
+logger = logging.getLogger(__name__)
+
+
+def reconcile_event_counts() -> Dict[str, Any]:
+    """
+    Correct every event whose registered_count has drifted.
+
+    Returns:
+        {"checked": n, "corrected": n, "events": [{event_id, title, stored, actual}]}
+    """
+    result = get_supabase_admin().rpc("reconcile_event_registered_counts", {}).execute().data or {}
+    if result.get("corrected"):
+        for drift in result.get("events", []):
+            logger.warning(f"⚠️  Event '{drift['title']}' registered_count {drift['stored']} -> {drift['actual']}")
+        # Listings are served from the events snapshot
+        invalidate_events_feed()
+    logger.info(f"🔁 Reconciled event counts: {result.get('corrected', 0)} of {result.get('checked', 0)} corrected")
+    return result
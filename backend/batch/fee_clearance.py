@@ -0,0 +1,185 @@
+"""
+Fee Clearance Batch Report
+Exam clearance for a whole department or semester in one pass.
+
+check_fee_clearance() answers for one student and issues a fees query per
+call. This module fetches the cohort's students and all of their fee rows
+with a few paged queries, then aggregates per student with NumPy
+(bincount over student codes) using the same rules:
+- balance = total due - total paid
+- overdue = unpaid amount on pending/partial/overdue fees past their due date
+- is_cleared = zero balance and nothing overdue
+- eligible_for_exam = cleared, or balance under EXAM_BALANCE_ALLOWANCE
+
+Rows are produced by a generator so the API can stream them as CSV or JSON.
+"""
+
+import csv
+import io
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from database import get_supabase_admin
+from .attendance_shortage import ID_CHUNK, _fetch_all
+
+logger = logging.getLogger(__name__)
+
+EXAM_BALANCE_ALLOWANCE = 1000.0  # Small balances do not block exams
+OUTSTANDING_STATUSES = ("pending", "partial", "overdue")
+
+COLUMNS = [
+    "student_id", "roll_number", "full_name", "department", "semester",
+    "total_due", "total_paid", "balance", "overdue_amount", "late_fees",
+    "has_overdue", "is_cleared", "eligible_for_exam",
+]
+
+
+def build_clearance(
+    department: Optional[str] = None,
+    semester: Optional[int] = None,
+    today: Optional[date] = None
+) -> Dict[str, Any]:
+    """
+    Per-student clearance arrays for a cohort.
+
+    Args:
+        department: Restrict to one department (None = all)
+        semester: Restrict to one semester (None = all)
+        today: Reference date for overdue checks
+
+    Returns:
+        {"students": [...], "summary": {...}, plus one NumPy array per
+        numeric/boolean column in COLUMNS, aligned with "students"}
+    """
+    supabase = get_supabase_admin()
+    today = today or date.today()
+
+    def students_query():
+        query = supabase.table("students").select("id, roll_number, full_name, department, semester")
+        if department:
+            query = query.eq("department", department)
+        if semester:
+            query = query.eq("semester", semester)
+        return query.order("roll_number")
+
+    students = _fetch_all(students_query)
+    codes = {s["id"]: i for i, s in enumerate(students)}
+
+    columns = "student_id, total_amount, amount_paid, due_date, payment_status, late_fee"
+    fees: List[Dict[str, Any]] = []
+    if department or semester:
+        ids = list(codes)
+        for i in range(0, len(ids), ID_CHUNK):
+            chunk = ids[i:i + ID_CHUNK]
+            fees.extend(_fetch_all(lambda: supabase.table("fees").select(columns).in_("student_id", chunk).order("id")))
+    else:
+        fees = _fetch_all(lambda: supabase.table("fees").select(columns).order("id"))
+    fees = [f for f in fees if f["student_id"] in codes]
+
+    n = len(students)
+    student = np.fromiter((codes[f["student_id"]] for f in fees), dtype=np.int64, count=len(fees))
+    due = np.fromiter((float(f["total_amount"] or 0) for f in fees), dtype=np.float64, count=len(fees))
+    paid = np.fromiter((float(f["amount_paid"] or 0) for f in fees), dtype=np.float64, count=len(fees))
+    late = np.fromiter((float(f.get("late_fee") or 0) for f in fees), dtype=np.float64, count=len(fees))
+    due_dates = np.array([str(f["due_date"])[:10] for f in fees], dtype="datetime64[D]")
+    overdue = np.fromiter((f["payment_status"] in OUTSTANDING_STATUSES for f in fees), dtype=bool, count=len(fees)) \
+        & (due_dates < np.datetime64(today, "D"))
+
+    total_due = np.round(np.bincount(student, weights=due, minlength=n), 2)
+    total_paid = np.round(np.bincount(student, weights=paid, minlength=n), 2)
+    balance = np.round(total_due - total_paid, 2)
+    overdue_amount = np.round(np.bincount(student[overdue], weights=(due - paid)[overdue], minlength=n), 2)
+    late_fees = np.round(np.bincount(student[overdue], weights=late[overdue], minlength=n), 2)
+    has_overdue = np.bincount(student[overdue], minlength=n) > 0
+    is_cleared = (balance == 0) & ~has_overdue
+    eligible = is_cleared | (balance < EXAM_BALANCE_ALLOWANCE)
+
+    summary = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "department": department,
+        "semester": semester,
+        "students": n,
+        "fee_records": len(fees),
+        "cleared": int(is_cleared.sum()),
+        "eligible_for_exam": int(eligible.sum()),
+        "total_balance": round(float(balance.sum()), 2),
+        "total_overdue": round(float(overdue_amount.sum()), 2),
+    }
+    logger.info(
+        f"🧾 Fee clearance: {summary['cleared']}/{n} cleared, "
+        f"{summary['eligible_for_exam']} eligible for exams"
+    )
+    return {
+        "students": students,
+        "summary": summary,
+        "total_due": total_due,
+        "total_paid": total_paid,
+        "balance": balance,
+        "overdue_amount": overdue_amount,
+        "late_fees": late_fees,
+        "has_overdue": has_overdue,
+        "is_cleared": is_cleared,
+        "eligible_for_exam": eligible,
+    }
+
+
+def iter_clearance_rows(clearance: Dict[str, Any], only_blocked: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    One dictionary per student, in COLUMNS order.
+
+    Args:
+        clearance: Result of build_clearance()
+        only_blocked: Only students who are not cleared
+    """
+    for i, student in enumerate(clearance["students"]):
+        if only_blocked and clearance["is_cleared"][i]:
+            continue
+        yield {
+            "student_id": student["id"],
+            "roll_number": student.get("roll_number"),
+            "full_name": student.get("full_name"),
+            "department": student.get("department"),
+            "semester": student.get("semester"),
+            "total_due": float(clearance["total_due"][i]),
+            "total_paid": float(clearance["total_paid"][i]),
+            "balance": float(clearance["balance"][i]),
+            "overdue_amount": float(clearance["overdue_amount"][i]),
+            "late_fees": float(clearance["late_fees"][i]),
+            "has_overdue": bool(clearance["has_overdue"][i]),
+            "is_cleared": bool(clearance["is_cleared"][i]),
+            "eligible_for_exam": bool(clearance["eligible_for_exam"][i]),
+        }
+
+
+def stream_csv(rows: Iterator[Dict[str, Any]], batch_size: int = 500) -> Iterator[str]:
+    """Serialize rows as CSV text, a batch of lines per chunk."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COLUMNS)
+    writer.writeheader()
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_json(summary: Dict[str, Any], rows: Iterator[Dict[str, Any]], batch_size: int = 500) -> Iterator[str]:
+    """Serialize as {"summary": {...}, "students": [...]}, a batch of rows per chunk."""
+    yield '{"summary": ' + json.dumps(summary) + ', "students": ['
+    chunk: List[str] = []
+    first = True
+    for row in rows:
+        chunk.append(json.dumps(row))
+        if len(chunk) == batch_size:
+            yield ("" if first else ", ") + ", ".join(chunk)
+            first = False
+            chunk = []
+    if chunk:
+        yield ("" if first else ", ") + ", ".join(chunk)
+    yield "]}"
@@ -0,0 +1,142 @@
+"""
+Background Job Scheduler
+Runs batch jobs on a fixed interval (optionally anchored to a time of
+day) inside the API process.
+
+Jobs are plain synchronous functions; each run happens in a worker thread
+so a long scan never blocks the event loop. The scheduler is started and
+stopped from the FastAPI lifespan.
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicJob:
+    """
+    A named job and its run history.
+
+    Args:
+        name: Identifier shown in status output
+        func: Synchronous callable run in a worker thread
+        interval_seconds: Delay between runs (<= 0 disables the job)
+        run_on_start: Run once as soon as the scheduler starts
+        run_at: "HH:MM" (UTC) the runs are anchored to, e.g. "01:00" with a
+            24h interval runs daily at 01:00 (None = interval from startup)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Any],
+        interval_seconds: float,
+        run_on_start: bool = False,
+        run_at: Optional[str] = None
+    ):
+        self.name = name
+        self.func = func
+        self.interval_seconds = interval_seconds
+        self.run_on_start = run_on_start
+        self.run_at = run_at
+        self.last_run: Optional[str] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.runs = 0
+        self._running = asyncio.Lock()
+
+    async def run_once(self) -> Any:
+        """Run the job now (skipped if a run is already in progress)."""
+        if self._running.locked():
+            logger.info(f"⏭️  Job {self.name} already running, skipping")
+            return None
+        async with self._running:
+            started = time.perf_counter()
+            try:
+                result = await asyncio.to_thread(self.func)
+                self.last_error = None
+                return result
+            except Exception as e:
+                self.last_error = str(e)
+                logger.error(f"❌ Job {self.name} failed: {str(e)}")
+                return None
+            finally:
+                self.runs += 1
+                self.last_run = datetime.utcnow().isoformat()
+                self.last_duration_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    def _next_delay(self) -> float:
+        """Seconds until the next run."""
+        if not self.run_at:
+            return self.interval_seconds
+        hour, minute = (int(part) for part in self.run_at.split(":"))
+        now = datetime.utcnow()
+        anchor = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        delay = (anchor - now) % timedelta(seconds=self.interval_seconds)
+        return delay.total_seconds() or self.interval_seconds
+
+    async def _loop(self) -> None:
+        if self.run_on_start:
+            await self.run_once()
+        while True:
+            await asyncio.sleep(self._next_delay())
+            await self.run_once()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "interval_seconds": self.interval_seconds,
+            "run_at": self.run_at,
+            "runs": self.runs,
+            "last_run": self.last_run,
+            "last_duration_ms": self.last_duration_ms,
+            "last_error": self.last_error,
+        }
+
+
+class JobScheduler:
+    """
+    Owns the background tasks for all registered jobs.
+    """
+
+    def __init__(self):
+        self.jobs: Dict[str, PeriodicJob] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def add(self, job: PeriodicJob) -> PeriodicJob:
+        self.jobs[job.name] = job
+        return job
+
+    def start(self) -> None:
+        """Start every enabled job on the running event loop."""
+        for job in self.jobs.values():
+            if job.interval_seconds > 0:
+                self._tasks.append(asyncio.create_task(job._loop(), name=f"job:{job.name}"))
+                anchor = f" from {job.run_at} UTC" if job.run_at else ""
+                logger.info(f"⏰ Scheduled job {job.name} every {job.interval_seconds:.0f}s{anchor}")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def run_now(self, name: str) -> Any:
+        return await self.jobs[name].run_once()
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: job.status() for name, job in self.jobs.items()}
+
+
+_scheduler: Optional[JobScheduler] = None
+
+
+def get_scheduler() -> JobScheduler:
+    """Get the process-wide job scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = JobScheduler()
+    return _scheduler
@@ -0,0 +1,7 @@
+"""
+Micro-benchmarks for backend hot paths.
+
+Each module runs standalone from the backend directory, e.g.:
+
+    python -m benchmarks.bench_aggregations --sizes 100,10000,1000000
+"""
@@ -0,0 +1,301 @@
+"""
+Aggregation micro-benchmarks.
+
+Feeds the Python aggregation in the tool functions and the admin dashboard
+synthetic record sets of increasing size (100 rows up to 1M) with the
+database replaced by a static stub, so only the in-process work is
+measured. Each case reports best-of-N wall time and tracemalloc peak
+memory; --save writes the results as JSON for before/after comparisons.
+
+Usage:
+    python -m benchmarks.bench_aggregations
+    python -m benchmarks.bench_aggregations --sizes 1000,100000 --only cgpa,dashboard_stats --save before.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gc
+import json
+import logging
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+from unittest import mock
+
+# Settings are read at import time; benchmarks never reach a real project
+for _key, _value in {
+    "SUPABASE_URL": "http://localhost.invalid",
+    "SUPABASE_KEY": "benchmark",
+    "SUPABASE_JWT_SECRET": "benchmark-jwt-secret-benchmark-jwt-secret",
+    "GOOGLE_API_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+STUDENT_ID = "00000000-0000-4000-8000-000000000001"
+
+
+class StaticQuery:
+    """Query-builder stub: every filter is accepted and the canned rows are returned."""
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self._rows = rows
+
+    def __getattr__(self, name: str) -> Callable[..., "StaticQuery"]:
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        from fake_supabase import FakeResponse
+        return FakeResponse(self._rows, count=len(self._rows))
+
+
+class StaticClient:
+    """Supabase client stub serving pre-built rows per table."""
+
+    def __init__(self, tables: Dict[str, List[Dict[str, Any]]]):
+        self.tables = tables
+
+    def table(self, name: str) -> StaticQuery:
+        return StaticQuery(self.tables.get(name, []))
+
+
+# ============================================================================
+# Synthetic record sets
+# ============================================================================
+
+def _subjects(rng: random.Random, semesters: int = 8, per_semester: int = 6) -> List[Dict[str, Any]]:
+    return [{
+        "subject_name": f"Subject {semester}.{n}",
+        "subject_code": f"BM{semester}{n:02d}",
+        "credits": rng.choice([2, 3, 4]),
+        "semester": semester,
+    } for semester in range(1, semesters + 1) for n in range(per_semester)]
+
+
+def attendance_rows(n: int, rng: random.Random) -> List[Dict[str, Any]]:
+    subjects = _subjects(rng, semesters=1)
+    today = date.today()
+    return [{
+        "student_id": STUDENT_ID,
+        "subject_id": f"subject-{i % len(subjects)}",
+        "date": (today - timedelta(days=i // len(subjects) % 3650)).isoformat(),
+        "status": rng.choices(["present", "late", "absent"], weights=[0.75, 0.05, 0.2])[0],
+        "subjects": {k: subjects[i % len(subjects)][k] for k in ("subject_name", "subject_code")},
+    } for i in range(n)]
+
+
+def marks_rows(n: int, rng: random.Random) -> List[Dict[str, Any]]:
+    subjects = _subjects(rng)
+    rows = []
+    for i in range(n):
+        max_marks = rng.choice([10, 20, 100])
+        rows.append({
+            "student_id": STUDENT_ID,
+            "exam_type": rng.choice(["midterm", "final", "quiz", "assignment"]),
+            "obtained_marks": round(rng.uniform(0.3, 1.0) * max_marks, 2),
+            "max_marks": max_marks,
+            "exam_date": (date.today() - timedelta(days=i % 1500)).isoformat(),
+            "subjects": subjects[i % len(subjects)],
+        })
+    return rows
+
+
+def fee_rows(n: int, rng: random.Random) -> List[Dict[str, Any]]:
+    today = date.today()
+    rows = []
+    for i in range(n):
+        total = 50000.0
+        paid = rng.choice([0.0, 25000.0, 50000.0])
+        rows.append({
+            "student_id": STUDENT_ID,
+            "semester": i % 8 + 1,
+            "academic_year": "2025-2026",
+            "total_amount": total,
+            "amount_paid": paid,
+            "due_date": (today + timedelta(days=rng.randint(-90, 90))).isoformat(),
+            "payment_status": "paid" if paid >= total else "partial" if paid else "pending",
+        })
+    return rows
+
+
+def schedule_rows(n: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """Class entries scattered over the 08:00-18:00 day (overlaps included)."""
+    rows = []
+    for _ in range(n):
+        start = rng.randint(8 * 60, 17 * 60)
+        end = min(start + rng.choice([30, 60, 90]), 18 * 60)
+        rows.append({
+            "start_time": f"{start // 60:02d}:{start % 60:02d}:00",
+            "end_time": f"{end // 60:02d}:{end % 60:02d}:00",
+        })
+    return rows
+
+
+def dashboard_tables(n: int, rng: random.Random) -> Dict[str, List[Dict[str, Any]]]:
+    """n rows in each of students, attendance and fees (the tables scanned in full)."""
+    students = max(1, n // 50)
+    return {
+        "students": [{"id": f"s{i}", "cgpa": round(rng.uniform(5, 10), 2)} for i in range(n)],
+        "attendance": [{
+            "student_id": f"s{i % students}",
+            "status": rng.choices(["present", "late", "absent"], weights=[0.75, 0.05, 0.2])[0],
+        } for i in range(n)],
+        "fees": [{"amount_paid": rng.choice([0.0, 25000.0, 50000.0]), "total_amount": 50000.0} for _ in range(n)],
+        "faculty": [], "departments": [], "subjects": [], "events": [],
+    }
+
+
+# ============================================================================
+# Cases: size -> (setup, call)
+# ============================================================================
+
+def _patched(module, client: StaticClient):
+    return mock.patch.object(module, "get_supabase_admin", lambda: client)
+
+
+def case_attendance(n: int, rng: random.Random):
+    from tools import attendance_tool
+    client = StaticClient({"attendance": attendance_rows(n, rng)})
+    return _patched(attendance_tool, client), lambda: attendance_tool.get_student_attendance(STUDENT_ID)
+
+
+def case_cgpa(n: int, rng: random.Random):
+    from tools import marks_tool
+    client = StaticClient({"marks": marks_rows(n, rng)})
+    return _patched(marks_tool, client), lambda: marks_tool.calculate_cgpa(STUDENT_ID)
+
+
+def case_sgpa(n: int, rng: random.Random):
+    from tools import marks_tool
+    client = StaticClient({"marks": marks_rows(n, rng)})
+    return _patched(marks_tool, client), lambda: marks_tool.calculate_sgpa(STUDENT_ID, 3)
+
+
+def case_fee_status(n: int, rng: random.Random):
+    from tools import fees_tool
+    client = StaticClient({"fees": fee_rows(n, rng)})
+    return _patched(fees_tool, client), lambda: fees_tool.get_student_fee_status(STUDENT_ID)
+
+
+def case_free_slots(n: int, rng: random.Random):
+    from tools import timetable_tool
+    schedule = schedule_rows(n, rng)
+    return contextlib.nullcontext(), \
+        lambda: timetable_tool.calculate_free_slots(schedule, "08:00:00", "18:00:00")
+
+
+def case_dashboard_stats(n: int, rng: random.Random):
+    from api import admin_dashboard
+    client = StaticClient(dashboard_tables(n, rng))
+    return _patched(admin_dashboard, client), \
+        lambda: asyncio.run(admin_dashboard.get_dashboard_stats(admin_data={}))
+
+
+def case_shortage_batch(n: int, rng: random.Random):
+    import numpy as np
+    from batch.attendance_shortage import compute_shortage
+    students, subjects = max(1, n // 250), 6
+    student_codes = np.array([rng.randrange(students) for _ in range(n)], dtype=np.int64)
+    subject_codes = np.array([rng.randrange(subjects) for _ in range(n)], dtype=np.int64)
+    attended = np.array([rng.random() < 0.8 for _ in range(n)], dtype=bool)
+    days = np.datetime64(date.today(), "D") - np.array([rng.randrange(120) for _ in range(n)]).astype("timedelta64[D]")
+    remaining = np.full(subjects, 12.0)
+    return contextlib.nullcontext(), lambda: compute_shortage(
+        student_codes, subject_codes, attended, days, students, subjects, 75.0, remaining
+    )
+
+
+CASES: Dict[str, Callable] = {
+    "attendance": case_attendance,
+    "cgpa": case_cgpa,
+    "sgpa": case_sgpa,
+    "fee_status": case_fee_status,
+    "free_slots": case_free_slots,
+    "dashboard_stats": case_dashboard_stats,
+    "shortage_batch": case_shortage_batch,
+}
+
+
+# ============================================================================
+# Runner
+# ============================================================================
+
+def measure(call: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Best-of-`repeat` wall time, then one traced run for peak memory."""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "best_ms": round(min(timings) * 1000, 3),
+        "mean_ms": round(sum(timings) / len(timings) * 1000, 3),
+        "peak_mb": round(peak / (1024 * 1024), 3),
+    }
+
+
+def run(sizes: List[int], names: List[str], repeat: int, seed: int) -> Dict[str, List[Dict[str, Any]]]:
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    print(f"{'case':<18} {'rows':>10} {'best':>12} {'per row':>10} {'peak mem':>11}")
+    print("-" * 65)
+    for name in names:
+        for n in sizes:
+            rng = random.Random(seed)
+            patcher, call = CASES[name](n, rng)
+            with patcher:
+                # Large inputs get fewer repeats; the 1M-row cases take seconds each
+                stats = measure(call, repeat if n <= 100_000 else 1)
+            stats["rows"] = n
+            stats["us_per_row"] = round(stats["best_ms"] * 1000 / n, 3)
+            results.setdefault(name, []).append(stats)
+            print(f"{name:<18} {n:>10,} {stats['best_ms']:>10.2f}ms {stats['us_per_row']:>8.2f}us "
+                  f"{stats['peak_mb']:>9.2f}MB")
+            del call, patcher
+            gc.collect()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark tool and dashboard aggregations")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="Comma-separated row counts")
+    parser.add_argument("--only", default=",".join(CASES), help=f"Comma-separated cases ({', '.join(CASES)})")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save", metavar="PATH", help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    names = [n.strip() for n in args.only.split(",") if n.strip()]
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        parser.error(f"Unknown case(s): {', '.join(unknown)}")
+
+    # The tools log every call at INFO; keep the report readable
+    logging.disable(logging.INFO)
+
+    results = run([int(s) for s in args.sizes.split(",")], names, args.repeat, args.seed)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+        print(f"\n💾 Saved results to {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
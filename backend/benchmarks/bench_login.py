@@ -0,0 +1,102 @@
+"""
+Login hashing benchmark.
+
+Simulates a login storm: N concurrent coroutines each verify a bcrypt
+password, either inline on the event loop (how the login handlers used to
+call verify_password) or through verify_password_async, which runs bcrypt
+on the bounded worker pool. A probe task ticks every 10 ms meanwhile, so
+the report shows both login throughput and how long the event loop was
+unable to serve anything else.
+
+Usage:
+    python -m benchmarks.bench_login
+    python -m benchmarks.bench_login --logins 64 --concurrency 16,64 --rounds 10 --workers 8
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Dict, List
+
+# Settings are read at import time; benchmarks never reach a real project
+for _key, _value in {
+    "SUPABASE_URL": "http://localhost.invalid",
+    "SUPABASE_KEY": "benchmark",
+    "SUPABASE_JWT_SECRET": "benchmark-jwt-secret-benchmark-jwt-secret",
+    "GOOGLE_API_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+import bcrypt
+
+PROBE_INTERVAL = 0.01
+PASSWORD = "password123"
+
+
+async def _probe(stop: asyncio.Event, lags: List[float]) -> None:
+    """Record how late each 10 ms tick fires; large values mean a blocked loop."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+
+async def _storm(mode: str, hashed: str, logins: int, concurrency: int) -> Dict[str, float]:
+    from auth import verify_password, verify_password_async
+
+    gate = asyncio.Semaphore(concurrency)
+
+    async def login() -> bool:
+        async with gate:
+            if mode == "inline":
+                return verify_password(PASSWORD, hashed)
+            return await verify_password_async(PASSWORD, hashed)
+
+    stop = asyncio.Event()
+    lags: List[float] = []
+    probe = asyncio.create_task(_probe(stop, lags))
+    await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+
+    assert all(results)
+    lags.sort()
+    return {
+        "elapsed_s": elapsed,
+        "logins_per_s": logins / elapsed,
+        "loop_lag_p50_ms": lags[len(lags) // 2] * 1000 if lags else 0.0,
+        "loop_lag_max_ms": lags[-1] * 1000 if lags else elapsed * 1000,
+        "probe_ticks": len(lags),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=32, help="Logins per run")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrent login counts")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor of the stored hash")
+    parser.add_argument("--workers", type=int, default=None, help="PASSWORD_HASH_WORKERS override")
+    args = parser.parse_args()
+
+    if args.workers:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    from settings import settings
+
+    hashed = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(args.rounds)).decode("utf-8")
+    print(f"bcrypt rounds={args.rounds}, logins={args.logins}, workers={settings.PASSWORD_HASH_WORKERS}, "
+          f"cpus={os.cpu_count()}")
+    print(f"{'mode':<10} {'conc':>5} {'logins/s':>10} {'elapsed s':>10} {'loop lag p50 ms':>16} {'max ms':>9}")
+    for concurrency in (int(c) for c in args.concurrency.split(",")):
+        for mode in ("inline", "offloaded"):
+            result = asyncio.run(_storm(mode, hashed, args.logins, concurrency))
+            print(f"{mode:<10} {concurrency:>5} {result['logins_per_s']:>10.1f} {result['elapsed_s']:>10.2f} "
+                  f"{result['loop_lag_p50_ms']:>16.1f} {result['loop_lag_max_ms']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Server-side Chat Sessions
+Keeps conversation state on the server so clients only send a session id.
+
+Each session stores its messages plus a rolling summary. Prompts carry the
+summary and the un-summarized tail, and the tail is folded into the summary
+every CHAT_SUMMARY_EVERY_N_TURNS exchanges, so prompt size stays flat no
+matter how long the conversation runs.
+"""
+
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from local_store import LocalStore, get_local_store
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chat_sessions (
+    session_id TEXT PRIMARY KEY,
+    owner_id TEXT,
+    summary TEXT NOT NULL DEFAULT '',
+    summarized_through INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS chat_messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_chat_messages_session ON chat_messages(session_id, id);
+CREATE INDEX IF NOT EXISTS idx_chat_sessions_updated ON chat_sessions(updated_at);
+"""
+
+
+class SessionOwnershipError(Exception):
+    """Raised when a session id is used by someone other than its owner"""
+
+
+class ChatSessionStore:
+    """
+    Persists chat sessions in the local store and builds bounded prompt context.
+    """
+
+    def __init__(self, store: LocalStore):
+        self.store = store
+        self.store.executescript(SCHEMA)
+        self._compacting: Set[str] = set()  # Sessions with a compaction in flight
+
+    def get_or_create(self, session_id: Optional[str], owner_id: Optional[str] = None) -> Dict:
+        """
+        Load a session, or start a new one if no id (or an unknown id) is given.
+
+        Args:
+            session_id: Session id sent by the client, if any
+            owner_id: Student ID for authenticated users, None for anonymous
+
+        Returns:
+            The session row as a dictionary
+
+        Raises:
+            SessionOwnershipError: If the session belongs to a different owner
+        """
+        if session_id:
+            session = self.store.fetchone(
+                "SELECT * FROM chat_sessions WHERE session_id = ?", (session_id,)
+            )
+            if session:
+                if session["owner_id"] != owner_id:
+                    raise SessionOwnershipError(f"Session {session_id} belongs to another user")
+                return session
+
+        now = datetime.utcnow().isoformat()
+        new_id = str(uuid.uuid4())
+        self.store.execute(
+            "INSERT INTO chat_sessions (session_id, owner_id, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            (new_id, owner_id, now, now)
+        )
+        logger.info(f"💬 Started chat session {new_id}")
+        return self.store.fetchone("SELECT * FROM chat_sessions WHERE session_id = ?", (new_id,))
+
+    def append_exchange(self, session_id: str, question: str, answer: str) -> None:
+        """Record one user question and the assistant's answer."""
+        now = datetime.utcnow().isoformat()
+        self.store.executemany(
+            "INSERT INTO chat_messages (session_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+            [
+                (session_id, "user", question, now),
+                (session_id, "assistant", answer, now),
+            ]
+        )
+        self.store.execute(
+            "UPDATE chat_sessions SET updated_at = ? WHERE session_id = ?", (now, session_id)
+        )
+
+    def _pending_messages(self, session: Dict) -> List[Dict]:
+        """Messages that have not been folded into the summary yet."""
+        return self.store.fetchall(
+            "SELECT id, role, content FROM chat_messages WHERE session_id = ? AND id > ? ORDER BY id",
+            (session["session_id"], session["summarized_through"])
+        )
+
+    def build_context(self, session_id: str) -> str:
+        """
+        Build the conversation block for the agent prompts.
+
+        Returns:
+            Rolling summary plus recent messages, or "" for a fresh session
+        """
+        session = self.store.fetchone(
+            "SELECT * FROM chat_sessions WHERE session_id = ?", (session_id,)
+        )
+        if not session:
+            return ""
+
+        messages = self._pending_messages(session)
+        return format_conversation_context(session["summary"], messages)
+
+    def needs_compaction(self, session_id: str) -> bool:
+        """True once the un-summarized tail has grown past recent + N exchanges."""
+        session = self.store.fetchone(
+            "SELECT summarized_through FROM chat_sessions WHERE session_id = ?", (session_id,)
+        )
+        if not session:
+            return False
+        pending = self.store.fetchone(
+            "SELECT COUNT(*) AS n FROM chat_messages WHERE session_id = ? AND id > ?",
+            (session_id, session["summarized_through"])
+        )
+        limit = 2 * (settings.CHAT_RECENT_TURNS + settings.CHAT_SUMMARY_EVERY_N_TURNS)
+        return pending["n"] >= limit
+
+    async def compact(self, session_id: str, llm) -> None:
+        """
+        Fold everything except the most recent exchanges into the rolling summary.
+
+        Safe to call concurrently - one compaction per session runs at a time
+        (overlapping calls return immediately), and a failed LLM call simply
+        leaves the session un-compacted.
+        """
+        if session_id in self._compacting:
+            return
+        self._compacting.add(session_id)
+        try:
+            await self._compact(session_id, llm)
+        finally:
+            self._compacting.discard(session_id)
+
+    async def _compact(self, session_id: str, llm) -> None:
+        session = self.store.fetchone(
+            "SELECT * FROM chat_sessions WHERE session_id = ?", (session_id,)
+        )
+        if not session:
+            return
+
+        messages = self._pending_messages(session)
+        keep = 2 * settings.CHAT_RECENT_TURNS
+        if len(messages) <= keep:
+            return
+
+        to_fold = messages[:-keep] if keep else messages
+        transcript = "\n".join(
+            f"{'Student' if m['role'] == 'user' else 'Assistant'}: {_clip(m['content'])}"
+            for m in to_fold
+        )
+
+        summary_prompt = f"""
+You maintain a running summary of a conversation between a student and a campus assistant.
+
+Current summary:
+{session['summary'] or '(empty)'}
+
+New messages:
+{transcript}
+
+Write the updated summary. Keep facts the student may refer back to (topics asked about,
+numbers quoted, events or books mentioned, actions taken). Drop greetings and filler.
+Use at most {settings.CHAT_SUMMARY_MAX_CHARS} characters.
+
+Updated summary:
+"""
+
+        try:
+            response = await llm.acomplete(summary_prompt)
+            summary = str(response).strip()[:settings.CHAT_SUMMARY_MAX_CHARS]
+        except Exception as e:
+            logger.error(f"Chat summary error for {session_id}: {str(e)}")
+            return
+
+        self.store.execute(
+            "UPDATE chat_sessions SET summary = ?, summarized_through = ?, updated_at = ? WHERE session_id = ?",
+            (summary, to_fold[-1]["id"], datetime.utcnow().isoformat(), session_id)
+        )
+        logger.info(f"💬 Compacted {len(to_fold)} messages into summary for session {session_id}")
+
+    def prune(self, retention_days: int) -> None:
+        """Delete sessions (and their messages) idle longer than the retention window."""
+        cutoff = (datetime.utcnow() - timedelta(days=retention_days)).isoformat()
+        self.store.execute(
+            "DELETE FROM chat_messages WHERE session_id IN "
+            "(SELECT session_id FROM chat_sessions WHERE updated_at < ?)",
+            (cutoff,)
+        )
+        self.store.execute("DELETE FROM chat_sessions WHERE updated_at < ?", (cutoff,))
+
+    def delete(self, session_id: str) -> None:
+        """Remove a session and all of its messages."""
+        self.store.execute("DELETE FROM chat_messages WHERE session_id = ?", (session_id,))
+        self.store.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
+
+
+def _clip(text: str) -> str:
+    """Cap a single message so one long answer can't blow up the prompt."""
+    limit = settings.CHAT_MESSAGE_MAX_CHARS
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def format_conversation_context(summary: str, messages: List[Dict]) -> str:
+    """
+    Render a summary and a list of {role, content} messages for the prompts.
+
+    Also used for the legacy client-sent conversation_history.
+    """
+    if not summary and not messages:
+        return ""
+
+    lines = []
+    if summary:
+        lines.append(f"Summary of earlier conversation: {summary}")
+    if messages:
+        lines.append("Recent messages:")
+        for msg in messages:
+            role = "Student" if msg.get("role") == "user" else "Assistant"
+            lines.append(f"{role}: {_clip(str(msg.get('content', '')))}")
+    return "\n".join(lines)
+
+
+_session_store: Optional[ChatSessionStore] = None
+
+
+def get_chat_session_store() -> ChatSessionStore:
+    """Get the process-wide chat session store."""
+    global _session_store
+    if _session_store is None:
+        _session_store = ChatSessionStore(get_local_store())
+    return _session_store
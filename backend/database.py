@@ -4,6 +4,7 @@ Database connection and utilities for Supabase.
 
 from supabase import create_client, Client
 from settings import settings
+from fake_supabase import get_fake_supabase
 from typing import Optional
 import logging
 
@@ -44,10 +45,13 @@ class SupabaseClient:
 def get_supabase() -> Client:
     """
     Dependency function to get Supabase client for FastAPI routes.
+    With DATABASE_BACKEND=fake this is the shared in-memory stand-in.
     
     Returns:
         Client: Supabase client instance
     """
+    if settings.DATABASE_BACKEND == "fake":
+        return get_fake_supabase(settings.FAKE_DB_SEED_PATH)
     return SupabaseClient.get_client()
 
 
@@ -59,6 +63,8 @@ def get_supabase_admin() -> Client:
     Returns:
         Client: Supabase client with admin privileges
     """
+    if settings.DATABASE_BACKEND == "fake":
+        return get_fake_supabase(settings.FAKE_DB_SEED_PATH)
     return create_client(
         supabase_url=settings.SUPABASE_URL,
         supabase_key=settings.SUPABASE_SERVICE_ROLE_KEY
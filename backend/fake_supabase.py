@@ -0,0 +1,1058 @@
+"""
+In-Memory Supabase Stand-in
+Offline replacement for the Supabase client, selected with DATABASE_BACKEND=fake.
+
+Implements the PostgREST query-builder subset the backend uses
+(table().select().eq().order().limit().execute(), insert/update/upsert/delete,
+or_() filter strings, embedded selects such as "*, subjects(subject_name)"
+and "event_participation(count)", count="exact", single() and rpc()).
+The schema's triggers (fee status, book availability, overdue fines) and
+the migrations' server-side functions are mirrored in Python so tools
+behave as they do against Postgres.
+"""
+
+import copy
+import json
+import logging
+import re
+import threading
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from postgrest.exceptions import APIError
+
+logger = logging.getLogger(__name__)
+
+
+# Column defaults from database_schema.sql (id/created_at/updated_at are added for every table)
+TABLE_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "students": {"enrollment_status": "active"},
+    "subjects": {"credits": 3},
+    "marks": {"max_marks": 100},
+    "fees": {"amount_paid": 0.0, "payment_status": "pending", "late_fee": 0.0},
+    "fee_transactions": {"payment_status": "success"},
+    "events": {"event_status": "scheduled", "registered_count": 0},
+    "event_participation": {"attendance_status": "registered"},
+    "event_waitlist": {"status": "waiting"},
+    "library_books": {"total_copies": 1, "available_copies": 1},
+    "book_loans": {"loan_status": "active", "fine_amount": 0.0},
+    "admin_users": {"is_active": True, "permissions": {}},
+    "faculty": {"is_active": True, "experience_years": 0},
+    "knowledge_base": {"is_public": True},
+    "notifications": {"is_read": False},
+}
+
+# Columns defaulting to NOW()
+TIMESTAMP_DEFAULTS: Dict[str, List[str]] = {
+    "fee_transactions": ["transaction_date"],
+    "event_participation": ["registration_date"],
+    "book_loans": ["issue_date"],
+}
+
+UNIQUE_KEYS: Dict[str, List[Tuple[str, ...]]] = {
+    "institutions": [("code",)],
+    "students": [("student_id",), ("email",)],
+    "subjects": [("subject_code",)],
+    "attendance": [("student_id", "subject_id", "date")],
+    "fee_transactions": [("transaction_id",), ("idempotency_key",)],
+    "event_participation": [("event_id", "student_id")],
+    "event_waitlist": [("event_id", "student_id")],
+    "library_books": [("isbn",)],
+    "book_loan_daily_counts": [("book_id", "loan_date")],
+    "timetable": [("subject_id", "day_of_week", "start_time")],
+    "admin_users": [("email",)],
+    "faculty": [("email",)],
+}
+
+# Foreign keys the naming heuristic can't guess: (table, referenced table) -> column
+FOREIGN_KEYS: Dict[Tuple[str, str], str] = {
+    ("book_loans", "library_books"): "book_id",
+}
+
+TRIGGER_BEFORE_UPDATE = "before_update"
+TRIGGER_AFTER_INSERT = "after_insert"
+TRIGGER_AFTER_UPDATE = "after_update"
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+def _singular(name: str) -> str:
+    return name[:-1] if name.endswith("s") else name
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split on commas that are not inside parentheses."""
+    parts, depth, current = [], 0, []
+    for ch in text:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if "".join(current).strip():
+        parts.append("".join(current).strip())
+    return parts
+
+
+def _coerce(row_value: Any, value: Any) -> Any:
+    """Convert a filter value to the row value's type, as PostgREST would."""
+    if value is None or row_value is None:
+        return value
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    if isinstance(row_value, bool):
+        if isinstance(value, str):
+            return value.lower() == "true"
+        return bool(value)
+    if isinstance(row_value, (int, float)) and isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    if isinstance(row_value, str) and not isinstance(value, str):
+        return str(value).lower() if isinstance(value, bool) else str(value)
+    return value
+
+
+def _like(pattern: str, value: Any, case_insensitive: bool) -> bool:
+    if value is None:
+        return False
+    regex = "".join(
+        ".*" if ch in "%*" else "." if ch == "_" else re.escape(ch)
+        for ch in pattern
+    )
+    flags = re.IGNORECASE | re.DOTALL if case_insensitive else re.DOTALL
+    return re.fullmatch(regex, str(value), flags) is not None
+
+
+def _compare(op: str, row_value: Any, value: Any) -> bool:
+    if op == "is":
+        if isinstance(value, str) and value.lower() == "null":
+            value = None
+        return row_value is value or row_value == _coerce(row_value, value)
+    if op == "in":
+        return any(row_value == _coerce(row_value, v) for v in value)
+    if op == "like":
+        return _like(value, row_value, False)
+    if op == "ilike":
+        return _like(value, row_value, True)
+    if row_value is None:
+        return False
+    value = _coerce(row_value, value)
+    try:
+        if op == "eq":
+            return row_value == value
+        if op == "neq":
+            return row_value != value
+        if op == "gt":
+            return row_value > value
+        if op == "gte":
+            return row_value >= value
+        if op == "lt":
+            return row_value < value
+        if op == "lte":
+            return row_value <= value
+    except TypeError:
+        return False
+    raise APIError({"message": f"Unsupported operator: {op}", "code": "PGRST100"})
+
+
+def _parse_or(expression: str) -> List[Tuple[str, str, Any]]:
+    """Parse "a.eq.1,b.ilike.%x%" into (column, op, value) conditions."""
+    conditions = []
+    for part in _split_top_level(expression):
+        column, op, value = part.split(".", 2)
+        if op == "in":
+            value = [v.strip().strip('"') for v in value.strip("()").split(",")]
+        conditions.append((column, op, value))
+    return conditions
+
+
+class FakeResponse:
+    """Mimics postgrest's APIResponse (data + count)"""
+
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    """Chainable query builder over one in-memory table."""
+
+    def __init__(self, client: "FakeSupabase", table: str):
+        self._client = client
+        self._table = table
+        self._action = "select"
+        self._columns = "*"
+        self._count = None
+        self._payload: Any = None
+        self._on_conflict = "id"
+        self._filters: List[Callable[[Dict], bool]] = []
+        self._index_lookup: Optional[Tuple[str, List[Any]]] = None  # first eq/in_ filter, served by an index
+        self._orders: List[Tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+        self._single = False
+
+    # ---- actions -------------------------------------------------------
+
+    def select(self, columns: str = "*", count: Optional[str] = None, **kwargs) -> "FakeQuery":
+        if self._action == "select":
+            self._columns = columns
+        self._count = count
+        return self
+
+    def insert(self, rows: Any, **kwargs) -> "FakeQuery":
+        self._action = "insert"
+        self._payload = rows
+        return self
+
+    def upsert(self, rows: Any, on_conflict: str = "id", **kwargs) -> "FakeQuery":
+        self._action = "upsert"
+        self._payload = rows
+        self._on_conflict = on_conflict
+        return self
+
+    def update(self, values: Dict[str, Any], **kwargs) -> "FakeQuery":
+        self._action = "update"
+        self._payload = values
+        return self
+
+    def delete(self, **kwargs) -> "FakeQuery":
+        self._action = "delete"
+        return self
+
+    # ---- filters -------------------------------------------------------
+
+    def _add(self, op: str, column: str, value: Any) -> "FakeQuery":
+        self._filters.append(lambda row: _compare(op, row.get(column), value))
+        return self
+
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        if self._index_lookup is None and value is not None:
+            # The index lookup applies this filter, no per-row check needed
+            self._index_lookup = (column, [value])
+            return self
+        return self._add("eq", column, value)
+
+    def neq(self, column: str, value: Any) -> "FakeQuery":
+        return self._add("neq", column, value)
+
+    def gt(self, column: str, value: Any) -> "FakeQuery":
+        return self._add("gt", column, value)
+
+    def gte(self, column: str, value: Any) -> "FakeQuery":
+        return self._add("gte", column, value)
+
+    def lt(self, column: str, value: Any) -> "FakeQuery":
+        return self._add("lt", column, value)
+
+    def lte(self, column: str, value: Any) -> "FakeQuery":
+        return self._add("lte", column, value)
+
+    def like(self, column: str, pattern: str) -> "FakeQuery":
+        return self._add("like", column, pattern)
+
+    def ilike(self, column: str, pattern: str) -> "FakeQuery":
+        return self._add("ilike", column, pattern)
+
+    def is_(self, column: str, value: Any) -> "FakeQuery":
+        return self._add("is", column, value)
+
+    def in_(self, column: str, values: Iterable[Any]) -> "FakeQuery":
+        values = list(values)
+        if self._index_lookup is None and None not in values:
+            self._index_lookup = (column, list(dict.fromkeys(values)))
+            return self
+        return self._add("in", column, values)
+
+    def match(self, query: Dict[str, Any]) -> "FakeQuery":
+        for column, value in query.items():
+            self.eq(column, value)
+        return self
+
+    def or_(self, filters: str, **kwargs) -> "FakeQuery":
+        conditions = _parse_or(filters)
+        self._filters.append(
+            lambda row: any(_compare(op, row.get(col), val) for col, op, val in conditions)
+        )
+        return self
+
+    # ---- modifiers -----------------------------------------------------
+
+    def order(self, column: str, desc: bool = False, **kwargs) -> "FakeQuery":
+        self._orders.append((column, desc))
+        return self
+
+    def limit(self, size: int, **kwargs) -> "FakeQuery":
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int, **kwargs) -> "FakeQuery":
+        self._offset = start
+        self._limit = end - start + 1
+        return self
+
+    def single(self) -> "FakeQuery":
+        self._single = True
+        return self
+
+    def maybe_single(self) -> "FakeQuery":
+        return self.single()
+
+    # ---- execution -----------------------------------------------------
+
+    def _matching(self) -> List[Dict[str, Any]]:
+        if self._index_lookup is not None:
+            column, values = self._index_lookup
+            candidates = [row for value in values for row in self._client._lookup(self._table, column, value)]
+        else:
+            candidates = self._client._rows(self._table)
+        return [row for row in candidates if all(f(row) for f in self._filters)]
+
+    def _sorted(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Stable sorts applied last-key-first give multi-column ordering;
+        # NULLs sort last ascending and first descending, as in Postgres
+        for column, desc in reversed(self._orders):
+            present = [r for r in rows if r.get(column) is not None]
+            missing = [r for r in rows if r.get(column) is None]
+            present.sort(key=lambda r: r[column], reverse=desc)
+            rows = missing + present if desc else present + missing
+        return rows
+
+    def execute(self) -> FakeResponse:
+        with self._client._lock:
+            if self._action == "select":
+                rows = self._sorted(self._matching())
+                total = len(rows)
+                if self._offset:
+                    rows = rows[self._offset:]
+                if self._limit is not None:
+                    rows = rows[:self._limit]
+                data = [self._client._project(self._table, row, self._columns) for row in rows]
+            elif self._action == "insert":
+                data = self._client._insert(self._table, self._payload)
+                total = len(data)
+            elif self._action == "upsert":
+                data = self._client._upsert(self._table, self._payload, self._on_conflict)
+                total = len(data)
+            elif self._action == "update":
+                data = self._client._update(self._table, self._matching(), self._payload)
+                total = len(data)
+            else:
+                data = self._client._delete(self._table, self._matching())
+                total = len(data)
+
+        if self._single:
+            if len(data) != 1:
+                raise APIError({
+                    "message": "JSON object requested, multiple (or no) rows returned",
+                    "code": "PGRST116"
+                })
+            data = data[0]
+        return FakeResponse(data, total if self._count else None)
+
+
+class FakeRPC:
+    """Deferred rpc() call, executed like a query."""
+
+    def __init__(self, client: "FakeSupabase", name: str, params: Dict[str, Any]):
+        self._client = client
+        self._name = name
+        self._params = params or {}
+
+    def execute(self) -> FakeResponse:
+        handler = self._client._rpcs.get(self._name)
+        if handler is None:
+            raise APIError({"message": f"Could not find the function {self._name}", "code": "PGRST202"})
+        with self._client._lock:
+            return FakeResponse(handler(self._client, **self._params))
+
+
+class FakeSupabase:
+    """
+    In-memory database with a Supabase-compatible client surface.
+
+    Postgres triggers and functions are stood in for by Python callables
+    registered with register_trigger() and register_rpc().
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._tables: Dict[str, List[Dict[str, Any]]] = {}
+        self._indexes: Dict[Tuple[str, str], Dict[Any, List[Dict[str, Any]]]] = {}
+        self._triggers: Dict[Tuple[str, str], List[Callable]] = {}
+        self._rpcs: Dict[str, Callable[..., Any]] = {}
+        _register_schema_triggers(self)
+        _register_schema_functions(self)
+
+    # ---- client surface ------------------------------------------------
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None) -> FakeRPC:
+        return FakeRPC(self, name, params or {})
+
+    # ---- extension points ----------------------------------------------
+
+    def register_trigger(self, table: str, event: str, handler: Callable) -> None:
+        """
+        Register a Python stand-in for a Postgres trigger.
+
+        before_update handlers get (client, new_row, old_row) and may mutate
+        new_row; after_insert/after_update handlers get the same arguments
+        once the row is stored.
+        """
+        self._triggers.setdefault((table, event), []).append(handler)
+
+    def register_rpc(self, name: str, handler: Callable[..., Any]) -> None:
+        """Register a Python stand-in for a Postgres function called via rpc()."""
+        self._rpcs[name] = handler
+
+    # ---- data management -----------------------------------------------
+
+    def load(self, data: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Bulk-load rows ({table: [rows]}) without running triggers."""
+        with self._lock:
+            for table, rows in data.items():
+                target = self._tables.setdefault(table, [])
+                for row in rows:
+                    target.append(self._with_defaults(table, dict(row)))
+                self._invalidate(table)
+
+    def load_seed(self, path: str) -> None:
+        with open(path, "r", encoding="utf-8") as f:
+            self.load(json.load(f))
+        logger.info(f"Fake database loaded from {path}: {self.counts()}")
+
+    def dump(self, path: str) -> None:
+        with self._lock:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self._tables, f, default=str)
+
+    def counts(self) -> Dict[str, int]:
+        return {table: len(rows) for table, rows in self._tables.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tables.clear()
+            self._indexes.clear()
+
+    # ---- internals -----------------------------------------------------
+
+    def _rows(self, table: str) -> List[Dict[str, Any]]:
+        return self._tables.setdefault(table, [])
+
+    def _invalidate(self, table: str, columns: Optional[Iterable[str]] = None) -> None:
+        """Drop a table's indexes, or only those covering the given changed columns."""
+        changed = set(columns) if columns is not None else None
+        for key in [k for k in self._indexes if k[0] == table]:
+            indexed = set(key[1]) if isinstance(key[1], tuple) else {key[1]}
+            if changed is None or indexed & changed:
+                del self._indexes[key]
+
+    def _index_insert(self, table: str, row: Dict[str, Any]) -> None:
+        """Add a new row to the table's built indexes (bulk inserts stay linear)."""
+        for (indexed_table, column), index in self._indexes.items():
+            if indexed_table == table:
+                index.setdefault(self._column_key(row, column), []).append(row)
+
+    def _column_key(self, row: Dict[str, Any], column: Any) -> Any:
+        if isinstance(column, tuple):
+            return tuple(self._index_key(row.get(c)) for c in column)
+        return self._index_key(row.get(column))
+
+    def _lookup(self, table: str, column: Any, value: Any) -> List[Dict[str, Any]]:
+        """
+        Rows whose column equals value, via a lazily built hash index.
+
+        column may be a tuple of columns (with a matching tuple of values)
+        for composite keys such as UNIQUE(student_id, subject_id, date).
+        """
+        key = (table, column)
+        index = self._indexes.get(key)
+        if index is None:
+            index = {}
+            for row in self._rows(table):
+                index.setdefault(self._column_key(row, column), []).append(row)
+            self._indexes[key] = index
+        if isinstance(column, tuple):
+            return index.get(tuple(self._index_key(v) for v in value)) or []
+        rows = index.get(self._index_key(value))
+        if rows is None and value is not None:
+            # PostgREST filters arrive as text; match "3" against 3 and vice versa
+            if isinstance(value, str):
+                try:
+                    rows = index.get(self._index_key(float(value)))
+                except ValueError:
+                    rows = None
+            else:
+                rows = index.get(self._index_key(str(value)))
+        return rows or []
+
+    @staticmethod
+    def _index_key(value: Any) -> Any:
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value
+
+    def _with_defaults(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        for column, default in TABLE_DEFAULTS.get(table, {}).items():
+            row.setdefault(column, copy.copy(default))
+        now = _now()
+        for column in TIMESTAMP_DEFAULTS.get(table, []):
+            row.setdefault(column, now)
+        row.setdefault("id", str(uuid.uuid4()))
+        row.setdefault("created_at", now)
+        row.setdefault("updated_at", now)
+        return row
+
+    def _check_unique(self, table: str, row: Dict[str, Any], ignore: Optional[Dict] = None) -> None:
+        for columns in UNIQUE_KEYS.get(table, []) + [("id",)]:
+            values = tuple(row.get(c) for c in columns)
+            if any(v is None for v in values):
+                continue
+            candidates = self._lookup(table, columns, values) if len(columns) > 1 else self._lookup(table, columns[0], values[0])
+            for existing in candidates:
+                if existing is ignore:
+                    continue
+                if all(existing.get(c) == v for c, v in zip(columns, values)):
+                    raise APIError({
+                        "message": f'duplicate key value violates unique constraint on {table}({", ".join(columns)})',
+                        "code": "23505"
+                    })
+
+    def _fire(self, table: str, event: str, new_row: Dict, old_row: Optional[Dict]) -> None:
+        for handler in self._triggers.get((table, event), []):
+            handler(self, new_row, old_row)
+
+    def _insert(self, table: str, payload: Any) -> List[Dict[str, Any]]:
+        rows = payload if isinstance(payload, list) else [payload]
+        inserted = []
+        for raw in rows:
+            row = self._with_defaults(table, dict(raw))
+            self._check_unique(table, row)
+            self._rows(table).append(row)
+            self._index_insert(table, row)
+            self._fire(table, TRIGGER_AFTER_INSERT, row, None)
+            inserted.append(dict(row))
+        return inserted
+
+    def _upsert(self, table: str, payload: Any, on_conflict: str) -> List[Dict[str, Any]]:
+        rows = payload if isinstance(payload, list) else [payload]
+        columns = [c.strip() for c in on_conflict.split(",")]
+        result = []
+        for raw in rows:
+            existing = [
+                r for r in self._lookup(table, columns[0], raw.get(columns[0]))
+                if all(r.get(c) == raw.get(c) for c in columns)
+            ]
+            if existing:
+                result.extend(self._update(table, existing[:1], raw))
+            else:
+                result.extend(self._insert(table, raw))
+        return result
+
+    def _update(self, table: str, rows: List[Dict[str, Any]], values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        updated = []
+        for row in rows:
+            old = dict(row)
+            new = {**row, **values}
+            self._fire(table, TRIGGER_BEFORE_UPDATE, new, old)
+            self._check_unique(table, new, ignore=row)
+            changed = [c for c in set(new) | set(old) if new.get(c) != old.get(c)]
+            row.clear()
+            row.update(new)
+            self._invalidate(table, changed)
+            self._fire(table, TRIGGER_AFTER_UPDATE, row, old)
+            updated.append(dict(row))
+        return updated
+
+    def _delete(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        doomed = {id(r) for r in rows}
+        self._tables[table] = [r for r in self._rows(table) if id(r) not in doomed]
+        self._invalidate(table)
+        return [dict(r) for r in rows]
+
+    def _foreign_key(self, table: str, referenced: str, sample: Optional[Dict]) -> Optional[str]:
+        """Column in `table` that references `referenced`, if any."""
+        explicit = FOREIGN_KEYS.get((table, referenced))
+        if explicit:
+            return explicit
+        if sample is None:
+            return None
+        for candidate in (f"{_singular(referenced)}_id", f"{_singular(referenced.split('_')[-1])}_id"):
+            if candidate in sample:
+                return candidate
+        return None
+
+    def _embed(self, table: str, row: Dict[str, Any], relation: str, columns: str) -> Any:
+        # Many-to-one: this row points at the related table
+        fk = self._foreign_key(table, relation, row)
+        if fk:
+            targets = self._lookup(relation, "id", row.get(fk))
+            return self._project(relation, targets[0], columns) if targets else None
+
+        # One-to-many: related rows point back at this one
+        related = self._rows(relation)
+        back = self._foreign_key(relation, table, related[0] if related else None)
+        if back is None:
+            return [] if columns.strip() == "count" else None
+        children = self._lookup(relation, back, row.get("id"))
+        if columns.strip() == "count":
+            return [{"count": len(children)}]
+        return [self._project(relation, child, columns) for child in children]
+
+    def _project(self, table: str, row: Dict[str, Any], columns: str) -> Dict[str, Any]:
+        """Apply a PostgREST select list (columns plus embedded relations) to one row."""
+        result: Dict[str, Any] = {}
+        for item in _split_top_level(columns or "*"):
+            alias = None
+            if ":" in item.split("(", 1)[0]:
+                alias, item = item.split(":", 1)
+            if item == "*":
+                result.update(row)
+            elif "(" in item:
+                relation, inner = item.split("(", 1)
+                relation = relation.split("!", 1)[0].strip()
+                result[alias or relation] = self._embed(table, row, relation, inner[:-1])
+            elif item == "count":
+                result["count"] = 1
+            else:
+                result[alias or item] = row.get(item)
+        return result
+
+
+# ============================================================================
+# Python versions of the database_schema.sql triggers
+# ============================================================================
+
+def _fee_status_after_payment(client: FakeSupabase, new: Dict, old: Optional[Dict]) -> None:
+    """update_fee_payment_status(): recompute amount_paid/payment_status from successful transactions."""
+    fees = client._lookup("fees", "id", new.get("fee_id"))
+    if not fees:
+        return
+    fee = fees[0]
+    paid = sum(
+        float(t.get("amount") or 0)
+        for t in client._lookup("fee_transactions", "fee_id", new.get("fee_id"))
+        if t.get("payment_status") == "success"
+    )
+    fee["amount_paid"] = paid
+    if paid >= float(fee.get("total_amount") or 0):
+        fee["payment_status"] = "paid"
+    elif paid > 0:
+        fee["payment_status"] = "partial"
+    elif fee.get("due_date") and str(fee["due_date"])[:10] < date.today().isoformat():
+        fee["payment_status"] = "overdue"
+    else:
+        fee["payment_status"] = "pending"
+    client._invalidate("fees", ["amount_paid", "payment_status"])
+
+
+def _book_availability(client: FakeSupabase, new: Dict, old: Optional[Dict]) -> None:
+    """update_book_availability(): decrement on loan, increment on return."""
+    books = client._lookup("library_books", "id", new.get("book_id"))
+    if not books:
+        return
+    if old is None:
+        books[0]["available_copies"] = (books[0].get("available_copies") or 0) - 1
+    elif new.get("loan_status") == "returned" and old.get("loan_status") != "returned":
+        books[0]["available_copies"] = (books[0].get("available_copies") or 0) + 1
+    client._invalidate("library_books", ["available_copies"])
+
+
+def _overdue_fine(client: FakeSupabase, new: Dict, old: Optional[Dict]) -> None:
+    """calculate_overdue_fine(): Rs 5/day once an active loan is past due."""
+    due = str(new.get("due_date") or "")[:10]
+    if not due:
+        return
+    today = date.today()
+    if new.get("loan_status") == "overdue" or (new.get("loan_status") == "active" and due < today.isoformat()):
+        days_overdue = (today - date.fromisoformat(due)).days
+        new["fine_amount"] = days_overdue * 5.0
+        new["loan_status"] = "overdue"
+
+
+def _count_book_loan(client: FakeSupabase, new: Dict, old: Optional[Dict]) -> None:
+    """count_book_loan(): bump the per-book, per-day loan counter."""
+    if not new.get("book_id"):
+        return
+    loan_date = str(new.get("issue_date") or _now())[:10]
+    for row in client._lookup("book_loan_daily_counts", "book_id", new["book_id"]):
+        if row.get("loan_date") == loan_date:
+            row["loan_count"] += 1
+            client._invalidate("book_loan_daily_counts", ["loan_count"])
+            return
+    client._insert("book_loan_daily_counts", {"book_id": new["book_id"], "loan_date": loan_date, "loan_count": 1})
+
+
+def _register_schema_triggers(client: FakeSupabase) -> None:
+    client.register_trigger("fee_transactions", TRIGGER_AFTER_INSERT, _fee_status_after_payment)
+    client.register_trigger("book_loans", TRIGGER_AFTER_INSERT, _book_availability)
+    client.register_trigger("book_loans", TRIGGER_AFTER_UPDATE, _book_availability)
+    client.register_trigger("book_loans", TRIGGER_BEFORE_UPDATE, _overdue_fine)
+    client.register_trigger("book_loans", TRIGGER_AFTER_INSERT, _count_book_loan)
+
+
+# ============================================================================
+# Python versions of the migrations/*.sql functions (called via rpc())
+# ============================================================================
+
+def _reserve_library_book(
+    client: FakeSupabase,
+    p_student_id: str,
+    p_book_title: str,
+    p_loan_days: int = 14,
+    p_max_active_loans: int = 3
+) -> Dict[str, Any]:
+    """reserve_library_book(): checks and loan insert in one call (rpc() holds the client lock)."""
+    if not client._lookup("students", "id", p_student_id):
+        return {"success": False, "code": "student_not_found", "message": "Student not found"}
+
+    matches = [
+        book for book in client._rows("library_books")
+        if _like(f"%{p_book_title}%", book.get("title"), True)
+    ]
+    if not matches:
+        return {"success": False, "code": "book_not_found", "message": f"Book not found: {p_book_title}"}
+    book = min(matches, key=lambda b: (not (b.get("available_copies") or 0) > 0, b.get("title") or ""))
+
+    if (book.get("available_copies") or 0) <= 0:
+        return {"success": False, "code": "unavailable",
+                "message": f"Book '{book['title']}' is currently not available. All copies are issued."}
+
+    loans = client._lookup("book_loans", "student_id", p_student_id)
+    active = [loan for loan in loans if loan.get("loan_status") == "active"]
+    if any(loan.get("book_id") == book["id"] for loan in active):
+        return {"success": False, "code": "already_issued",
+                "message": "You already have this book issued. Please return it before borrowing again."}
+    if len(active) >= p_max_active_loans:
+        return {"success": False, "code": "loan_limit",
+                "message": f"You have reached the maximum limit of {p_max_active_loans} books. "
+                           f"Please return a book before issuing another."}
+
+    owing = [loan for loan in loans
+             if loan.get("loan_status") == "overdue" or float(loan.get("fine_amount") or 0) > 0]
+    if owing:
+        total_fine = sum(float(loan.get("fine_amount") or 0) for loan in owing)
+        return {"success": False, "code": "pending_fines",
+                "message": f"Cannot issue new books. You have overdue books or pending fines of "
+                           f"₹{total_fine:.2f}. Please clear them first."}
+
+    # The book_loans insert trigger decrements available_copies
+    loan = client.table("book_loans").insert({
+        "student_id": p_student_id,
+        "book_id": book["id"],
+        "issue_date": _now(),
+        "due_date": (date.today() + timedelta(days=p_loan_days)).isoformat(),
+        "loan_status": "active",
+        "fine_amount": 0.0,
+    }).execute().data[0]
+
+    return {
+        "success": True,
+        "message": f"Book '{book['title']}' has been successfully issued!",
+        "loan_details": {
+            "loan_id": loan["id"],
+            "book_title": book["title"],
+            "author": book.get("author"),
+            "isbn": book.get("isbn"),
+            "issue_date": loan["issue_date"],
+            "due_date": loan["due_date"],
+            "loan_period_days": p_loan_days,
+        },
+    }
+
+
+def _timestamp(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _waiting(client: FakeSupabase, event_id: str) -> List[Dict[str, Any]]:
+    return sorted(
+        (w for w in client._lookup("event_waitlist", "event_id", event_id) if w.get("status") == "waiting"),
+        key=lambda w: w.get("created_at") or ""
+    )
+
+
+def _register_for_event(
+    client: FakeSupabase,
+    p_event_id: str,
+    p_student_id: str,
+    p_join_waitlist: bool = False
+) -> Dict[str, Any]:
+    """register_for_event(): capacity-checked seat claim, with optional waitlist."""
+    events = client._lookup("events", "id", p_event_id)
+    if not events:
+        return {"success": False, "status": "event_not_found", "message": "Event not found"}
+    event = events[0]
+
+    if event.get("event_status") in ("completed", "cancelled"):
+        return {"success": False, "status": "closed", "message": f"Event is {event['event_status']}"}
+    deadline = _timestamp(event.get("registration_deadline"))
+    if deadline and datetime.now(timezone.utc) > deadline:
+        return {"success": False, "status": "closed", "message": "Registration deadline has passed"}
+
+    existing = [
+        p for p in client._lookup("event_participation", "event_id", p_event_id)
+        if p.get("student_id") == p_student_id
+    ]
+    if existing and existing[0].get("attendance_status") != "cancelled":
+        return {"success": False, "status": "already_registered",
+                "message": f"You are already registered for '{event['title']}'"}
+
+    capacity = event.get("max_participants")
+    count = event.get("registered_count") or 0
+    if capacity is not None and capacity > 0 and count >= capacity:
+        if not p_join_waitlist:
+            return {"success": False, "status": "full", "message": "Event is full"}
+        entries = [w for w in client._lookup("event_waitlist", "event_id", p_event_id)
+                   if w.get("student_id") == p_student_id]
+        if not entries:
+            client._insert("event_waitlist", {"event_id": p_event_id, "student_id": p_student_id})
+        elif entries[0].get("status") != "waiting":
+            client._update("event_waitlist", entries[:1],
+                           {"status": "waiting", "created_at": _now(), "promoted_at": None})
+        queue = [w["student_id"] for w in _waiting(client, p_event_id)]
+        position = queue.index(p_student_id) + 1
+        return {"success": True, "status": "waitlisted",
+                "message": f"'{event['title']}' is full. You are #{position} on the waitlist.",
+                "waitlist_position": position, "event": dict(event)}
+
+    event = client._update("events", events, {"registered_count": count + 1})[0]
+    registration_date = datetime.now(timezone.utc).isoformat()
+    if existing:
+        registration = client._update("event_participation", existing[:1], {
+            "attendance_status": "registered", "registration_date": registration_date
+        })[0]
+    else:
+        registration = client._insert("event_participation", {
+            "event_id": p_event_id, "student_id": p_student_id,
+            "registration_date": registration_date, "attendance_status": "registered",
+        })[0]
+
+    waiting = [w for w in _waiting(client, p_event_id) if w.get("student_id") == p_student_id]
+    if waiting:
+        client._update("event_waitlist", waiting, {"status": "promoted", "promoted_at": _now()})
+
+    return {
+        "success": True,
+        "status": "reregistered" if existing else "registered",
+        "registration_id": registration["id"],
+        "registered_count": event["registered_count"],
+        "event": event,
+    }
+
+
+def _cancel_event_registration(client: FakeSupabase, p_event_id: str, p_student_id: str) -> Dict[str, Any]:
+    """cancel_event_registration(): free the seat or hand it to the oldest waiting student."""
+    not_registered = {"success": False, "status": "not_registered",
+                      "message": "No active registration found for this event"}
+    events = client._lookup("events", "id", p_event_id)
+    if not events:
+        return not_registered
+    event = events[0]
+
+    start = _timestamp(event.get("start_date"))
+    if start and datetime.now(timezone.utc) >= start:
+        return {"success": False, "status": "started",
+                "message": "Cannot cancel registration. Event has already started or ended."}
+
+    registrations = [
+        p for p in client._lookup("event_participation", "event_id", p_event_id)
+        if p.get("student_id") == p_student_id and p.get("attendance_status") == "registered"
+    ]
+    if not registrations:
+        waiting = [w for w in _waiting(client, p_event_id) if w.get("student_id") == p_student_id]
+        if waiting:
+            client._update("event_waitlist", waiting, {"status": "cancelled"})
+            return {"success": True, "status": "left_waitlist",
+                    "message": f"Removed from the waitlist for '{event['title']}'", "event_title": event["title"]}
+        return not_registered
+
+    client._update("event_participation", registrations, {"attendance_status": "cancelled"})
+
+    queue = _waiting(client, p_event_id)
+    promoted = None
+    if queue:
+        promoted = queue[0]["student_id"]
+        previous = [p for p in client._lookup("event_participation", "event_id", p_event_id)
+                    if p.get("student_id") == promoted]
+        values = {"attendance_status": "registered", "registration_date": datetime.now(timezone.utc).isoformat()}
+        if previous:
+            client._update("event_participation", previous[:1], values)
+        else:
+            client._insert("event_participation", {"event_id": p_event_id, "student_id": promoted, **values})
+        client._update("event_waitlist", queue[:1], {"status": "promoted", "promoted_at": _now()})
+    else:
+        client._update("events", events, {"registered_count": max((event.get("registered_count") or 0) - 1, 0)})
+
+    return {
+        "success": True,
+        "status": "cancelled",
+        "message": f"Registration cancelled for '{event['title']}'",
+        "event_title": event["title"],
+        "promoted_student_id": promoted,
+    }
+
+
+def _record_fee_payment(
+    client: FakeSupabase,
+    p_fee_id: str,
+    p_amount: float,
+    p_idempotency_key: Optional[str] = None,
+    p_payment_method: Optional[str] = "cash",
+    p_payment_date: Optional[str] = None,
+    p_transaction_id: Optional[str] = None,
+    p_remarks: Optional[str] = None
+) -> Dict[str, Any]:
+    """record_fee_payment(): idempotent ledger insert; the fee_transactions trigger updates the fee."""
+    fees = client._lookup("fees", "id", p_fee_id)
+    if not fees:
+        return {"success": False, "code": "fee_not_found", "message": "Fee record not found"}
+
+    if p_idempotency_key is not None:
+        previous = client._lookup("fee_transactions", "idempotency_key", p_idempotency_key)
+        if previous:
+            transaction = previous[0]
+            if transaction.get("fee_id") != p_fee_id or float(transaction.get("amount") or 0) != float(p_amount):
+                return {"success": False, "code": "key_conflict",
+                        "message": "Idempotency key was already used for a different payment"}
+            return {"success": True, "status": "duplicate", "fee": dict(fees[0]), "transaction": dict(transaction)}
+
+    if p_amount is None or float(p_amount) <= 0:
+        return {"success": False, "code": "invalid_amount", "message": "Payment amount must be positive"}
+    if p_payment_method is not None and p_payment_method not in ("cash", "card", "upi", "netbanking", "cheque"):
+        return {"success": False, "code": "invalid_method",
+                "message": f"Unsupported payment method: {p_payment_method}"}
+
+    existing_reference = p_transaction_id and client._lookup("fee_transactions", "transaction_id", p_transaction_id)
+    if existing_reference:
+        return {"success": False, "code": "duplicate_transaction",
+                "message": f"Transaction ID {p_transaction_id} is already recorded"}
+
+    transaction = client._insert("fee_transactions", {
+        "fee_id": p_fee_id,
+        "student_id": fees[0].get("student_id"),
+        "amount": float(p_amount),
+        "payment_method": p_payment_method,
+        "transaction_id": p_transaction_id,
+        "transaction_date": f"{p_payment_date}T00:00:00" if p_payment_date else _now(),
+        "payment_status": "success",
+        "remarks": p_remarks,
+        "idempotency_key": p_idempotency_key,
+    })[0]
+    return {"success": True, "status": "recorded", "fee": dict(fees[0]), "transaction": transaction}
+
+
+def _apply_accruals(
+    client: FakeSupabase,
+    p_fees: Optional[List[Dict[str, Any]]] = None,
+    p_loans: Optional[List[Dict[str, Any]]] = None,
+    p_accrued_on: Optional[str] = None
+) -> Dict[str, Any]:
+    """apply_accruals(): bulk late fee / fine update for outstanding records."""
+    accrued_on = p_accrued_on or date.today().isoformat()
+    fees_updated = 0
+    for item in p_fees or []:
+        fees = [f for f in client._lookup("fees", "id", item["id"])
+                if f.get("payment_status") in ("pending", "partial", "overdue")]
+        for fee in fees:
+            status = "overdue" if fee.get("payment_status") == "pending" else fee.get("payment_status")
+            client._update("fees", [fee], {"late_fee": item["late_fee"], "late_fee_accrued_on": accrued_on,
+                                           "payment_status": status, "updated_at": _now()})
+            fees_updated += 1
+
+    loans_updated = 0
+    for item in p_loans or []:
+        loans = [l for l in client._lookup("book_loans", "id", item["id"])
+                 if l.get("loan_status") in ("active", "overdue")]
+        for loan in loans:
+            client._update("book_loans", [loan], {"fine_amount": item["fine_amount"], "loan_status": "overdue"})
+            loans_updated += 1
+    return {"fees_updated": fees_updated, "loans_updated": loans_updated}
+
+
+def _popular_books(client: FakeSupabase, p_since: Optional[str] = None, p_limit: int = 10) -> List[Dict[str, Any]]:
+    """popular_books(): sum the daily loan counters since a date, top p_limit."""
+    totals: Dict[str, int] = {}
+    for row in client._rows("book_loan_daily_counts"):
+        if p_since is None or row["loan_date"] >= str(p_since)[:10]:
+            totals[row["book_id"]] = totals.get(row["book_id"], 0) + row["loan_count"]
+    ranked = []
+    for book_id, count in totals.items():
+        books = client._lookup("library_books", "id", book_id)
+        if books:
+            book = books[0]
+            ranked.append({"book_id": book_id, "title": book.get("title"), "author": book.get("author"),
+                           "category": book.get("category"), "loan_count": count})
+    ranked.sort(key=lambda r: (-r["loan_count"], r["title"] or ""))
+    return ranked[:p_limit]
+
+
+def _reconcile_event_registered_counts(client: FakeSupabase) -> Dict[str, Any]:
+    """reconcile_event_registered_counts(): recount non-cancelled registrations per event."""
+    events = client._rows("events")
+    corrected = []
+    for event in events:
+        actual = sum(
+            1 for p in client._lookup("event_participation", "event_id", event.get("id"))
+            if p.get("attendance_status") != "cancelled"
+        )
+        if (event.get("registered_count") or 0) != actual:
+            corrected.append({"event_id": event["id"], "title": event.get("title"),
+                              "stored": event.get("registered_count") or 0, "actual": actual})
+            client._update("events", [event], {"registered_count": actual})
+    return {"checked": len(events), "corrected": len(corrected), "events": corrected}
+
+
+def _register_schema_functions(client: FakeSupabase) -> None:
+    client.register_rpc("reserve_library_book", _reserve_library_book)
+    client.register_rpc("register_for_event", _register_for_event)
+    client.register_rpc("cancel_event_registration", _cancel_event_registration)
+    client.register_rpc("reconcile_event_registered_counts", _reconcile_event_registered_counts)
+    client.register_rpc("record_fee_payment", _record_fee_payment)
+    client.register_rpc("apply_accruals", _apply_accruals)
+    client.register_rpc("popular_books", _popular_books)
+
+
+_fake_client: Optional[FakeSupabase] = None
+_fake_lock = threading.Lock()
+
+
+def get_fake_supabase(seed_path: Optional[str] = None) -> FakeSupabase:
+    """
+    Get the process-wide fake database (singleton pattern).
+
+    Args:
+        seed_path: JSON file of {table: [rows]} loaded on first use
+
+    Returns:
+        FakeSupabase: Shared in-memory client
+    """
+    global _fake_client
+    if _fake_client is None:
+        with _fake_lock:
+            if _fake_client is None:
+                client = FakeSupabase()
+                if seed_path:
+                    client.load_seed(seed_path)
+                _fake_client = client
+                logger.info("Using in-memory fake Supabase backend")
+    return _fake_client
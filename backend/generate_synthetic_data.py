@@ -0,0 +1,601 @@
+"""
+Synthetic Data Generator
+Builds large, realistic campus datasets for scale and performance testing.
+
+seed_database.py creates 4 hand-written demo students one insert at a time.
+This script generates a whole campus from a seeded RNG - thousands of
+students with attendance, marks, fees, library loans, events and a
+timetable - and writes every table to the target in large batched
+inserts. Attendance and marks, which make up most of the rows, are
+generated lazily and streamed batch by batch; the per-student tables
+(students, fees, loans, event registrations) are built in memory first.
+The json target keeps the whole dataset in memory until it is dumped.
+
+Targets:
+- supabase: the configured project (uses SUPABASE_SERVICE_ROLE_KEY)
+- json:     a seed file for FAKE_DB_SEED_PATH
+
+To fill an in-process FakeSupabase (tests, load runs), call
+generate_campus() with the client directly.
+
+Usage:
+    python generate_synthetic_data.py --students 30000 --target json --out campus_30k.json
+    python generate_synthetic_data.py --students 2000 --attendance-days 40 --target supabase
+"""
+
+import argparse
+import bisect
+import itertools
+import random
+import time
+import uuid
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from postgrest import ReturnMethod
+
+DEPARTMENTS = {
+    "Computer Science": 0.35,
+    "Information Technology": 0.20,
+    "Electronics": 0.20,
+    "Mechanical": 0.15,
+    "Civil": 0.10,
+}
+FIRST_NAMES = ["Aarav", "Priya", "Rohan", "Sneha", "Arjun", "Ananya", "Vikram", "Kavya", "Rahul", "Isha",
+               "Aditya", "Meera", "Karan", "Pooja", "Siddharth", "Divya", "Nikhil", "Riya", "Amit", "Neha"]
+LAST_NAMES = ["Sharma", "Patel", "Reddy", "Nair", "Gupta", "Iyer", "Singh", "Kumar", "Das", "Joshi",
+              "Mehta", "Rao", "Verma", "Khan", "Pillai", "Bose", "Chopra", "Menon", "Jain", "Mishra"]
+SUBJECT_AREAS = ["Mathematics", "Programming", "Data Structures", "Algorithms", "Databases", "Networks",
+                 "Operating Systems", "Electronics", "Signals", "Machine Learning", "Mechanics",
+                 "Thermodynamics", "Software Engineering", "Compilers", "Cloud Computing", "Security"]
+BOOK_CATEGORIES = ["Computer Science", "AI/ML", "Software Engineering", "Electronics", "Mechanical", "Mathematics"]
+EVENT_TYPES = ["workshop", "seminar", "cultural", "sports", "fest", "academic"]
+TIME_SLOTS = [("09:00", "10:00"), ("10:00", "11:00"), ("11:00", "12:00"), ("12:00", "13:00"),
+              ("14:00", "15:00"), ("15:00", "16:00"), ("16:00", "17:00")]
+ROOMS = ["301", "302", "303", "304", "401", "402", "Lab-1", "Lab-2", "Lab-3"]
+PAYMENT_METHODS = ["upi", "card", "netbanking", "cash", "cheque"]
+
+SEMESTER_FEE = 50000.0
+FINE_PER_DAY = 5.0
+LOAN_PERIOD_DAYS = 14
+
+# Current-semester fee outcomes: (status, weight)
+FEE_OUTCOMES = [("paid", 0.55), ("partial", 0.25), ("pending", 0.12), ("overdue", 0.08)]
+# Loan outcomes: (status, weight)
+LOAN_OUTCOMES = [("returned", 0.70), ("active", 0.22), ("overdue", 0.08)]
+
+
+def _weighted(rng: random.Random, options: Dict[str, float]) -> str:
+    return rng.choices(list(options), weights=list(options.values()))[0]
+
+
+def _uuid(rng: random.Random) -> str:
+    """Seeded UUID4, so the same seed reproduces the same primary keys."""
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _clip(value: float, low: float, high: float) -> float:
+    return max(low, min(high, value))
+
+
+def _class_days(days: int, today: date) -> List[date]:
+    """The last `days` weekdays before today, oldest first."""
+    result = []
+    current = today - timedelta(days=1)
+    while len(result) < days:
+        if current.weekday() < 5:
+            result.append(current)
+        current -= timedelta(days=1)
+    return result[::-1]
+
+
+class BatchWriter:
+    """
+    Streams rows into a Supabase-compatible client in fixed-size batches.
+
+    IDs are generated client-side, so inserts ask for minimal returns and
+    nothing is read back.
+    """
+
+    def __init__(self, client, batch_size: int = 1000):
+        self.client = client
+        self.batch_size = batch_size
+        self.counts: Dict[str, int] = {}
+
+    def write(self, table: str, rows: Iterable[Dict[str, Any]]) -> int:
+        started = time.perf_counter()
+        written = 0
+        iterator = iter(rows)
+        while True:
+            batch = list(itertools.islice(iterator, self.batch_size))
+            if not batch:
+                break
+            self.client.table(table).insert(batch, returning=ReturnMethod.minimal).execute()
+            written += len(batch)
+        elapsed = time.perf_counter() - started
+        self.counts[table] = self.counts.get(table, 0) + written
+        rate = written / elapsed if elapsed > 0 else 0
+        print(f"   ✓ {table}: {written:,} rows in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+        return written
+
+
+def generate_subjects(rng: random.Random, institution_id: str, semesters: int, per_semester: int) -> List[Dict]:
+    subjects = []
+    for semester in range(1, semesters + 1):
+        for n in range(per_semester):
+            area = SUBJECT_AREAS[(semester * per_semester + n) % len(SUBJECT_AREAS)]
+            subjects.append({
+                "id": _uuid(rng),
+                "institution_id": institution_id,
+                "subject_code": f"SYN{semester}{n:02d}",
+                "subject_name": f"{area} {['I', 'II', 'III', 'IV'][(semester - 1) // 2 % 4]}",
+                "department": _weighted(rng, DEPARTMENTS),
+                "semester": semester,
+                "credits": rng.choice([3, 3, 4, 4, 2]),
+                "instructor_name": f"Dr. {rng.choice(LAST_NAMES)}",
+            })
+    return subjects
+
+
+def generate_timetable(rng: random.Random, institution_id: str, subjects: List[Dict]) -> List[Dict]:
+    """Each subject meets 3-4 times a week in a per-semester grid (1=Monday ... 5=Friday)."""
+    by_semester: Dict[int, List[Dict]] = {}
+    for subject in subjects:
+        by_semester.setdefault(subject["semester"], []).append(subject)
+
+    rows = []
+    for semester, semester_subjects in by_semester.items():
+        free = {(day, slot) for day in range(1, 6) for slot in TIME_SLOTS}
+        for subject in semester_subjects:
+            meetings = rng.sample(range(1, 6), rng.choice([3, 4]))
+            for day in meetings:
+                slots = [slot for slot in TIME_SLOTS if (day, slot) in free]
+                if not slots:
+                    continue
+                start, end = rng.choice(slots)
+                free.discard((day, (start, end)))
+                rows.append({
+                    "id": _uuid(rng),
+                    "institution_id": institution_id,
+                    "semester": semester,
+                    "day_of_week": day,
+                    "start_time": start,
+                    "end_time": end,
+                    "subject_id": subject["id"],
+                    "room_number": rng.choice(ROOMS),
+                    "session_type": rng.choices(["lecture", "lab", "tutorial"], weights=[0.7, 0.2, 0.1])[0],
+                })
+    return rows
+
+
+def generate_students(
+    rng: random.Random,
+    institution_id: str,
+    count: int,
+    semesters: int,
+    password_hash: str
+) -> List[Dict]:
+    current_year = date.today().year
+    students = []
+    for i in range(count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        semester = rng.randint(1, semesters)
+        admission_year = current_year - (semester - 1) // 2
+        department = _weighted(rng, DEPARTMENTS)
+        code = "".join(word[0] for word in department.split())[:2].upper()
+        roll_number = f"{code}{admission_year}{i:06d}"
+        students.append({
+            "id": _uuid(rng),
+            "institution_id": institution_id,
+            "student_id": roll_number,
+            "roll_number": roll_number,
+            "first_name": first,
+            "last_name": last,
+            "full_name": f"{first} {last}",
+            "email": f"{first.lower()}.{last.lower()}.{i}@synthetic.bharatace.edu.in",
+            "password_hash": password_hash,
+            "phone": f"+91 9{rng.randint(100000000, 999999999)}",
+            "course": f"B.Tech {department}",
+            "department": department,
+            "semester": semester,
+            "admission_year": admission_year,
+            "cgpa": round(_clip(rng.gauss(7.4, 0.9), 4.0, 10.0), 2),
+            # Attendance propensity (mean ~0.82, ~15% of students fall under 75%); not a column
+            "_attendance_rate": rng.betavariate(9, 2),
+        })
+    return students
+
+
+def iter_attendance(
+    rng: random.Random,
+    students: List[Dict],
+    subjects_by_semester: Dict[int, List[Dict]],
+    meeting_days: Dict[str, set],
+    class_days: List[date]
+) -> Iterator[Dict]:
+    for student in students:
+        for subject in subjects_by_semester.get(student["semester"], []):
+            rate = _clip(student["_attendance_rate"] + rng.gauss(0, 0.05), 0.3, 1.0)
+            days = meeting_days.get(subject["id"], set())
+            for day in class_days:
+                if day.isoweekday() not in days:
+                    continue
+                roll = rng.random()
+                if roll < rate:
+                    status = "late" if roll > rate - 0.04 else "present"
+                else:
+                    status = "absent"
+                yield {
+                    "id": _uuid(rng),
+                    "student_id": student["id"],
+                    "subject_id": subject["id"],
+                    "date": day.isoformat(),
+                    "status": status,
+                }
+
+
+def iter_marks(rng: random.Random, students: List[Dict], subjects_by_semester: Dict[int, List[Dict]]) -> Iterator[Dict]:
+    """Completed semesters get midterm + final; the current one midterm, quiz and assignment."""
+    today = date.today()
+    for student in students:
+        base = student["cgpa"] * 10 - 3
+        for semester in range(1, student["semester"] + 1):
+            current = semester == student["semester"]
+            exams = ["midterm", "quiz", "assignment"] if current else ["midterm", "final"]
+            months_ago = (student["semester"] - semester) * 6
+            for subject in subjects_by_semester.get(semester, []):
+                for exam_type in exams:
+                    max_marks = 100 if exam_type in ("midterm", "final") else (20 if exam_type == "quiz" else 10)
+                    percentage = _clip(rng.gauss(base, 8), 20, 99)
+                    yield {
+                        "id": _uuid(rng),
+                        "student_id": student["id"],
+                        "subject_id": subject["id"],
+                        "exam_type": exam_type,
+                        "max_marks": max_marks,
+                        "obtained_marks": round(percentage / 100 * max_marks, 2),
+                        "exam_date": (today - timedelta(days=months_ago * 30 + rng.randint(7, 60))).isoformat(),
+                    }
+
+
+def generate_fees(rng: random.Random, students: List[Dict]) -> Iterator[tuple]:
+    """
+    Yield (fee, [transactions]) per student-semester.
+
+    amount_paid always equals the sum of the successful transactions, so
+    the fee_transactions trigger leaves it unchanged.
+    """
+    today = date.today()
+    for student in students:
+        for semester in range(1, student["semester"] + 1):
+            current = semester == student["semester"]
+            status = rng.choices([s for s, _ in FEE_OUTCOMES], weights=[w for _, w in FEE_OUTCOMES])[0] if current else "paid"
+            start_year = student["admission_year"] + (semester - 1) // 2
+            if current:
+                due = today + timedelta(days=rng.randint(-30, -1) if status == "overdue" else rng.randint(-10, 45))
+            else:
+                due = today - timedelta(days=(student["semester"] - semester) * 180)
+            paid = {
+                "paid": SEMESTER_FEE,
+                "partial": round(SEMESTER_FEE * rng.uniform(0.2, 0.9), -2),
+                "pending": 0.0,
+                "overdue": 0.0,
+            }[status]
+            late_fee = min((today - due).days * 200, SEMESTER_FEE * 0.2) if status == "overdue" else 0.0
+            fee = {
+                "id": _uuid(rng),
+                "student_id": student["id"],
+                "semester": semester,
+                "academic_year": f"{start_year}-{start_year + 1}",
+                "total_amount": SEMESTER_FEE,
+                "amount_paid": paid,
+                "due_date": due.isoformat(),
+                "payment_status": status,
+                "late_fee": late_fee,
+            }
+            transactions = []
+            if paid:
+                installments = 1 if status == "paid" and rng.random() < 0.7 else rng.randint(1, 3)
+                amounts = [round(paid / installments, 2)] * installments
+                amounts[-1] = round(paid - sum(amounts[:-1]), 2)
+                for amount in amounts:
+                    transactions.append({
+                        "id": _uuid(rng),
+                        "fee_id": fee["id"],
+                        "student_id": student["id"],
+                        "amount": amount,
+                        "payment_method": rng.choice(PAYMENT_METHODS),
+                        "transaction_id": f"SYN{rng.getrandbits(64):016X}",
+                        "transaction_date": datetime.combine(
+                            due - timedelta(days=rng.randint(0, 40)), datetime.min.time()
+                        ).isoformat(),
+                        "payment_status": "success",
+                    })
+            yield fee, transactions
+
+
+def generate_books(rng: random.Random, institution_id: str, count: int) -> List[Dict]:
+    """Catalogue ordered by popularity rank; popular titles stock more copies."""
+    books = []
+    for i in range(count):
+        copies = max(1, int(round(10 / (1 + i / max(1, count / 10)))) + rng.randint(0, 2))
+        books.append({
+            "id": _uuid(rng),
+            "institution_id": institution_id,
+            "isbn": f"979-{i:09d}",
+            "title": f"{rng.choice(SUBJECT_AREAS)}: {rng.choice(['Principles', 'Foundations', 'A Practical Guide', 'Advanced Topics', 'Handbook'])} Vol. {i + 1}",
+            "author": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "publisher": rng.choice(["Pearson", "McGraw Hill", "Wiley", "MIT Press", "O'Reilly"]),
+            "publication_year": rng.randint(1990, date.today().year),
+            "category": rng.choice(BOOK_CATEGORIES),
+            "total_copies": copies,
+            "available_copies": copies,
+            "shelf_location": f"{chr(65 + i % 26)}-{i % 40 + 1}",
+        })
+    return books
+
+
+def generate_loans(rng: random.Random, students: List[Dict], books: List[Dict], count: int) -> List[Dict]:
+    """
+    Loans with Zipf-distributed book popularity.
+
+    Open (active/overdue) loans never exceed a book's copies; excess draws
+    become returned loans.
+    """
+    weights = [1 / (rank + 1) ** 1.1 for rank in range(len(books))]
+    cumulative = list(itertools.accumulate(weights))
+    open_loans = [0] * len(books)
+    now = datetime.combine(date.today(), datetime.min.time())
+    loans = []
+    for _ in range(count):
+        index = min(bisect.bisect(cumulative, rng.random() * cumulative[-1]), len(books) - 1)
+        book = books[index]
+        status = rng.choices([s for s, _ in LOAN_OUTCOMES], weights=[w for _, w in LOAN_OUTCOMES])[0]
+        if status != "returned" and open_loans[index] >= book["total_copies"]:
+            status = "returned"
+
+        if status == "returned":
+            issued = now - timedelta(days=rng.randint(15, 240), hours=rng.randint(-15, -9))
+            returned = issued + timedelta(days=rng.randint(1, 20))
+        elif status == "active":
+            issued = now - timedelta(days=rng.randint(1, LOAN_PERIOD_DAYS - 1), hours=rng.randint(-15, -9))
+            returned = None
+        else:
+            issued = now - timedelta(days=rng.randint(LOAN_PERIOD_DAYS + 1, 75), hours=rng.randint(-15, -9))
+            returned = None
+        due = (issued + timedelta(days=LOAN_PERIOD_DAYS)).date()
+
+        fine = 0.0
+        if status == "overdue":
+            fine = (now.date() - due).days * FINE_PER_DAY
+        elif returned and returned.date() > due:
+            fine = (returned.date() - due).days * FINE_PER_DAY
+        if status != "returned":
+            open_loans[index] += 1
+
+        loans.append({
+            "id": _uuid(rng),
+            "book_id": book["id"],
+            "student_id": rng.choice(students)["id"],
+            "issue_date": issued.isoformat(),
+            "due_date": due.isoformat(),
+            "return_date": returned.isoformat() if returned else None,
+            "loan_status": status,
+            "fine_amount": fine,
+        })
+
+    for book, open_count in zip(books, open_loans):
+        book["available_copies"] = book["total_copies"] - open_count
+    return loans
+
+
+def generate_events(rng: random.Random, institution_id: str, count: int) -> List[Dict]:
+    """A third of the events are in the past; the rest spread over the next 90 days."""
+    now = datetime.now(timezone.utc)
+    events = []
+    for i in range(count):
+        event_type = rng.choice(EVENT_TYPES)
+        offset = rng.randint(-60, -1) if i % 3 == 0 else rng.randint(2, 90)
+        start = (now + timedelta(days=offset)).replace(hour=rng.choice([10, 14, 17]), minute=0, second=0, microsecond=0)
+        events.append({
+            "id": _uuid(rng),
+            "institution_id": institution_id,
+            "title": f"{rng.choice(SUBJECT_AREAS)} {event_type.title()} {i + 1}",
+            "description": f"Synthetic {event_type} event",
+            "event_type": event_type,
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(hours=rng.choice([2, 3, 8, 48]))).isoformat(),
+            "location": rng.choice(["Auditorium", "Seminar Hall A", "Seminar Hall B", "Sports Complex", "Campus Grounds"]),
+            "organizer": rng.choice(["CS Department", "Tech Club", "Student Council", "Placement Cell", "Sports Committee"]),
+            "max_participants": rng.choice([50, 100, 200, 500, 1000]),
+            "registration_deadline": (start - timedelta(days=1)).isoformat(),
+            "event_status": "completed" if offset < 0 else "scheduled",
+        })
+    return events
+
+
+def iter_event_participation(rng: random.Random, students: List[Dict], events: List[Dict]) -> Iterator[Dict]:
+    """Most students register for 0-2 events; capacities are respected."""
+    remaining = {event["id"]: event["max_participants"] for event in events}
+    for student in students:
+        wanted = rng.choices([0, 1, 2, 3], weights=[0.35, 0.35, 0.2, 0.1])[0]
+        for event in rng.sample(events, min(wanted, len(events))):
+            if remaining[event["id"]] <= 0:
+                continue
+            remaining[event["id"]] -= 1
+            past = event["event_status"] == "completed"
+            yield {
+                "id": _uuid(rng),
+                "event_id": event["id"],
+                "student_id": student["id"],
+                "registration_date": (
+                    datetime.fromisoformat(event["start_date"]) - timedelta(days=rng.randint(2, 30))
+                ).isoformat(),
+                "attendance_status": rng.choice(["attended", "attended", "absent"]) if past else "registered",
+            }
+
+
+def get_or_create_institution(client, rng: random.Random) -> str:
+    existing = client.table("institutions").select("id").eq("code", "BACE2023").execute()
+    if existing.data:
+        return existing.data[0]["id"]
+    institution_id = _uuid(rng)
+    client.table("institutions").insert({
+        "id": institution_id,
+        "name": "BharatAce College of Engineering",
+        "code": "BACE2023",
+        "email": "info@bharatace.edu.in",
+    }).execute()
+    return institution_id
+
+
+def generate_campus(
+    client,
+    students: int = 1000,
+    subjects_per_semester: int = 6,
+    semesters: int = 8,
+    attendance_days: int = 60,
+    loans: Optional[int] = None,
+    books: Optional[int] = None,
+    events: int = 40,
+    batch_size: int = 1000,
+    seed: int = 42,
+    password: str = "password123"
+) -> Dict[str, int]:
+    """
+    Generate a synthetic campus and stream it into `client`.
+
+    Args:
+        client: Supabase client or FakeSupabase instance
+        students: Number of students
+        subjects_per_semester: Subjects offered each semester
+        semesters: Number of semesters
+        attendance_days: Class days (weekdays) of attendance history
+        loans: Library loans to create (default: one per student)
+        books: Catalogue size (default: students / 20, at least 50)
+        events: Number of events
+        batch_size: Rows per insert call
+        seed: RNG seed; the same arguments produce the same data on a given day
+        password: Login password shared by every generated student
+
+    Returns:
+        Rows written per table
+    """
+    from auth import hash_password
+
+    rng = random.Random(seed)
+    writer = BatchWriter(client, batch_size=batch_size)
+    loans = students if loans is None else loans
+    books = max(50, students // 20) if books is None else books
+
+    print("=" * 80)
+    print(f"🏗️  GENERATING SYNTHETIC CAMPUS: {students:,} students, {semesters} semesters, "
+          f"{attendance_days} class days, {loans:,} loans")
+    print("=" * 80)
+    started = time.perf_counter()
+
+    institution_id = get_or_create_institution(client, rng)
+
+    subject_rows = generate_subjects(rng, institution_id, semesters, subjects_per_semester)
+    writer.write("subjects", subject_rows)
+    subjects_by_semester: Dict[int, List[Dict]] = {}
+    for subject in subject_rows:
+        subjects_by_semester.setdefault(subject["semester"], []).append(subject)
+
+    timetable_rows = generate_timetable(rng, institution_id, subject_rows)
+    writer.write("timetable", timetable_rows)
+    meeting_days: Dict[str, set] = {}
+    for entry in timetable_rows:
+        meeting_days.setdefault(entry["subject_id"], set()).add(entry["day_of_week"])
+
+    # bcrypt is deliberately slow - hash once and share it
+    student_rows = generate_students(rng, institution_id, students, semesters, hash_password(password))
+    writer.write("students", ({k: v for k, v in s.items() if not k.startswith("_")} for s in student_rows))
+
+    writer.write("attendance", iter_attendance(
+        rng, student_rows, subjects_by_semester, meeting_days, _class_days(attendance_days, date.today())
+    ))
+    writer.write("marks", iter_marks(rng, student_rows, subjects_by_semester))
+
+    fees, transactions = [], []
+    for fee, fee_transactions in generate_fees(rng, student_rows):
+        fees.append(fee)
+        transactions.extend(fee_transactions)
+    writer.write("fees", fees)
+    writer.write("fee_transactions", transactions)
+    del fees, transactions
+
+    book_rows = generate_books(rng, institution_id, books)
+    loan_rows = generate_loans(rng, student_rows, book_rows, loans)
+    # The book_loans insert trigger decrements available_copies for every loan,
+    # so books go in fully stocked and are corrected once the loans are written
+    final_available = {book["id"]: book["available_copies"] for book in book_rows}
+    writer.write("library_books", ({**book, "available_copies": book["total_copies"]} for book in book_rows))
+    writer.write("book_loans", loan_rows)
+    for chunk_start in range(0, len(book_rows), batch_size):
+        chunk = book_rows[chunk_start:chunk_start + batch_size]
+        client.table("library_books").upsert(
+            [{**book, "available_copies": final_available[book["id"]]} for book in chunk],
+            on_conflict="id"
+        ).execute()
+
+    # events.registered_count is the capacity counter kept by register_for_event(),
+    # so it is filled in from the registrations before either table is written
+    event_rows = generate_events(rng, institution_id, events)
+    participation_rows = list(iter_event_participation(rng, student_rows, event_rows))
+    registered = Counter(p["event_id"] for p in participation_rows if p["attendance_status"] != "cancelled")
+    writer.write("events", ({**event, "registered_count": registered[event["id"]]} for event in event_rows))
+    writer.write("event_participation", participation_rows)
+
+    elapsed = time.perf_counter() - started
+    total = sum(writer.counts.values())
+    print("=" * 80)
+    print(f"✅ {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    print(f"🔑 Student password: {password}")
+    print("=" * 80)
+    return writer.counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic BharatAce campus dataset")
+    parser.add_argument("--students", type=int, default=1000)
+    parser.add_argument("--subjects-per-semester", type=int, default=6)
+    parser.add_argument("--semesters", type=int, default=8)
+    parser.add_argument("--attendance-days", type=int, default=60, help="Weekdays of attendance history")
+    parser.add_argument("--loans", type=int, default=None, help="Library loans (default: one per student)")
+    parser.add_argument("--books", type=int, default=None, help="Catalogue size (default: students / 20)")
+    parser.add_argument("--events", type=int, default=40)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--target", choices=["supabase", "json"], default="json")
+    parser.add_argument("--out", default="synthetic_seed.json", help="Output file for --target json")
+    args = parser.parse_args()
+
+    if args.target == "supabase":
+        from database import get_supabase_admin
+        client = get_supabase_admin()
+    else:
+        from fake_supabase import FakeSupabase
+        client = FakeSupabase()
+
+    generate_campus(
+        client,
+        students=args.students,
+        subjects_per_semester=args.subjects_per_semester,
+        semesters=args.semesters,
+        attendance_days=args.attendance_days,
+        loans=args.loans,
+        books=args.books,
+        events=args.events,
+        batch_size=args.batch_size,
+        seed=args.seed,
+    )
+
+    if args.target == "json":
+        client.dump(args.out)
+        print(f"💾 Wrote {args.out} - load it with DATABASE_BACKEND=fake FAKE_DB_SEED_PATH={args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+LLM Single-Flight and Prompt Cache
+Deduplicates identical LLM completions during traffic spikes.
+
+- Single-flight: concurrent calls with the same prompt share one in-flight
+  completion instead of each hitting Gemini.
+- Prompt cache: a bounded LRU (with TTL) of recent prompt -> completion
+  results, used only for prompts the caller marks as cacheable
+  (non-personalized, e.g. anonymous questions with no session history).
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from agent_metrics import mark_cache_hit
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlightLLM:
+    """
+    Wrapper around a LlamaIndex LLM adding single-flight coalescing and an LRU.
+
+    Anything other than acomplete() is delegated to the wrapped LLM, so the
+    wrapper can stand in wherever the agent expects the raw LLM.
+    """
+
+    def __init__(self, llm, cache_size: int = 512, ttl_seconds: float = 300.0):
+        self._llm = llm
+        self.cache_size = cache_size
+        self.ttl_seconds = ttl_seconds
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.stats = {
+            "calls": 0,
+            "cache_hits": 0,
+            "coalesced": 0,
+            "completions": 0
+        }
+
+    def __getattr__(self, name):
+        return getattr(self._llm, name)
+
+    @property
+    def wrapped(self):
+        """The underlying LLM."""
+        return self._llm
+
+    @staticmethod
+    def _key(prompt: str, kwargs: Dict) -> str:
+        raw = prompt if not kwargs else f"{prompt}\x00{sorted(kwargs.items())!r}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[Any]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return value
+
+    def _cache_put(self, key: str, value: Any) -> None:
+        self._cache[key] = (time.monotonic(), value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def acomplete(self, prompt: str, cacheable: bool = False, **kwargs) -> Any:
+        """
+        Complete a prompt, sharing in-flight calls and (optionally) cached results.
+
+        Args:
+            prompt: The prompt text
+            cacheable: True only for deterministic, non-personalized prompts
+            **kwargs: Passed through to the wrapped LLM's acomplete
+
+        Returns:
+            The wrapped LLM's CompletionResponse
+        """
+        self.stats["calls"] += 1
+        key = self._key(prompt, kwargs)
+
+        if cacheable:
+            cached = self._cache_get(key)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                mark_cache_hit()
+                return cached
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            mark_cache_hit()
+        else:
+            self.stats["completions"] += 1
+            # Run as its own task so a cancelled caller (client disconnect)
+            # doesn't cancel the completion other callers are waiting on
+            task = asyncio.ensure_future(self._llm.acomplete(prompt, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._on_done(key, t, cacheable))
+
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: str, task: asyncio.Task, cacheable: bool) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if cacheable and not task.cancelled() and task.exception() is None:
+            self._cache_put(key, task.result())
+
+    def clear(self) -> None:
+        """Drop all cached completions (in-flight calls are left alone)."""
+        self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counters plus current cache occupancy."""
+        return {
+            **self.stats,
+            "inflight": len(self._inflight),
+            "cached_prompts": len(self._cache)
+        }
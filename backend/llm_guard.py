@@ -0,0 +1,228 @@
+"""
+Deadlines, Hedging and Circuit Breaking for LLM Calls
+Keeps one slow or failing Gemini response from stalling a whole /ask.
+
+- Deadline: every guarded call has a per-stage timeout.
+- Hedging: if the first attempt hasn't answered by the stage's recent p95
+  latency, a duplicate is fired and whichever finishes first wins.
+- Circuit breaker: after repeated failures, calls fail fast for a cool-down
+  period so the agent drops straight to its non-LLM fallbacks.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from agent_metrics import STAGE_INTENT, STAGE_RETRIEVAL, STAGE_SYNTHESIS, percentile
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+# Successful latencies needed before the observed p95 replaces the default hedge delay
+MIN_LATENCY_SAMPLES = 20
+
+
+class LLMUnavailableError(Exception):
+    """Raised when a guarded call times out or the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker.
+
+    closed -> open after `failure_threshold` failures in a row; open -> half
+    open after `reset_seconds`, where one probe call decides whether to close
+    again or re-open.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == BREAKER_CLOSED:
+            return True
+        if self.state == BREAKER_OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+            self.state = BREAKER_HALF_OPEN
+            self._probe_in_flight = False
+        if self.state == BREAKER_HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self.state != BREAKER_CLOSED:
+            logger.info("🔌 LLM circuit breaker closed")
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        """Give back a half-open probe whose call was cancelled before finishing."""
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == BREAKER_HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != BREAKER_OPEN:
+                logger.warning(f"🔌 LLM circuit breaker opened after {self.failures} failures")
+            self.state = BREAKER_OPEN
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+
+class LLMGuard:
+    """
+    Runs LLM calls under a per-stage deadline with an optional hedge.
+
+    One breaker is shared by all stages since they all hit the same provider.
+    """
+
+    def __init__(
+        self,
+        deadlines: Dict[str, float],
+        hedge_enabled: bool = True,
+        min_hedge_delay: float = 0.5,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+        window: int = 200
+    ):
+        self.deadlines = deadlines
+        self.hedge_enabled = hedge_enabled
+        self.min_hedge_delay = min_hedge_delay
+        self.breaker = CircuitBreaker(failure_threshold, reset_seconds)
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._window = window
+        self.stats = {
+            "calls": 0,
+            "timeouts": 0,
+            "errors": 0,
+            "hedges_fired": 0,
+            "hedge_wins": 0,
+            "breaker_rejections": 0
+        }
+
+    def hedge_delay(self, stage: str) -> float:
+        """Recent p95 latency for the stage, or half the deadline until enough samples exist."""
+        deadline = self.deadlines.get(stage, 30.0)
+        samples = self._latencies.get(stage)
+        if samples and len(samples) >= MIN_LATENCY_SAMPLES:
+            delay = percentile(sorted(samples), 95)
+        else:
+            delay = deadline / 2
+        return min(max(delay, self.min_hedge_delay), deadline)
+
+    def _observe(self, stage: str, seconds: float) -> None:
+        self._latencies.setdefault(stage, deque(maxlen=self._window)).append(seconds)
+
+    async def run(
+        self,
+        stage: str,
+        call: Callable[[int], Awaitable[Any]],
+        hedge: bool = True
+    ) -> Any:
+        """
+        Run `call` under the stage deadline.
+
+        Args:
+            stage: Pipeline stage name (picks the deadline and latency history)
+            call: Factory taking the attempt number (0 = primary, 1 = hedge)
+                  and returning the awaitable to run
+            hedge: Allow a duplicate attempt after the hedge delay
+
+        Returns:
+            Result of whichever attempt finished first
+
+        Raises:
+            LLMUnavailableError: Breaker open or deadline exceeded
+            Exception: Whatever the last attempt raised if every attempt failed
+        """
+        if not self.breaker.allow():
+            self.stats["breaker_rejections"] += 1
+            raise LLMUnavailableError("LLM circuit breaker is open")
+
+        self.stats["calls"] += 1
+        deadline = self.deadlines.get(stage, 30.0)
+        started = time.monotonic()
+        attempts = [asyncio.ensure_future(call(0))]
+        hedge_task = None
+        hedge_at = self.hedge_delay(stage) if (hedge and self.hedge_enabled) else None
+        error: Optional[BaseException] = None
+
+        try:
+            while True:
+                elapsed = time.monotonic() - started
+                remaining = deadline - elapsed
+                if remaining <= 0:
+                    break
+                wait_for = remaining
+                if hedge_at is not None and len(attempts) == 1:
+                    wait_for = min(remaining, max(0.0, hedge_at - elapsed))
+
+                done, _ = await asyncio.wait(attempts, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    attempts.remove(task)
+                    if task.exception() is None:
+                        seconds = time.monotonic() - started
+                        self._observe(stage, seconds)
+                        self.breaker.record_success()
+                        if task is hedge_task:
+                            self.stats["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+
+                if not done and hedge_at is not None and len(attempts) == 1 and time.monotonic() - started >= hedge_at:
+                    self.stats["hedges_fired"] += 1
+                    hedge_task = asyncio.ensure_future(call(1))
+                    attempts.append(hedge_task)
+                    hedge_at = None
+                    continue
+
+                if not attempts:
+                    # Every attempt failed outright
+                    self.stats["errors"] += 1
+                    self.breaker.record_failure()
+                    raise error
+
+            self.stats["timeouts"] += 1
+            self.breaker.record_failure()
+            raise LLMUnavailableError(f"{stage} LLM call exceeded {deadline:.1f}s deadline")
+        except asyncio.CancelledError:
+            self.breaker.release_probe()
+            raise
+        finally:
+            for task in attempts:
+                task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "breaker_state": self.breaker.state,
+            "hedge_delay_seconds": {stage: round(self.hedge_delay(stage), 3) for stage in self.deadlines}
+        }
+
+
+def build_llm_guard() -> LLMGuard:
+    """Create a guard configured from settings."""
+    return LLMGuard(
+        deadlines={
+            STAGE_INTENT: settings.LLM_INTENT_TIMEOUT_SECONDS,
+            STAGE_RETRIEVAL: settings.LLM_RETRIEVAL_TIMEOUT_SECONDS,
+            STAGE_SYNTHESIS: settings.LLM_SYNTHESIS_TIMEOUT_SECONDS
+        },
+        hedge_enabled=settings.LLM_HEDGE_ENABLED,
+        min_hedge_delay=settings.LLM_HEDGE_MIN_DELAY_SECONDS,
+        failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+        reset_seconds=settings.LLM_BREAKER_RESET_SECONDS
+    )
@@ -0,0 +1,397 @@
+"""
+LLM and Embedding Providers
+Builds the agent's LLM and embedding model from settings (LLM_PROVIDER,
+EMBEDDING_PROVIDER).
+
+"gemini" is the production setup. "mock" swaps in deterministic local
+fakes so the full /ask pipeline can be load-tested and profiled offline:
+- MockLLM sleeps for a sampled latency (log-normal around a median),
+  answers intent prompts with canned tool-call plans (as JSON or as native
+  tool calls) and returns templated synthesis/summary text.
+- MockEmbedding hashes tokens into a fixed-size vector, so retrieval still
+  favours documents that share words with the query.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import random
+import re
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+
+from llama_index.core.base.llms.types import (
+    ChatMessage,
+    ChatResponse,
+    ChatResponseAsyncGen,
+    ChatResponseGen,
+    CompletionResponse,
+    CompletionResponseAsyncGen,
+    CompletionResponseGen,
+    LLMMetadata,
+)
+from llama_index.core.bridge.pydantic import PrivateAttr
+from llama_index.core.embeddings import BaseEmbedding
+from llama_index.core.llms.function_calling import FunctionCallingLLM
+from llama_index.core.llms.llm import ToolSelection
+
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_GEMINI = "gemini"
+PROVIDER_MOCK = "mock"
+
+# Canned plans: every rule whose keywords all appear in the query fires, in order.
+# "{student_id}" and "{subject}" are filled from the prompt and the query.
+DEFAULT_PLANS: List[Dict[str, Any]] = [
+    {"keywords": ["attendance", "short"], "tool": "check_attendance_shortage", "params": {"student_id": "{student_id}"}},
+    {"keywords": ["attendance"], "tool": "get_student_attendance", "params": {"student_id": "{student_id}"}},
+    {"keywords": ["cgpa"], "tool": "calculate_cgpa", "params": {"student_id": "{student_id}"}},
+    {"keywords": ["marks"], "tool": "get_student_marks", "params": {"student_id": "{student_id}"}},
+    {"keywords": ["fee", "clear"], "tool": "check_fee_clearance", "params": {"student_id": "{student_id}"}},
+    {"keywords": ["fee", "history"], "tool": "get_fee_history", "params": {"student_id": "{student_id}"}},
+    {"keywords": ["fee"], "tool": "get_student_fee_status", "params": {"student_id": "{student_id}"}},
+    {"keywords": ["next class"], "tool": "get_next_class", "params": {"student_id": "{student_id}"}},
+    {"keywords": ["timetable"], "tool": "get_student_timetable", "params": {"student_id": "{student_id}"}},
+    {"keywords": ["reserve"], "tool": "reserve_library_book", "params": {"student_id": "{student_id}", "book_title": "{subject}"}},
+    {"keywords": ["my books"], "tool": "get_student_book_loans", "params": {"student_id": "{student_id}"}},
+    {"keywords": ["book"], "tool": "search_books", "params": {"query": "{subject}"}},
+    {"keywords": ["register"], "tool": "register_for_event", "params": {"student_id": "{student_id}", "event_identifier": "{subject}"}},
+    {"keywords": ["my events"], "tool": "get_student_events", "params": {"student_id": "{student_id}"}},
+    {"keywords": ["event"], "tool": "get_upcoming_events", "params": {}},
+]
+
+# Words stripped from the query to get the subject ("reserve Clean Code" -> "Clean Code")
+_SUBJECT_STOPWORDS = {
+    "reserve", "register", "me", "for", "the", "a", "an", "book", "books", "event",
+    "search", "find", "please", "can", "you", "i", "want", "to", "borrow", "about", "in", "on"
+}
+
+_QUERY_PATTERNS = [
+    re.compile(r'User Query: "(.*?)"', re.DOTALL),
+    re.compile(r'Original Query: "(.*?)"', re.DOTALL),
+    re.compile(r"^Question: (.*)$", re.MULTILINE),
+    re.compile(r"^Query: (.*)$", re.MULTILINE),
+]
+_STUDENT_ID_PATTERN = re.compile(r"Student ID: ([0-9A-Za-z\-]+)")
+
+
+def _extract_query(prompt: str) -> str:
+    for pattern in _QUERY_PATTERNS:
+        match = pattern.search(prompt)
+        if match:
+            return match.group(1).strip()
+    return prompt.strip().splitlines()[-1] if prompt.strip() else ""
+
+
+def _extract_subject(query: str) -> str:
+    words = [w for w in re.findall(r"[\w'-]+", query) if w.lower() not in _SUBJECT_STOPWORDS]
+    return " ".join(words) or query
+
+
+class MockLLM(FunctionCallingLLM):
+    """
+    Deterministic stand-in for Gemini.
+
+    Latency is drawn from a seeded RNG, so a run with the same request
+    sequence sees the same latencies.
+    """
+
+    latency_ms: float = 400.0
+    latency_sigma: float = 0.5
+    seed: int = 42
+    plans: List[Dict[str, Any]] = DEFAULT_PLANS
+
+    _rng: random.Random = PrivateAttr()
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._rng = random.Random(self.seed)
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "MockLLM"
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return LLMMetadata(
+            context_window=32768,
+            num_output=1024,
+            is_chat_model=False,
+            is_function_calling_model=True,
+            model_name="mock-llm"
+        )
+
+    # ---- behaviour -----------------------------------------------------
+
+    def _latency(self) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        return self._rng.lognormvariate(math.log(self.latency_ms / 1000.0), self.latency_sigma)
+
+    def _plan(self, prompt: str) -> List[Dict[str, Any]]:
+        """
+        Tool calls for the query: every rule whose keywords all appear.
+
+        Matched keywords are removed from the query as rules fire, so a more
+        specific rule ("attendance" + "short") hides the generic one after it.
+        """
+        query = _extract_query(prompt)
+        remaining = query.lower()
+        match = _STUDENT_ID_PATTERN.search(prompt)
+        student_id = match.group(1) if match else None
+        values = {"student_id": student_id, "subject": _extract_subject(query)}
+
+        tool_calls = []
+        for rule in self.plans:
+            if not all(k in remaining for k in rule["keywords"]):
+                continue
+            for keyword in rule["keywords"]:
+                remaining = remaining.replace(keyword, " ")
+            templates = rule.get("params", {})
+            if not student_id and "{student_id}" in templates.values():
+                # Personal tool for an anonymous user - leave it to RAG
+                continue
+            tool_calls.append({
+                "tool": rule["tool"],
+                "params": {
+                    name: template.format(**values) if isinstance(template, str) else template
+                    for name, template in templates.items()
+                }
+            })
+        return tool_calls
+
+    def _respond(self, prompt: str) -> str:
+        if "Respond ONLY with valid JSON" in prompt:
+            tool_calls = self._plan(prompt)
+            return json.dumps({
+                "intent": tool_calls[0]["tool"] if tool_calls else "General query",
+                "requires_tools": bool(tool_calls),
+                "requires_rag": not tool_calls,
+                "tool_calls": tool_calls,
+                "complexity": "complex" if len(tool_calls) > 1 else "simple"
+            })
+        if "Updated summary:" in prompt:
+            return "Student asked about: " + ", ".join(
+                line.split(":", 1)[1].strip()[:60]
+                for line in prompt.splitlines() if line.startswith("Student:")
+            )
+        query = _extract_query(prompt)
+        if "Tool Results:" in prompt:
+            return f"Here is what I found for \"{query}\" based on your records."
+        return f"Mock answer for \"{query}\"."
+
+    def _completion(self, prompt: str) -> CompletionResponse:
+        text = self._respond(prompt)
+        return CompletionResponse(
+            text=text,
+            raw={"usage_metadata": {
+                "prompt_token_count": len(prompt) // 4,
+                "candidates_token_count": len(text) // 4
+            }}
+        )
+
+    # ---- completion API ------------------------------------------------
+
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        time.sleep(self._latency())
+        return self._completion(prompt)
+
+    async def acomplete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        await asyncio.sleep(self._latency())
+        return self._completion(prompt)
+
+    def stream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponseGen:
+        response = self.complete(prompt)
+
+        def gen() -> CompletionResponseGen:
+            yield CompletionResponse(text=response.text, delta=response.text, raw=response.raw)
+
+        return gen()
+
+    async def astream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponseAsyncGen:
+        response = await self.acomplete(prompt)
+
+        async def gen() -> CompletionResponseAsyncGen:
+            yield CompletionResponse(text=response.text, delta=response.text, raw=response.raw)
+
+        return gen()
+
+    # ---- chat API ------------------------------------------------------
+
+    @staticmethod
+    def _messages_to_prompt(messages: Sequence[ChatMessage]) -> str:
+        return "\n".join(str(m.content or "") for m in messages)
+
+    def _chat_response(self, completion: CompletionResponse, tool_calls: Optional[List[ToolSelection]] = None) -> ChatResponse:
+        kwargs = {"tool_calls": tool_calls} if tool_calls is not None else {}
+        return ChatResponse(
+            message=ChatMessage(role="assistant", content=completion.text, additional_kwargs=kwargs),
+            raw=completion.raw
+        )
+
+    def chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        return self._chat_response(self.complete(self._messages_to_prompt(messages)))
+
+    async def achat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        return self._chat_response(await self.acomplete(self._messages_to_prompt(messages)))
+
+    def stream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseGen:
+        response = self.chat(messages)
+
+        def gen() -> ChatResponseGen:
+            yield response
+
+        return gen()
+
+    async def astream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseAsyncGen:
+        response = await self.achat(messages)
+
+        async def gen() -> ChatResponseAsyncGen:
+            yield response
+
+        return gen()
+
+    # ---- native tool calling -------------------------------------------
+
+    def _prepare_chat_with_tools(
+        self,
+        tools: Sequence[Any],
+        user_msg: Optional[Any] = None,
+        chat_history: Optional[List[ChatMessage]] = None,
+        verbose: bool = False,
+        allow_parallel_tool_calls: bool = False,
+        **kwargs: Any
+    ) -> Dict[str, Any]:
+        messages = list(chat_history or [])
+        if user_msg is not None:
+            messages.append(user_msg if isinstance(user_msg, ChatMessage) else ChatMessage(role="user", content=user_msg))
+        return {"messages": messages, "tools": tools}
+
+    def _tool_call_response(self, prompt: str, tools: Sequence[Any]) -> ChatResponse:
+        available = {tool.metadata.name for tool in tools}
+        selections = [
+            ToolSelection(tool_id=str(uuid.uuid4()), tool_name=call["tool"], tool_kwargs=call["params"])
+            for call in self._plan(prompt)
+            if call["tool"] in available
+        ]
+        if not selections and "search_general_knowledge" in available:
+            selections.append(ToolSelection(
+                tool_id=str(uuid.uuid4()),
+                tool_name="search_general_knowledge",
+                tool_kwargs={"query": _extract_query(prompt)}
+            ))
+        return self._chat_response(self._completion(prompt), selections)
+
+    def chat_with_tools(self, tools: Sequence[Any], user_msg: Optional[Any] = None, **kwargs: Any) -> ChatResponse:
+        prepared = self._prepare_chat_with_tools(tools, user_msg=user_msg, **kwargs)
+        time.sleep(self._latency())
+        return self._tool_call_response(self._messages_to_prompt(prepared["messages"]), tools)
+
+    async def achat_with_tools(self, tools: Sequence[Any], user_msg: Optional[Any] = None, **kwargs: Any) -> ChatResponse:
+        prepared = self._prepare_chat_with_tools(tools, user_msg=user_msg, **kwargs)
+        await asyncio.sleep(self._latency())
+        return self._tool_call_response(self._messages_to_prompt(prepared["messages"]), tools)
+
+    def get_tool_calls_from_response(
+        self,
+        response: ChatResponse,
+        error_on_no_tool_call: bool = True,
+        **kwargs: Any
+    ) -> List[ToolSelection]:
+        tool_calls = response.message.additional_kwargs.get("tool_calls") or []
+        if not tool_calls and error_on_no_tool_call:
+            raise ValueError("Expected at least one tool call, but got 0 tool calls.")
+        return list(tool_calls)
+
+
+class MockEmbedding(BaseEmbedding):
+    """
+    Deterministic feature-hashing embedding (no network, no model weights).
+    """
+
+    dimensions: int = 256
+    latency_ms: float = 0.0
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "MockEmbedding"
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for token in re.findall(r"\w+", text.lower()):
+            digest = hashlib.md5(token.encode("utf-8")).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        return self._embed(query)
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000.0)
+        return self._embed(query)
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def _load_plans() -> List[Dict[str, Any]]:
+    if not settings.MOCK_LLM_PLANS_PATH:
+        return DEFAULT_PLANS
+    with open(settings.MOCK_LLM_PLANS_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_llm():
+    """
+    Create the LLM selected by settings.LLM_PROVIDER.
+
+    Returns:
+        A LlamaIndex LLM (Gemini or MockLLM)
+    """
+    if settings.LLM_PROVIDER == PROVIDER_MOCK:
+        logger.info(f"🧪 Using MockLLM (median latency {settings.MOCK_LLM_LATENCY_MS}ms)")
+        return MockLLM(
+            latency_ms=settings.MOCK_LLM_LATENCY_MS,
+            latency_sigma=settings.MOCK_LLM_LATENCY_SIGMA,
+            seed=settings.MOCK_LLM_SEED,
+            plans=_load_plans()
+        )
+    if settings.LLM_PROVIDER != PROVIDER_GEMINI:
+        raise ValueError(f"Unknown LLM_PROVIDER: {settings.LLM_PROVIDER}")
+
+    from llama_index.llms.gemini import Gemini
+    return Gemini(
+        api_key=settings.GOOGLE_API_KEY,
+        model_name="models/gemini-2.0-flash-lite",
+        temperature=0.7
+    )
+
+
+def build_embed_model():
+    """
+    Create the embedding model selected by settings.EMBEDDING_PROVIDER.
+
+    Returns:
+        A LlamaIndex embedding model (GeminiEmbedding or MockEmbedding)
+    """
+    if settings.EMBEDDING_PROVIDER == PROVIDER_MOCK:
+        logger.info("🧪 Using MockEmbedding")
+        return MockEmbedding(latency_ms=settings.MOCK_EMBEDDING_LATENCY_MS)
+    if settings.EMBEDDING_PROVIDER != PROVIDER_GEMINI:
+        raise ValueError(f"Unknown EMBEDDING_PROVIDER: {settings.EMBEDDING_PROVIDER}")
+
+    from llama_index.embeddings.gemini import GeminiEmbedding
+    return GeminiEmbedding(
+        api_key=settings.GOOGLE_API_KEY,
+        model_name="models/text-embedding-004"
+    )
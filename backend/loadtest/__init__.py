@@ -0,0 +1,11 @@
+"""
+Load-testing suite for the BharatAce backend.
+
+Drives /ask and the student dashboard routes with weighted scenario mixes
+against the in-process app (fake database + mock LLM by default) and
+records throughput and latency percentiles as JSON baselines.
+
+Usage (from the backend directory):
+    python -m loadtest.runner --requests 500 --concurrency 32 --save baseline
+    python -m loadtest.runner --compare baseline
+"""
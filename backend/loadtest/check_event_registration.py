@@ -0,0 +1,107 @@
+"""
+Event registration contention check.
+
+Starts N threads at once, each registering a different student (with
+join_waitlist) for the same event through register_for_event() against
+the in-memory fake database, and checks that exactly max_participants
+students were registered (all of them with --seats 0, which means
+unlimited), the rest were waitlisted, and the event's registered_count
+matches the registration rows. Then one registered student cancels and
+the oldest waitlisted student must take the seat. Exits non-zero on any
+mismatch.
+
+The fake registers Python stand-ins for the register_for_event() and
+cancel_event_registration() RPCs (migrations/event_registration_rpc.sql),
+so this exercises the tools and the capacity rules; the row locking
+itself is Postgres's.
+
+Usage:
+    python -m loadtest.check_event_registration
+    python -m loadtest.check_event_registration --threads 200 --seats 25
+"""
+
+import argparse
+import os
+import sys
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from loadtest.runner import OFFLINE_ENV
+
+for _key, _value in OFFLINE_ENV.items():
+    os.environ.setdefault(_key, _value)
+
+
+def run_check(threads: int, seats: int) -> bool:
+    from database import get_supabase_admin
+    from settings import settings
+    from tools.events_tool import cancel_event_registration, register_for_event
+
+    if settings.DATABASE_BACKEND != "fake":
+        print("❌ This check writes test rows; run it with DATABASE_BACKEND=fake")
+        return False
+    client = get_supabase_admin()
+
+    students = [str(uuid.uuid4()) for _ in range(threads)]
+    client.table("students").insert([
+        {"id": student_id, "full_name": f"Student {n}", "roll_number": f"CHK{n:04d}"}
+        for n, student_id in enumerate(students)
+    ]).execute()
+    start = datetime.now(timezone.utc) + timedelta(days=7)
+    event = client.table("events").insert({
+        "title": "Contention Check Hackathon", "event_type": "competition", "location": "Main Hall",
+        "organizer": "Check", "start_date": start.isoformat(), "end_date": (start + timedelta(hours=8)).isoformat(),
+        "max_participants": seats, "registered_count": 0, "event_status": "scheduled",
+    }).execute().data[0]
+
+    barrier = threading.Barrier(threads)
+
+    def register(student_id: str) -> dict:
+        barrier.wait()
+        return register_for_event(student_id, event["id"], join_waitlist=True)
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = dict(zip(students, pool.map(register, students)))
+
+    def counts():
+        rows = client.table("event_participation").select("student_id")\
+            .eq("event_id", event["id"]).eq("attendance_status", "registered").execute().data
+        stored = client.table("events").select("registered_count").eq("id", event["id"]).execute().data[0]
+        return {row["student_id"] for row in rows}, stored["registered_count"]
+
+    registered = [s for s, r in results.items() if r.get("success") and not r.get("waitlisted")]
+    waitlisted = sorted(
+        (r["waitlist_position"], s) for s, r in results.items() if r.get("success") and r.get("waitlisted")
+    )
+    rows, registered_count = counts()
+    positions = [position for position, _ in waitlisted]
+    print(f"{threads} threads, {seats} seats: {len(registered)} registered, {len(waitlisted)} waitlisted, "
+          f"{len(rows)} registration rows, registered_count={registered_count}")
+    capacity = seats if seats > 0 else threads  # max_participants <= 0 is unlimited
+    ok = len(registered) == len(rows) == registered_count == capacity \
+        and len(waitlisted) == threads - capacity and positions == list(range(1, len(positions) + 1))
+
+    if ok and waitlisted:
+        cancel_event_registration(registered[0], event["id"])
+        rows, registered_count = counts()
+        promoted = waitlisted[0][1]
+        print(f"After one cancellation: registered_count={registered_count}, "
+              f"first waitlisted student registered={promoted in rows}")
+        ok = registered_count == len(rows) == seats and promoted in rows and registered[0] not in rows
+
+    print("✅ Capacity held under contention" if ok else "❌ Registrations do not match the event's capacity")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=50, help="Students registering at the same moment")
+    parser.add_argument("--seats", type=int, default=10, help="max_participants of the event (0 = unlimited)")
+    args = parser.parse_args()
+    sys.exit(0 if run_check(args.threads, args.seats) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Fee payment idempotency check.
+
+Boots the app in-process on the fake database and fires N concurrent
+POST /admin/fees/{id}/payment requests from a thread pool, cycling over
+K idempotency keys (one fee per key), so every payment is retried N/K
+times at once. Exactly K payments must be recorded: one transaction per
+key, the rest answered as duplicates, and each fee's amount_paid raised
+by a single payment. Reusing a key for a different amount or fee must
+return 409. Exits non-zero on any mismatch.
+
+The fake registers a Python stand-in for the record_fee_payment() RPC
+(migrations/fee_payment_rpc.sql), so this exercises the route and the
+idempotency rules; the row locking itself is Postgres's.
+
+Usage:
+    python -m loadtest.check_fee_payments
+    python -m loadtest.check_fee_payments --requests 300 --keys 50 --concurrency 32
+"""
+
+import argparse
+import os
+import sys
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Tuple, Union
+
+from loadtest.runner import OFFLINE_ENV
+
+for _key, _value in OFFLINE_ENV.items():
+    os.environ.setdefault(_key, _value)
+
+FEE_TOTAL = 50000.0
+PAYMENT = 5000.0
+
+
+def run_check(requests: int, keys: int, concurrency: int) -> bool:
+    from fastapi.testclient import TestClient
+
+    from database import get_supabase_admin
+    from main import app
+    from settings import settings
+
+    if settings.DATABASE_BACKEND != "fake":
+        print("❌ This check writes test rows; run it with DATABASE_BACKEND=fake")
+        return False
+    client = get_supabase_admin()
+
+    student_id = str(uuid.uuid4())
+    client.table("students").insert({"id": student_id, "full_name": "Payment Check", "roll_number": "CHKPAY"}).execute()
+    fees = client.table("fees").insert([
+        {
+            "student_id": student_id, "semester": 1, "academic_year": "2026-27", "total_amount": FEE_TOTAL,
+            "amount_paid": 0.0, "due_date": (date.today() + timedelta(days=30)).isoformat(),
+            "payment_status": "pending",
+        }
+        for _ in range(keys)
+    ]).execute().data
+    run_id = uuid.uuid4().hex[:8]
+    key_fee = {f"check-{run_id}-{n}": fee["id"] for n, fee in enumerate(fees)}
+    calls = [list(key_fee.items())[n % keys] for n in range(requests)]
+
+    with TestClient(app) as http:
+        def pay(call: Tuple[str, str], amount: float = PAYMENT) -> Union[int, str]:
+            """Outcome of one payment: "recorded", "duplicate" or the error status code."""
+            key, fee_id = call
+            response = http.post(
+                f"/admin/fees/{fee_id}/payment",
+                json={"amount": amount, "payment_date": date.today().isoformat(), "payment_method": "upi"},
+                headers={"Idempotency-Key": key},
+            )
+            if response.status_code != 200:
+                return response.status_code
+            return "duplicate" if response.json()["duplicate"] else "recorded"
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = Counter(pool.map(pay, calls))
+
+        first_key, first_fee = next(iter(key_fee.items()))
+        other_fee = fees[-1]["id"] if keys > 1 else first_fee
+        conflicts = [
+            pay((first_key, first_fee), amount=PAYMENT + 1),  # same key, different amount
+            pay((first_key, other_fee)) if other_fee != first_fee else 409,  # same key, different fee
+        ]
+
+    transactions = client.table("fee_transactions").select("fee_id, idempotency_key")\
+        .in_("fee_id", list(key_fee.values())).execute().data
+    paid = {row["id"]: float(row["amount_paid"]) for row in
+            client.table("fees").select("id, amount_paid").in_("id", list(key_fee.values())).execute().data}
+    overpaid = sum(1 for amount in paid.values() if amount != PAYMENT)
+
+    print(f"{requests} requests over {keys} keys ({concurrency} threads): "
+          f"{outcomes['recorded']} recorded, {outcomes['duplicate']} duplicates, "
+          f"{sum(v for k, v in outcomes.items() if isinstance(k, int))} errors")
+    print(f"   {len(transactions)} transactions, {keys - overpaid}/{keys} fees paid exactly once, "
+          f"key conflicts -> {conflicts}")
+
+    ok = outcomes["recorded"] == keys and outcomes["duplicate"] == requests - keys \
+        and len(transactions) == keys and not overpaid and conflicts == [409, 409]
+    print("✅ Every payment was counted once" if ok else "❌ Payments were double-counted or lost")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=60, help="Payment requests in total")
+    parser.add_argument("--keys", type=int, default=20, help="Distinct idempotency keys (one fee each)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Threads sending requests")
+    args = parser.parse_args()
+    sys.exit(0 if run_check(args.requests, args.keys, args.concurrency) else 1)
+
+
+if __name__ == "__main__":
+    main()
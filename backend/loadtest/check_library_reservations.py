@@ -0,0 +1,89 @@
+"""
+Library reservation contention check.
+
+Starts N threads at once, each reserving the same title for a different
+student through reserve_library_book() against the in-memory fake
+database, and checks that exactly as many loans were issued as there
+were copies, that available_copies ended at 0 and that every other
+caller was told the book is unavailable. Exits non-zero otherwise.
+
+The fake registers a Python stand-in for the reserve_library_book() RPC
+(migrations/library_reservation_rpc.sql), so this exercises the tool and
+the reservation rules; the row locking itself is Postgres's.
+
+Usage:
+    python -m loadtest.check_library_reservations
+    python -m loadtest.check_library_reservations --threads 100 --copies 5
+"""
+
+import argparse
+import os
+import sys
+import threading
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from loadtest.runner import OFFLINE_ENV
+
+for _key, _value in OFFLINE_ENV.items():
+    os.environ.setdefault(_key, _value)
+
+TITLE = "Contention Check: Distributed Systems"
+
+
+def run_check(threads: int, copies: int) -> bool:
+    from database import get_supabase_admin
+    from settings import settings
+    from tools.library_tool import reserve_library_book
+
+    if settings.DATABASE_BACKEND != "fake":
+        print("❌ This check writes test rows; run it with DATABASE_BACKEND=fake")
+        return False
+    client = get_supabase_admin()
+
+    students = [str(uuid.uuid4()) for _ in range(threads)]
+    client.table("students").insert([
+        {"id": student_id, "full_name": f"Student {n}", "roll_number": f"CHK{n:04d}"}
+        for n, student_id in enumerate(students)
+    ]).execute()
+    book = client.table("library_books").insert({
+        "title": TITLE, "author": "Check", "category": "Computer Science",
+        "total_copies": copies, "available_copies": copies,
+    }).execute().data[0]
+
+    barrier = threading.Barrier(threads)
+
+    def reserve(student_id: str) -> dict:
+        barrier.wait()
+        return reserve_library_book(student_id, TITLE)
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(reserve, students))
+
+    issued = sum(1 for r in results if r.get("success"))
+    loans = client.table("book_loans").select("id").eq("book_id", book["id"]).execute().data
+    available = client.table("library_books").select("available_copies").eq("id", book["id"]).execute().data[0]
+    refusals = Counter(r.get("message", "").split(".")[0] for r in results if not r.get("success"))
+
+    print(f"{threads} threads, {copies} copies: {issued} issued, {len(loans)} loan rows, "
+          f"available_copies={available['available_copies']}")
+    for message, count in refusals.items():
+        print(f"   {count} x {message}")
+
+    ok = issued == len(loans) == copies and available["available_copies"] == 0 \
+        and sum(refusals.values()) == threads - copies
+    print("✅ No copy was issued twice" if ok else "❌ Reservation count does not match the copies on the shelf")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=40, help="Students reserving at the same moment")
+    parser.add_argument("--copies", type=int, default=2, help="Copies of the book on the shelf")
+    args = parser.parse_args()
+    sys.exit(0 if run_check(args.threads, args.copies) else 1)
+
+
+if __name__ == "__main__":
+    main()
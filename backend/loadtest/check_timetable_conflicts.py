@@ -0,0 +1,138 @@
+"""
+Timetable clash correctness check.
+
+Compares the interval-tree clash detection in tools/timetable_conflicts.py
+with a brute-force pairwise scan on random timetables: every room and
+instructor clash (half-open times, so back-to-back classes never clash)
+must be found exactly once, both for a full scan of the stored entries
+and for a batch of new entries checked against them. Free-room lookups
+are compared the same way. Exits non-zero on the first mismatch.
+
+Usage:
+    python -m loadtest.check_timetable_conflicts
+    python -m loadtest.check_timetable_conflicts --entries 2000 --trials 20 --seed 3
+"""
+
+import argparse
+import os
+import random
+import sys
+from typing import Any, Dict, List, Set, Tuple
+
+from loadtest.runner import OFFLINE_ENV
+
+for _key, _value in OFFLINE_ENV.items():
+    os.environ.setdefault(_key, _value)
+
+ROOMS = [f"R{n}" for n in range(1, 13)]
+INSTRUCTORS = [f"Prof {n}" for n in range(1, 16)]
+
+Pair = Tuple[str, Any, Any]
+
+
+def _random_entries(rng: random.Random, count: int, first_id: int) -> List[Dict[str, Any]]:
+    from tools.timetable_conflicts import _normalize
+
+    entries = []
+    for n in range(count):
+        start = rng.randrange(8 * 60, 17 * 60, 15)
+        end = start + rng.choice([0, 45, 60, 60, 90, 120])
+        row = {
+            "id": first_id + n,
+            "day_of_week": rng.randint(1, 5),
+            "start_time": f"{start // 60:02d}:{start % 60:02d}",
+            "end_time": f"{end // 60:02d}:{end % 60:02d}",
+            "room_number": rng.choice(ROOMS + [None]),
+        }
+        entries.append(_normalize(row, {"instructor_name": rng.choice(INSTRUCTORS + [None])}))
+    return entries
+
+
+def _key(kind: str, entry: Dict[str, Any]) -> Any:
+    from tools.timetable_conflicts import _instructor_key, _room_key
+    return _room_key(entry) if kind == "room" else _instructor_key(entry)
+
+
+def _brute_force(existing: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> Set[Pair]:
+    """Every clashing pair involving a new entry (or any pair when new is empty)."""
+    everything = existing + new
+    candidates = new or existing
+    found: Set[Pair] = set()
+    for kind in ("room", "instructor"):
+        for a in candidates:
+            for b in everything:
+                if a is b or a["day_of_week"] != b["day_of_week"]:
+                    continue
+                key = _key(kind, a)
+                if key is None or key != _key(kind, b):
+                    continue
+                if a["start"] < b["end"] and b["start"] < a["end"] and a["end"] > a["start"] and b["end"] > b["start"]:
+                    found.add((kind,) + tuple(sorted((a["id"], b["id"]))))
+    return found
+
+
+def _reported(report: Dict[str, List[Dict[str, Any]]]) -> List[Pair]:
+    return [
+        (kind,) + tuple(sorted((clash["entry"]["id"], clash["conflicts_with"]["id"])))
+        for kind in ("room", "instructor")
+        for clash in report[kind]
+    ]
+
+
+def _compare(label: str, expected: Set[Pair], reported: List[Pair]) -> bool:
+    duplicates = len(reported) - len(set(reported))
+    missing = expected - set(reported)
+    extra = set(reported) - expected
+    if duplicates or missing or extra:
+        print(f"❌ {label}: {len(missing)} missing, {len(extra)} extra, {duplicates} reported twice")
+        return False
+    return True
+
+
+def run_check(entries: int, batch: int, trials: int, seed: int) -> bool:
+    from tools.timetable_conflicts import find_conflicts, find_free_rooms
+
+    rng = random.Random(seed)
+    clashes = 0
+    for trial in range(trials):
+        existing = _random_entries(rng, entries, first_id=0)
+        new = _random_entries(rng, batch, first_id=entries)
+
+        expected = _brute_force(existing, [])
+        if not _compare(f"trial {trial} full scan", expected, _reported(find_conflicts(existing))):
+            return False
+        clashes += len(expected)
+
+        expected = _brute_force(existing, new)
+        if not _compare(f"trial {trial} new batch", expected, _reported(find_conflicts(existing, new))):
+            return False
+        clashes += len(expected)
+
+        day = rng.randint(1, 5)
+        start = rng.randrange(8 * 60, 17 * 60, 15)
+        slot = (f"{start // 60:02d}:{start % 60:02d}", f"{(start + 60) // 60:02d}:{(start + 60) % 60:02d}")
+        busy = sorted({
+            e["room_number"] for e in existing
+            if e["day_of_week"] == day and e["room_number"] and e["end"] > e["start"]
+            and e["start"] < (start + 60) * 60 and start * 60 < e["end"]
+        })
+        if find_free_rooms(existing, day, *slot)["busy_rooms"] != busy:
+            print(f"❌ trial {trial}: free-room lookup disagrees for day {day} {slot[0]}-{slot[1]}")
+            return False
+
+    print(f"✅ {trials} trials x {entries} entries (+{batch} new): {clashes:,} clashes, all matched brute force")
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=600, help="Stored timetable entries per trial")
+    parser.add_argument("--batch", type=int, default=60, help="New entries checked against them")
+    parser.add_argument("--trials", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    sys.exit(0 if run_check(args.entries, args.batch, args.trials, args.seed) else 1)
+
+
+if __name__ == "__main__":
+    main()
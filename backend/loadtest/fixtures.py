@@ -0,0 +1,133 @@
+"""
+Load-test fixture data.
+
+Seeds a small but complete campus into the fake database: students with
+attendance, marks and fees, a timetable, upcoming events, library books
+and knowledge-base documents, so every scenario has something to query.
+"""
+
+import random
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+DEPARTMENTS = ["Computer Science", "Electronics", "Mechanical", "Civil"]
+DAYS = [1, 2, 3, 4, 5]  # timetable.day_of_week: 1=Monday ... 5=Friday
+SLOTS = [("09:00", "10:00"), ("10:00", "11:00"), ("11:15", "12:15"), ("14:00", "15:00"), ("15:00", "16:00")]
+EVENT_TITLES = ["HackFest", "AI Workshop", "Robotics Expo", "Cultural Night", "Startup Pitch", "Coding Sprint"]
+BOOK_TITLES = ["Clean Code", "Introduction to Algorithms", "Operating System Concepts", "Digital Design", "Thermodynamics"]
+KNOWLEDGE = [
+    ("library", "The central library is open from 9am to 8pm on weekdays and 10am to 4pm on Saturdays."),
+    ("fees", "Semester fees are due on the 15th of the first month. A late fee applies after the due date."),
+    ("academics", "Students need at least 75 percent attendance in every subject to sit for the end-semester exam."),
+    ("hostel", "Hostel rooms are allotted by the warden's office at the start of each academic year."),
+    ("events", "Students can register for college events through the assistant or the events portal."),
+]
+
+
+def seed_fixture(client, students: int = 50, seed: int = 7) -> Dict[str, Any]:
+    """
+    Populate the fake database for a load-test run.
+
+    Args:
+        client: FakeSupabase instance
+        students: Number of students to create
+        seed: RNG seed so runs see the same data
+
+    Returns:
+        Dictionary with the student rows, event titles and book titles
+    """
+    rng = random.Random(seed)
+    today = date.today()
+
+    subjects: List[Dict[str, Any]] = []
+    for semester in range(1, 9):
+        for n in range(5):
+            subjects.append({
+                "subject_code": f"S{semester}{n:02d}",
+                "subject_name": f"Subject {semester}.{n}",
+                "semester": semester,
+                "credits": rng.choice([3, 4]),
+                "department": rng.choice(DEPARTMENTS),
+                "instructor_name": f"Prof. {rng.choice(['Rao', 'Iyer', 'Khan', 'Das', 'Singh'])}"
+            })
+    subjects = client.table("subjects").insert(subjects).execute().data
+    by_semester: Dict[int, List[Dict[str, Any]]] = {}
+    for subject in subjects:
+        by_semester.setdefault(subject["semester"], []).append(subject)
+
+    timetable = []
+    for semester, semester_subjects in by_semester.items():
+        for day in DAYS:
+            for (start, end), subject in zip(SLOTS, semester_subjects):
+                timetable.append({
+                    "semester": semester, "day_of_week": day, "start_time": start, "end_time": end,
+                    "subject_id": subject["id"], "room_number": f"R{rng.randint(101, 130)}",
+                    "session_type": rng.choice(["lecture", "lab", "tutorial"])
+                })
+    client.table("timetable").insert(timetable).execute()
+
+    student_rows = []
+    for i in range(students):
+        first, last = f"Student{i}", rng.choice(["Sharma", "Patel", "Reddy", "Nair", "Gupta"])
+        student_rows.append({
+            "student_id": f"LT{i:05d}", "roll_number": f"LT{i:05d}",
+            "first_name": first, "last_name": last, "full_name": f"{first} {last}",
+            "email": f"student{i}@loadtest.local", "course": "B.Tech",
+            "department": rng.choice(DEPARTMENTS), "semester": rng.randint(1, 8),
+            "cgpa": round(rng.uniform(5.5, 9.8), 2)
+        })
+    student_rows = client.table("students").insert(student_rows).execute().data
+
+    attendance, marks, fees = [], [], []
+    for student in student_rows:
+        attend_rate = rng.uniform(0.6, 0.98)
+        semester_subjects = by_semester[student["semester"]]
+        for day_offset in range(30):
+            day = today - timedelta(days=day_offset + 1)
+            if day.weekday() >= 5:
+                continue
+            for subject in semester_subjects:
+                attendance.append({
+                    "student_id": student["id"], "subject_id": subject["id"], "date": day.isoformat(),
+                    "status": "present" if rng.random() < attend_rate else "absent"
+                })
+        for subject in semester_subjects:
+            marks.append({
+                "student_id": student["id"], "subject_id": subject["id"],
+                "exam_type": "midterm", "obtained_marks": rng.randint(35, 98), "max_marks": 100,
+                "exam_date": (today - timedelta(days=20)).isoformat()
+            })
+        total = 60000.0
+        paid = rng.choice([0.0, 30000.0, 60000.0])
+        fees.append({
+            "student_id": student["id"], "semester": student["semester"], "academic_year": "2025-26",
+            "total_amount": total, "amount_paid": paid,
+            "payment_status": "paid" if paid >= total else "partial" if paid else "pending",
+            "due_date": (today + timedelta(days=rng.randint(-20, 40))).isoformat()
+        })
+    client.table("attendance").insert(attendance).execute()
+    client.table("marks").insert(marks).execute()
+    client.table("fees").insert(fees).execute()
+
+    now = datetime.now(timezone.utc)
+    events = [{
+        "title": title, "description": f"{title} for all departments", "event_type": "workshop",
+        "organizer": "Student Council", "location": "Main Auditorium",
+        "start_date": (now + timedelta(days=3 + i)).isoformat(),
+        "end_date": (now + timedelta(days=3 + i, hours=4)).isoformat(),
+        "registration_deadline": (now + timedelta(days=2 + i)).isoformat(),
+        "max_participants": 100000
+    } for i, title in enumerate(EVENT_TITLES)]
+    client.table("events").insert(events).execute()
+
+    books = [{
+        "title": title, "author": f"Author {i}", "isbn": f"978000000{i:04d}", "category": "Engineering",
+        "total_copies": 100000, "available_copies": 100000
+    } for i, title in enumerate(BOOK_TITLES)]
+    client.table("library_books").insert(books).execute()
+
+    client.table("knowledge_base").insert([
+        {"category": category, "content": content} for category, content in KNOWLEDGE
+    ]).execute()
+
+    return {"students": student_rows, "events": EVENT_TITLES, "books": BOOK_TITLES}
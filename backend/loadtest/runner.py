@@ -0,0 +1,255 @@
+"""
+Load-test runner.
+
+Boots the FastAPI app in-process (fake database, mock LLM/embeddings unless
+overridden by environment variables), seeds fixture data, drives it with a
+scenario mix through httpx's ASGI transport and reports throughput plus
+p50/p95/p99 latency per endpoint and per agent stage.
+
+Results can be saved as a named JSON baseline under loadtest/baselines/ and
+later runs compared against it; a p95 or throughput regression beyond the
+tolerance makes the run exit non-zero.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+# Endpoints/stages with fewer samples than this are too noisy to compare
+MIN_COMPARE_SAMPLES = 20
+
+# Offline defaults - anything already set in the environment wins
+OFFLINE_ENV = {
+    "SUPABASE_URL": "http://localhost.invalid",
+    "SUPABASE_KEY": "loadtest",
+    "SUPABASE_JWT_SECRET": "loadtest-jwt-secret-loadtest-jwt-secret",
+    "GOOGLE_API_KEY": "loadtest",
+    "DATABASE_BACKEND": "fake",
+    "LLM_PROVIDER": "mock",
+    "EMBEDDING_PROVIDER": "mock",
+    "LOCAL_STORE_PATH": ":memory:",
+    # Measure the pipeline, not the per-caller rate limits
+    "STUDENT_RATE_LIMIT_PER_MINUTE": "1000000",
+    "STUDENT_RATE_LIMIT_BURST": "1000000",
+    "ANON_RATE_LIMIT_PER_MINUTE": "1000000",
+    "ANON_RATE_LIMIT_BURST": "1000000",
+    # No campus-wide batch scans or fixture writes during a run
+    "ATTENDANCE_SHORTAGE_JOB_INTERVAL_HOURS": "0",
+    "ACCRUAL_JOB_INTERVAL_HOURS": "0",
+}
+
+
+def _summarize(latencies: List[float]) -> Dict[str, float]:
+    from agent_metrics import summarize_latencies
+    return summarize_latencies(latencies)
+
+
+async def run_load(
+    requests: int,
+    concurrency: int,
+    mix: str,
+    students: int,
+    seed: int
+) -> Dict[str, Any]:
+    """
+    Run one load test and return the results dictionary.
+    """
+    import main
+    from auth import create_access_token
+    from database import get_supabase_admin
+    from agent_metrics import get_metrics_store
+    from loadtest.fixtures import seed_fixture
+    from loadtest.scenarios import MIXES, SCENARIOS, ScenarioContext
+    from settings import settings
+    import httpx
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    fixture = seed_fixture(get_supabase_admin(), students=students, seed=seed)
+    tokens = {
+        s["id"]: create_access_token({"sub": s["id"], "email": s["email"], "role": "student"})
+        for s in fixture["students"]
+    }
+    ctx = ScenarioContext(fixture["students"], tokens, fixture["events"], fixture["books"])
+
+    weights = MIXES[mix]
+    names = list(weights)
+    rng = random.Random(seed)
+    plan = rng.choices(names, weights=[weights[n] for n in names], k=requests)
+
+    samples: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    statuses: Dict[str, Dict[str, int]] = {}
+    cursor = iter(range(requests))
+
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=120) as client:
+
+            async def worker(worker_id: int):
+                worker_rng = random.Random(seed * 1000 + worker_id)
+                for i in cursor:
+                    scenario = SCENARIOS[plan[i]]
+                    started = time.perf_counter()
+                    try:
+                        label, response = await scenario(client, ctx, worker_rng)
+                        status = str(response.status_code)
+                        failed = response.status_code >= 400
+                    except Exception as e:
+                        label, status, failed = f"{plan[i]}", type(e).__name__, True
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                    samples.setdefault(label, []).append(elapsed_ms)
+                    statuses.setdefault(label, {}).setdefault(status, 0)
+                    statuses[label][status] += 1
+                    if failed:
+                        errors[label] = errors.get(label, 0) + 1
+
+            run_started = time.perf_counter()
+            await asyncio.gather(*(worker(w) for w in range(concurrency)))
+            duration = time.perf_counter() - run_started
+
+        # Let the last traces reach the metrics store
+        await asyncio.sleep(0.2)
+        usage = get_metrics_store().get_usage_stats(window_hours=1)
+
+    all_latencies = [v for values in samples.values() for v in values]
+    return {
+        "created_at": datetime.utcnow().isoformat(),
+        "config": {
+            "requests": requests,
+            "concurrency": concurrency,
+            "mix": mix,
+            "students": students,
+            "seed": seed,
+            "agent_mode": settings.AGENT_MODE,
+            "llm_provider": settings.LLM_PROVIDER,
+            "mock_llm_latency_ms": settings.MOCK_LLM_LATENCY_MS,
+            "database_backend": settings.DATABASE_BACKEND,
+        },
+        "summary": {
+            "requests": len(all_latencies),
+            "errors": sum(errors.values()),
+            "duration_s": round(duration, 3),
+            "throughput_rps": round(len(all_latencies) / duration, 2) if duration else 0.0,
+            "latency": _summarize(all_latencies),
+        },
+        "endpoints": {
+            label: {
+                "errors": errors.get(label, 0),
+                "status_codes": statuses[label],
+                "throughput_rps": round(len(values) / duration, 2) if duration else 0.0,
+                **_summarize(values),
+            }
+            for label, values in sorted(samples.items())
+        },
+        "stages": usage["stage_latency"],
+        "tools": usage["tool_latency"],
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    List regressions of current vs baseline.
+
+    A regression is a p95 more than `tolerance` above the baseline, or
+    overall throughput more than `tolerance` below it. Per-endpoint rates
+    depend on the mix, so only the overall throughput is compared.
+    """
+    regressions = []
+
+    def check(label: str, now: Dict[str, Any], then: Dict[str, Any]):
+        if then.get("count", 0) < MIN_COMPARE_SAMPLES:
+            return
+        if then.get("p95_ms") and now.get("p95_ms", 0) > then["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {then['p95_ms']}ms -> {now['p95_ms']}ms")
+        if then.get("throughput_rps") and (now.get("throughput_rps") or 0) < then["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{label}: throughput {then['throughput_rps']} -> {now['throughput_rps']} rps")
+
+    check("overall", {**current["summary"]["latency"], "throughput_rps": current["summary"]["throughput_rps"]},
+          {**baseline["summary"]["latency"], "throughput_rps": baseline["summary"]["throughput_rps"]})
+    for label, then in baseline.get("endpoints", {}).items():
+        if label in current["endpoints"]:
+            check(label, {**current["endpoints"][label], "throughput_rps": None},
+                  {**then, "throughput_rps": None})
+    for stage, then in baseline.get("stages", {}).items():
+        if stage in current["stages"]:
+            check(f"stage:{stage}", current["stages"][stage], then)
+    return regressions
+
+
+def print_report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> None:
+    summary = results["summary"]
+    print("=" * 80)
+    print(f"📈 LOAD TEST: {summary['requests']} requests in {summary['duration_s']}s "
+          f"({summary['throughput_rps']} req/s, {summary['errors']} errors)")
+    print("=" * 80)
+    header = f"{'endpoint':<45} {'count':>6} {'err':>5} {'p50':>9} {'p95':>9} {'p99':>9}"
+    print(header)
+    print("-" * len(header))
+    rows = list(results["endpoints"].items()) + [(f"stage:{k}", v) for k, v in results["stages"].items()]
+    for label, stats in rows:
+        line = (f"{label:<45} {stats['count']:>6} {stats.get('errors', 0):>5} "
+                f"{stats['p50_ms']:>8.1f}ms {stats['p95_ms']:>7.1f}ms {stats['p99_ms']:>7.1f}ms")
+        if baseline:
+            source = baseline["endpoints"] if not label.startswith("stage:") else baseline.get("stages", {})
+            then = source.get(label.replace("stage:", "", 1) if label.startswith("stage:") else label)
+            if then and then.get("p95_ms"):
+                delta = (stats["p95_ms"] - then["p95_ms"]) / then["p95_ms"] * 100
+                line += f"  ({delta:+.0f}% p95)"
+        print(line)
+
+
+def main_cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="BharatAce load test")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", default="default", help="Scenario mix (see loadtest.scenarios.MIXES)")
+    parser.add_argument("--students", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save", metavar="NAME", help="Save results as loadtest/baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="Compare against loadtest/baselines/NAME.json")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    for key, value in OFFLINE_ENV.items():
+        os.environ.setdefault(key, value)
+
+    results = asyncio.run(run_load(args.requests, args.concurrency, args.mix, args.students, args.seed))
+
+    baseline = None
+    if args.compare:
+        with open(BASELINE_DIR / f"{args.compare}.json", "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print_report(results, baseline)
+
+    if args.save:
+        BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+        path = BASELINE_DIR / f"{args.save}.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Saved baseline to {path}")
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) vs {args.compare}:")
+            for regression in regressions:
+                print(f"   - {regression}")
+            return 1
+        print(f"\n✅ No regressions vs {args.compare} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
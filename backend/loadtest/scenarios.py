@@ -0,0 +1,118 @@
+"""
+Load-test scenarios and weighted mixes.
+
+Each scenario issues one request and returns the endpoint label it is
+reported under, so /ask traffic is broken down by what kind of question
+was asked.
+"""
+
+import random
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+import httpx
+
+ANONYMOUS_QUESTIONS = [
+    "When does the library open?",
+    "What is the minimum attendance requirement?",
+    "When are semester fees due?",
+    "How are hostel rooms allotted?",
+    "How do I register for college events?",
+]
+
+PERSONAL_QUESTIONS = [
+    "What's my attendance?",
+    "Am I short on attendance in any subject?",
+    "Show my attendance this semester",
+]
+
+MULTI_TOOL_QUESTIONS = [
+    "Show my attendance and my fee status",
+    "What are my marks and my cgpa?",
+    "What's my timetable and any upcoming event?",
+]
+
+STUDENT_ROUTES = [
+    "/student/attendance/summary",
+    "/student/fees/status",
+    "/student/timetable/today",
+    "/student/library/loans",
+    "/student/events/upcoming",
+    "/student/marks/summary",
+]
+
+
+class ScenarioContext:
+    """Shared state for a run: fixture data and per-student auth headers."""
+
+    def __init__(self, students, tokens: Dict[str, str], events, books):
+        self.students = students
+        self.tokens = tokens
+        self.events = events
+        self.books = books
+
+    def random_student(self, rng: random.Random) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        student = rng.choice(self.students)
+        return student, {"Authorization": f"Bearer {self.tokens[student['id']]}"}
+
+
+ScenarioFn = Callable[[httpx.AsyncClient, ScenarioContext, random.Random], Awaitable[Tuple[str, httpx.Response]]]
+
+
+async def anonymous_rag(client, ctx, rng):
+    response = await client.post("/ask", json={"query": rng.choice(ANONYMOUS_QUESTIONS)})
+    return "POST /ask [anonymous_rag]", response
+
+
+async def personal_attendance(client, ctx, rng):
+    _, headers = ctx.random_student(rng)
+    response = await client.post("/ask", json={"query": rng.choice(PERSONAL_QUESTIONS)}, headers=headers)
+    return "POST /ask [personal_attendance]", response
+
+
+async def multi_tool(client, ctx, rng):
+    _, headers = ctx.random_student(rng)
+    response = await client.post("/ask", json={"query": rng.choice(MULTI_TOOL_QUESTIONS)}, headers=headers)
+    return "POST /ask [multi_tool]", response
+
+
+async def event_registration(client, ctx, rng):
+    _, headers = ctx.random_student(rng)
+    query = f"Register me for {rng.choice(ctx.events)}"
+    response = await client.post("/ask", json={"query": query}, headers=headers)
+    return "POST /ask [event_registration]", response
+
+
+async def student_routes(client, ctx, rng):
+    _, headers = ctx.random_student(rng)
+    path = rng.choice(STUDENT_ROUTES)
+    response = await client.get(path, headers=headers)
+    return f"GET {path}", response
+
+
+SCENARIOS: Dict[str, ScenarioFn] = {
+    "anonymous_rag": anonymous_rag,
+    "personal_attendance": personal_attendance,
+    "multi_tool": multi_tool,
+    "event_registration": event_registration,
+    "student_routes": student_routes,
+}
+
+# Scenario name -> weight
+MIXES: Dict[str, Dict[str, float]] = {
+    "default": {
+        "anonymous_rag": 0.35,
+        "personal_attendance": 0.25,
+        "multi_tool": 0.15,
+        "event_registration": 0.10,
+        "student_routes": 0.15,
+    },
+    "agent_only": {
+        "anonymous_rag": 0.4,
+        "personal_attendance": 0.3,
+        "multi_tool": 0.2,
+        "event_registration": 0.1,
+    },
+    "dashboard": {
+        "student_routes": 1.0,
+    },
+}
@@ -0,0 +1,85 @@
+"""
+Local SQLite store for server-side runtime data.
+
+Holds data that is owned by this backend process rather than by Supabase
+(chat sessions, agent metrics). Uses the standard library sqlite3 module so
+it works with no extra services.
+"""
+
+import sqlite3
+import threading
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LocalStore:
+    """
+    Thread-safe wrapper around a single SQLite connection.
+
+    FastAPI runs sync tools in a threadpool, so every statement goes through
+    one lock instead of sharing the connection unguarded.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+    def executescript(self, script: str) -> None:
+        """Run a multi-statement script (used for CREATE TABLE IF NOT EXISTS)."""
+        with self._lock:
+            self._conn.executescript(script)
+            self._conn.commit()
+
+    def execute(self, sql: str, params: Iterable[Any] = ()) -> int:
+        """Run a write statement and return the last inserted row id."""
+        with self._lock:
+            cursor = self._conn.execute(sql, tuple(params))
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def executemany(self, sql: str, rows: Iterable[Iterable[Any]]) -> None:
+        """Run a write statement for many parameter rows in one transaction."""
+        with self._lock:
+            self._conn.executemany(sql, [tuple(r) for r in rows])
+            self._conn.commit()
+
+    def fetchall(self, sql: str, params: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        """Run a query and return all rows as dictionaries."""
+        with self._lock:
+            rows = self._conn.execute(sql, tuple(params)).fetchall()
+        return [dict(row) for row in rows]
+
+    def fetchone(self, sql: str, params: Iterable[Any] = ()) -> Optional[Dict[str, Any]]:
+        """Run a query and return the first row as a dictionary (or None)."""
+        with self._lock:
+            row = self._conn.execute(sql, tuple(params)).fetchone()
+        return dict(row) if row else None
+
+
+_store: Optional[LocalStore] = None
+_store_lock = threading.Lock()
+
+
+def get_local_store() -> LocalStore:
+    """
+    Get the process-wide local store (singleton pattern).
+
+    Returns:
+        LocalStore: Store backed by settings.LOCAL_STORE_PATH
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = LocalStore(settings.LOCAL_STORE_PATH)
+                logger.info(f"Local store opened at {settings.LOCAL_STORE_PATH}")
+    return _store
@@ -11,10 +11,11 @@ Features:
 - Action tools (book reservation, event registration)
 """
 
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from typing import List, Optional
+import asyncio
 import logging
 import uuid
 from datetime import datetime
@@ -32,16 +33,28 @@ from models import (
 from database import get_supabase, KNOWLEDGE_BASE_TABLE
 from settings import settings
 from auth import get_current_user, AuthUser, OptionalAuth
+from chat_sessions import (
+    get_chat_session_store,
+    format_conversation_context,
+    SessionOwnershipError
+)
+from agent_metrics import get_metrics_store
+from admission import get_agent_admission, AdmissionRejected
+from batch.scheduler import PeriodicJob, get_scheduler
+from batch.attendance_shortage import run_shortage_job
+from batch.event_counts import reconcile_event_counts
+from batch.accruals import run_accrual_job
 
 # LlamaIndex imports
 from llama_index.core import VectorStoreIndex, Document, Settings as LlamaSettings
-from llama_index.llms.gemini import Gemini
-from llama_index.embeddings.gemini import GeminiEmbedding
 from llama_index.core.agent import FunctionAgent
 from llama_index.core.tools import FunctionTool
 
 # Smart Agent import
 from smart_agent import SuperSmartAgent
+from llm_cache import SingleFlightLLM
+from llm_guard import build_llm_guard
+from llm_providers import build_llm, build_embed_model
 
 # Tool imports
 from tools.knowledge_tool import search_general_knowledge, search_knowledge_by_category
@@ -97,6 +110,7 @@ logger = logging.getLogger(__name__)
 agent = None
 index = None
 llm = None  # Global LLM instance
+background_tasks = set()  # Strong refs to fire-and-forget tasks (e.g. session compaction)
 
 
 def initialize_llama_index():
@@ -152,23 +166,16 @@ def initialize_llama_index():
         # ============================================================
         # STEP 2: Configure LLM & Embeddings
         # ============================================================
-        logger.info("🤖 STEP 2: Configuring Gemini LLM...")
-        llm = Gemini(
-            api_key=settings.GOOGLE_API_KEY,
-            model_name="models/gemini-2.0-flash-lite",
-            temperature=0.7
-        )
-        logger.info("✅ Gemini LLM configured successfully")
+        logger.info(f"🤖 STEP 2: Configuring LLM (provider: {settings.LLM_PROVIDER})...")
+        llm = build_llm()
+        logger.info("✅ LLM configured successfully")
         
         # ============================================================
         # STEP 3: Configure Embedding Model - Google text-embedding-004
         # ============================================================
-        logger.info("🔢 STEP 3: Setting up Gemini Embedding model...")
-        embed_model = GeminiEmbedding(
-            api_key=settings.GOOGLE_API_KEY,
-            model_name="models/text-embedding-004"
-        )
-        logger.info("✅ Gemini Embedding model configured successfully")
+        logger.info(f"🔢 STEP 3: Setting up embedding model (provider: {settings.EMBEDDING_PROVIDER})...")
+        embed_model = build_embed_model()
+        logger.info("✅ Embedding model configured successfully")
         
         # ============================================================
         # STEP 4: Set global LlamaIndex settings
@@ -319,6 +326,7 @@ def initialize_llama_index():
             Parameters:
             - student_id: The student's UUID (required)
             - event_identifier: Event name OR event UUID (required)
+            - join_waitlist: True to join the waitlist if the event is full (optional, default False)
             
             Examples:
             - register_for_event(student_id="...", event_identifier="Career Guidance Seminar")
@@ -329,6 +337,7 @@ def initialize_llama_index():
             - success: True/False
             - message: Confirmation or error message
             - event_title: Name of the event registered for
+            - waitlisted / waitlist_position: Set when the student was queued instead
             """
         )
         
@@ -371,18 +380,29 @@ def initialize_llama_index():
         # Get query engine for RAG
         query_engine = index.as_query_engine(llm=llm)
         
+        # Identical concurrent prompts share one Gemini call; anonymous
+        # prompts are also served from a short-lived LRU
+        agent_llm = SingleFlightLLM(
+            llm,
+            cache_size=settings.LLM_CACHE_SIZE,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS
+        )
+        
         # Create the super smart agent
         agent = SuperSmartAgent(
-            llm=llm,
+            llm=agent_llm,
             query_engine=query_engine,
-            tools=tools
+            tools=tools,
+            mode=settings.AGENT_MODE,
+            guard=build_llm_guard()
         )
         
         logger.info("✅ Super Smart Agent created with:")
         logger.info(f"   🧠 Advanced reasoning with Gemini LLM")
         logger.info(f"   🛠️  {len(tools)} specialized tools")
         logger.info(f"   📚 RAG knowledge base")
-        logger.info(f"   🎯 Intent analysis & tool orchestration")
+        logger.info(f"   🎯 Intent analysis & tool orchestration ({agent.mode} planning)")
+        logger.info(f"   ⚡ Single-flight LLM with {settings.LLM_CACHE_SIZE}-entry prompt cache")
         
         logger.info("=" * 80)
         logger.info("✅ AI AGENT SYSTEM INITIALIZATION COMPLETE!")
@@ -453,10 +473,41 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize application: {str(e)}")
         raise
     
+    try:
+        get_metrics_store().prune(settings.AGENT_METRICS_RETENTION_DAYS)
+    except Exception as e:
+        logger.warning(f"⚠️  Could not prune agent metrics: {str(e)}")
+    
+    try:
+        get_chat_session_store().prune(settings.CHAT_SESSION_RETENTION_DAYS)
+    except Exception as e:
+        logger.warning(f"⚠️  Could not prune chat sessions: {str(e)}")
+    
+    # Background batch jobs
+    scheduler = get_scheduler()
+    scheduler.add(PeriodicJob(
+        "attendance_shortage",
+        run_shortage_job,
+        interval_seconds=settings.ATTENDANCE_SHORTAGE_JOB_INTERVAL_HOURS * 3600
+    ))
+    scheduler.add(PeriodicJob(
+        "event_count_reconciliation",
+        reconcile_event_counts,
+        interval_seconds=settings.EVENT_COUNT_RECONCILE_INTERVAL_MINUTES * 60
+    ))
+    scheduler.add(PeriodicJob(
+        "late_fee_accrual",
+        run_accrual_job,
+        interval_seconds=settings.ACCRUAL_JOB_INTERVAL_HOURS * 3600,
+        run_at=settings.ACCRUAL_JOB_RUN_AT
+    ))
+    scheduler.start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down BharatAce backend...")
+    await scheduler.stop()
 
 
 # Initialize FastAPI app
@@ -587,6 +638,7 @@ async def get_knowledge_items():
 @app.post("/ask", response_model=Answer, tags=["Chatbot"])
 async def ask_question(
     question: Question,
+    request: Request,
     user: Optional[AuthUser] = Depends(OptionalAuth())
 ):
     """
@@ -595,12 +647,18 @@ async def ask_question(
     This endpoint:
     1. Accepts authenticated or anonymous users
     2. For authenticated students, injects student context into query
-    3. Uses ReAct Agent with 17 specialized tools
-    4. Can answer both general questions and student-specific queries
-    5. Can perform actions (reserve books, register for events)
+    3. Continues a server-side chat session (rolling summary + recent turns)
+    4. Uses ReAct Agent with 17 specialized tools
+    5. Can answer both general questions and student-specific queries
+    6. Can perform actions (reserve books, register for events)
+    
+    Under load, requests are rate limited per student (per IP when anonymous)
+    and queued for a bounded number of agent slots, students first. Overload
+    returns 429/503 with Retry-After instead of waiting on the LLM.
     
     Args:
-        question: The question object containing the user's query
+        question: The question object containing the user's query and session id
+        request: Raw request (client address for anonymous rate limits)
         user: Optional authenticated user (from JWT token)
     
     Returns:
@@ -616,81 +674,49 @@ async def ask_question(
         logger.info("=" * 80)
         logger.info(f"❓ QUESTION RECEIVED: {question.query}")
         
-        # Build personalized query with student context
-        if user and user.student_id:
-            logger.info(f"👤 Authenticated Student: {user.full_name} (ID: {user.student_id})")
-            
-            # Build conversation context if history exists
-            conversation_context = ""
-            if question.conversation_history:
-                logger.info(f"💬 Conversation history: {len(question.conversation_history)} messages")
-                conversation_context = "\n\n=== CONVERSATION HISTORY ===\n"
-                for msg in question.conversation_history[-6:]:  # Last 6 messages (3 exchanges)
-                    role = "Student" if msg.get("role") == "user" else "Assistant"
-                    conversation_context += f"{role}: {msg.get('content', '')}\n"
-                conversation_context += "=== END OF HISTORY ===\n\n"
-            
-            # Inject student context into query
-            personalized_query = f"""Student Information:
-- Name: {user.full_name}
-- Roll Number: {user.roll_number}
-- Student ID: {user.student_id}
-- Semester: {user.student_data.get('semester', 'Unknown')}
-- Department: {user.student_data.get('department', 'Unknown')}
-{conversation_context}
-CURRENT QUESTION: {question.query}
-
-IMPORTANT INSTRUCTIONS:
-1. Read the conversation history carefully to understand the context
-2. This is a FOLLOW-UP question if conversation history exists
-3. The current question likely refers to the topic discussed above
-4. For student-specific queries (attendance, marks, fees, timetable, library), use the student's ID: {user.student_id}
-5. For general queries (events, knowledge), DO NOT pass student_id - these tools don't require it
-6. Provide contextual responses based on what was discussed previously
-7. Be concise and friendly - don't repeat greetings if already in conversation
-
-Example: If the student asked "What's my attendance?" and then asks "how many do I need to get to 90", 
-they are asking about attendance (how many more classes to reach 90%), NOT about marks or CGPA."""
-        else:
-            logger.info("🌍 Anonymous/Admin User - General query")
-            
-            # Build conversation context for anonymous users too
-            conversation_context = ""
-            if question.conversation_history:
-                logger.info(f"💬 Conversation history: {len(question.conversation_history)} messages")
-                conversation_context = "Previous Conversation:\n"
-                for msg in question.conversation_history[-6:]:  # Last 6 messages
-                    role = "User" if msg.get("role") == "user" else "Assistant"
-                    conversation_context += f"{role}: {msg.get('content', '')}\n"
-                conversation_context += f"\nCurrent Question: {question.query}"
-                personalized_query = conversation_context
-            else:
-                personalized_query = question.query
+        owner_id = str(user.student_id) if user and user.student_id else None
+        admission = get_agent_admission()
+        admission.check_rate(owner_id, request.client.host if request.client else None)
         
-        logger.info("=" * 80)
+        # Resolve the server-side chat session (bounded summary + recent turns)
+        session_store = get_chat_session_store()
+        try:
+            session = session_store.get_or_create(question.session_id, owner_id)
+        except SessionOwnershipError:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="This chat session belongs to another user"
+            )
+        session_id = session["session_id"]
+        
+        conversation_context = session_store.build_context(session_id)
+        if not conversation_context and question.conversation_history:
+            # Legacy clients still resend history - keep only the last 3 exchanges
+            logger.info(f"💬 Client-sent history: {len(question.conversation_history)} messages")
+            conversation_context = format_conversation_context("", question.conversation_history[-6:])
         
-        # Query the Super Smart AI Agent
-        logger.info("🤖 Sending query to Super Smart AI Agent...")
+        logger.info(f"💬 Session: {session_id} (context: {len(conversation_context)} chars)")
         
         # Prepare student context if user is authenticated
         student_context = None
         if user and user.student_id:
-            logger.info(f"📋 Preparing student context for: {user.full_name}")
-            logger.info(f"📋 Student ID: {str(user.student_id)} (type: {type(user.student_id).__name__})")
+            logger.info(f"👤 Authenticated Student: {user.full_name} (ID: {user.student_id})")
             student_context = {
                 'id': str(user.student_id),  # Ensure it's a string
                 'full_name': user.full_name,
                 'roll_number': user.roll_number,
                 **user.student_data
             }
-            logger.info(f"📋 Student context prepared: {student_context.get('id', 'NO ID')}")
         else:
-            logger.info("📋 No student context - user is None or has no student_id")
+            logger.info("🌍 Anonymous/Admin User - General query")
         
-        # Query the super smart agent
+        logger.info("=" * 80)
+        
+        # Query the super smart agent with the raw question; conversation
+        # context travels separately so RAG retrieval only sees the question
         logger.info(f"🚀 Calling agent.query() with student_context: {student_context is not None}")
-        # Use personalized_query (includes conversation history) instead of question.query
-        response = await agent.query(personalized_query, student_context)
+        async with admission.slot(owner_id):
+            response = await agent.query(question.query, student_context, conversation_context)
         answer_text = str(response)
         
         logger.info("=" * 80)
@@ -700,8 +726,18 @@ they are asking about attendance (how many more classes to reach 90%), NOT about
         logger.info(f"📊 User Type: {'Student' if user and user.student_id else 'General'}")
         logger.info("=" * 80)
         
-        return Answer(response=answer_text)
+        session_store.append_exchange(session_id, question.query, answer_text)
+        if session_store.needs_compaction(session_id):
+            # Summarize off the request path so the student doesn't wait for it
+            task = asyncio.create_task(session_store.compact(session_id, llm))
+            background_tasks.add(task)
+            task.add_done_callback(background_tasks.discard)
+        
+        return Answer(response=answer_text, session_id=session_id)
         
+    except AdmissionRejected as e:
+        logger.warning(f"🚦 /ask rejected ({e.status_code}): {e.detail}")
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers=e.headers)
     except HTTPException:
         raise
     except Exception as e:
@@ -747,6 +783,10 @@ async def health_check():
     if agent is not None:
         health_status["components"]["ai_agent"] = "operational"
         health_status["components"]["vector_index"] = "operational" if index is not None else "not initialized"
+        health_status["agent_metrics"] = agent.get_metrics()
+        if isinstance(agent.llm, SingleFlightLLM):
+            health_status["llm_cache"] = agent.llm.get_stats()
+        health_status["admission"] = get_agent_admission().get_stats()
     else:
         health_status["components"]["ai_agent"] = "not initialized"
         health_status["status"] = "degraded"
@@ -760,10 +800,12 @@ async def health_check():
 from api.admin_auth import router as admin_auth_router
 from api.admin_dashboard import router as admin_dashboard_router
 from api.admin_routes import router as admin_management_router
+from api.admin_reports import router as admin_reports_router
 
 app.include_router(admin_auth_router)
 app.include_router(admin_dashboard_router)
 app.include_router(admin_management_router)
+app.include_router(admin_reports_router)
 
 # Register student routes
 from api.student_routes import router as student_router
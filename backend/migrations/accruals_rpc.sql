@@ -0,0 +1,59 @@
+-- ============================================================================
+-- LATE FEE AND LIBRARY FINE ACCRUAL
+-- Run this SQL in your Supabase SQL Editor (after database_schema.sql)
+--
+-- The accrual job (batch/accruals.py) computes late fees for every overdue
+-- fee and fines for every overdue loan in one vectorized pass, then hands
+-- the results to apply_accruals() in chunks. Each call is a set-based
+-- UPDATE ... FROM jsonb_to_recordset, so the whole campus is written in a
+-- handful of statements instead of one request per row.
+--
+-- fees.late_fee_accrued_on records the day a late fee was computed, so
+-- readers can tell a current value from a stale one.
+-- ============================================================================
+
+ALTER TABLE fees
+ADD COLUMN IF NOT EXISTS late_fee_accrued_on DATE;
+
+CREATE INDEX IF NOT EXISTS idx_fees_outstanding ON fees(due_date)
+WHERE payment_status IN ('pending', 'partial', 'overdue');
+
+CREATE INDEX IF NOT EXISTS idx_book_loans_open ON book_loans(due_date)
+WHERE loan_status IN ('active', 'overdue');
+
+-- ----------------------------------------------------------------------------
+-- apply_accruals(fees [{id, late_fee}], loans [{id, fine_amount}], accrued_on)
+-- Returns {"fees_updated": n, "loans_updated": n}
+-- ----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION apply_accruals(
+    p_fees JSONB DEFAULT '[]'::jsonb,
+    p_loans JSONB DEFAULT '[]'::jsonb,
+    p_accrued_on DATE DEFAULT CURRENT_DATE
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_fees INTEGER;
+    v_loans INTEGER;
+BEGIN
+    UPDATE fees f
+    SET late_fee = x.late_fee,
+        late_fee_accrued_on = p_accrued_on,
+        payment_status = CASE WHEN f.payment_status = 'pending' THEN 'overdue' ELSE f.payment_status END,
+        updated_at = NOW()
+    FROM jsonb_to_recordset(p_fees) AS x(id UUID, late_fee DECIMAL(10,2))
+    WHERE f.id = x.id AND f.payment_status IN ('pending', 'partial', 'overdue');
+    GET DIAGNOSTICS v_fees = ROW_COUNT;
+
+    -- trigger_calculate_fine derives the same fine from due_date on update
+    UPDATE book_loans l
+    SET fine_amount = x.fine_amount,
+        loan_status = 'overdue'
+    FROM jsonb_to_recordset(p_loans) AS x(id UUID, fine_amount DECIMAL(10,2))
+    WHERE l.id = x.id AND l.loan_status IN ('active', 'overdue');
+    GET DIAGNOSTICS v_loans = ROW_COUNT;
+
+    RETURN jsonb_build_object('fees_updated', v_fees, 'loans_updated', v_loans);
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION apply_accruals(JSONB, JSONB, DATE) TO service_role;
@@ -0,0 +1,73 @@
+-- ============================================================================
+-- MAINTAINED BOOK LOAN COUNTS (popular books)
+-- Run this SQL in your Supabase SQL Editor (after database_schema.sql)
+--
+-- book_loan_daily_counts keeps one counter per (book, issue day). The
+-- trigger below bumps it on every new loan, so popularity never needs a
+-- scan of book_loans. popular_books() sums the counters over any window
+-- (last 30 days, this semester, all time) and returns the top K with the
+-- book details; daily buckets keep that sum small regardless of how many
+-- loans exist.
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS book_loan_daily_counts (
+    book_id UUID REFERENCES library_books(id) ON DELETE CASCADE,
+    loan_date DATE NOT NULL,
+    loan_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (book_id, loan_date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_book_loan_daily_counts_date ON book_loan_daily_counts(loan_date);
+
+ALTER TABLE book_loan_daily_counts ENABLE ROW LEVEL SECURITY;
+
+-- Backfill from existing loans
+INSERT INTO book_loan_daily_counts (book_id, loan_date, loan_count)
+SELECT book_id, issue_date::date, COUNT(*)
+FROM book_loans
+WHERE book_id IS NOT NULL
+GROUP BY book_id, issue_date::date
+ON CONFLICT (book_id, loan_date) DO UPDATE SET loan_count = EXCLUDED.loan_count;
+
+-- Function to count new loans
+CREATE OR REPLACE FUNCTION count_book_loan()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO book_loan_daily_counts (book_id, loan_date, loan_count)
+    VALUES (NEW.book_id, COALESCE(NEW.issue_date, NOW())::date, 1)
+    ON CONFLICT (book_id, loan_date) DO UPDATE
+        SET loan_count = book_loan_daily_counts.loan_count + 1;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_count_book_loan ON book_loans;
+CREATE TRIGGER trigger_count_book_loan
+AFTER INSERT ON book_loans
+FOR EACH ROW
+EXECUTE FUNCTION count_book_loan();
+
+-- ----------------------------------------------------------------------------
+-- popular_books(since, limit): most borrowed books since a date (NULL = all time)
+-- ----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION popular_books(
+    p_since DATE DEFAULT NULL,
+    p_limit INTEGER DEFAULT 10
+)
+RETURNS TABLE (
+    book_id UUID,
+    title VARCHAR,
+    author VARCHAR,
+    category VARCHAR,
+    loan_count BIGINT
+) AS $$
+    SELECT b.id, b.title, b.author, b.category, SUM(c.loan_count) AS loan_count
+    FROM book_loan_daily_counts c
+    JOIN library_books b ON b.id = c.book_id
+    WHERE p_since IS NULL OR c.loan_date >= p_since
+    GROUP BY b.id, b.title, b.author, b.category
+    ORDER BY loan_count DESC, b.title
+    LIMIT p_limit;
+$$ LANGUAGE sql STABLE;
+
+GRANT EXECUTE ON FUNCTION popular_books(DATE, INTEGER) TO service_role;
@@ -0,0 +1,62 @@
+-- ============================================================================
+-- EVENT PARTICIPANT COUNT RECONCILIATION
+-- Run this SQL in your Supabase SQL Editor (after event_registration_rpc.sql)
+--
+-- events.registered_count is maintained by register_for_event() and
+-- cancel_event_registration(). Rows written any other way (seed scripts,
+-- manual edits in the dashboard) can make it drift, so the backend calls
+-- reconcile_event_registered_counts() periodically. Each drifted event is
+-- recounted under its row lock, which the registration functions also
+-- take, so an in-flight registration is never overwritten.
+-- ============================================================================
+
+CREATE INDEX IF NOT EXISTS idx_event_participation_event ON event_participation(event_id);
+
+CREATE OR REPLACE FUNCTION reconcile_event_registered_counts()
+RETURNS JSONB AS $$
+DECLARE
+    v_event RECORD;
+    v_locked RECORD;
+    v_actual INTEGER;
+    v_checked INTEGER;
+    v_corrected JSONB := '[]'::jsonb;
+BEGIN
+    SELECT COUNT(*) INTO v_checked FROM events;
+
+    FOR v_event IN
+        SELECT e.id
+        FROM events e
+        LEFT JOIN (
+            SELECT event_id, COUNT(*) AS actual
+            FROM event_participation
+            WHERE attendance_status <> 'cancelled'
+            GROUP BY event_id
+        ) p ON p.event_id = e.id
+        WHERE e.registered_count <> COALESCE(p.actual, 0)
+    LOOP
+        -- Recount under the row lock; a concurrent register/cancel may have fixed it already
+        SELECT id, title, registered_count INTO v_locked
+        FROM events WHERE id = v_event.id FOR UPDATE;
+        CONTINUE WHEN NOT FOUND;
+
+        SELECT COUNT(*) INTO v_actual
+        FROM event_participation
+        WHERE event_id = v_event.id AND attendance_status <> 'cancelled';
+
+        IF v_locked.registered_count <> v_actual THEN
+            UPDATE events SET registered_count = v_actual WHERE id = v_event.id;
+            v_corrected := v_corrected || jsonb_build_array(jsonb_build_object(
+                'event_id', v_locked.id, 'title', v_locked.title,
+                'stored', v_locked.registered_count, 'actual', v_actual));
+        END IF;
+    END LOOP;
+
+    RETURN jsonb_build_object(
+        'checked', v_checked,
+        'corrected', jsonb_array_length(v_corrected),
+        'events', v_corrected
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION reconcile_event_registered_counts() TO service_role;
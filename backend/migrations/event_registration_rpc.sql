@@ -0,0 +1,218 @@
+-- ============================================================================
+-- ATOMIC EVENT REGISTRATION WITH WAITLIST
+-- Run this SQL in your Supabase SQL Editor (after database_schema.sql)
+--
+-- events.registered_count is a capacity counter. register_for_event()
+-- claims a seat with a single conditional UPDATE, so concurrent
+-- registrations serialize on the event row and can never push the count
+-- past max_participants. The UNIQUE(event_id, student_id) constraint
+-- makes double registration impossible. A full event can optionally
+-- queue the student in event_waitlist; cancel_event_registration() frees
+-- the seat and promotes the oldest waiting student in the same
+-- transaction.
+-- ============================================================================
+
+ALTER TABLE events
+ADD COLUMN IF NOT EXISTS registered_count INTEGER NOT NULL DEFAULT 0;
+
+-- Backfill from existing registrations
+UPDATE events e
+SET registered_count = (
+    SELECT COUNT(*) FROM event_participation p
+    WHERE p.event_id = e.id AND p.attendance_status <> 'cancelled'
+);
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conrelid = 'event_participation'::regclass AND contype = 'u'
+    ) THEN
+        ALTER TABLE event_participation
+        ADD CONSTRAINT event_participation_event_id_student_id_key UNIQUE (event_id, student_id);
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS event_waitlist (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    event_id UUID REFERENCES events(id) ON DELETE CASCADE,
+    student_id UUID REFERENCES students(id) ON DELETE CASCADE,
+    status VARCHAR(20) DEFAULT 'waiting' CHECK (status IN ('waiting', 'promoted', 'cancelled')),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    promoted_at TIMESTAMP WITH TIME ZONE,
+    UNIQUE(event_id, student_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_event_waitlist_queue ON event_waitlist(event_id, created_at) WHERE status = 'waiting';
+
+ALTER TABLE event_waitlist ENABLE ROW LEVEL SECURITY;
+
+-- ----------------------------------------------------------------------------
+-- register_for_event(event, student, join_waitlist)
+-- status: registered | reregistered | already_registered | waitlisted |
+--         full | closed | event_not_found
+-- ----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION register_for_event(
+    p_event_id UUID,
+    p_student_id UUID,
+    p_join_waitlist BOOLEAN DEFAULT FALSE
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_event events%ROWTYPE;
+    v_existing VARCHAR(20);
+    v_count INTEGER;
+    v_registration_id UUID;
+    v_position INTEGER;
+BEGIN
+    SELECT * INTO v_event FROM events WHERE id = p_event_id;
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('success', false, 'status', 'event_not_found', 'message', 'Event not found');
+    END IF;
+
+    IF v_event.event_status IN ('completed', 'cancelled') THEN
+        RETURN jsonb_build_object('success', false, 'status', 'closed',
+            'message', 'Event is ' || v_event.event_status);
+    END IF;
+    IF v_event.registration_deadline IS NOT NULL AND NOW() > v_event.registration_deadline THEN
+        RETURN jsonb_build_object('success', false, 'status', 'closed',
+            'message', 'Registration deadline has passed');
+    END IF;
+
+    SELECT attendance_status INTO v_existing
+    FROM event_participation
+    WHERE event_id = p_event_id AND student_id = p_student_id;
+
+    IF v_existing IS NOT NULL AND v_existing <> 'cancelled' THEN
+        RETURN jsonb_build_object('success', false, 'status', 'already_registered',
+            'message', 'You are already registered for ''' || v_event.title || '''');
+    END IF;
+
+    -- Claim a seat: the row lock serializes contenders, the predicate enforces capacity
+    -- (NULL or a non-positive max_participants means unlimited)
+    UPDATE events
+    SET registered_count = registered_count + 1
+    WHERE id = p_event_id
+      AND (max_participants IS NULL OR max_participants <= 0 OR registered_count < max_participants)
+    RETURNING registered_count INTO v_count;
+
+    IF NOT FOUND THEN
+        IF p_join_waitlist THEN
+            INSERT INTO event_waitlist (event_id, student_id)
+            VALUES (p_event_id, p_student_id)
+            ON CONFLICT (event_id, student_id) DO UPDATE
+                SET status = 'waiting', created_at = NOW(), promoted_at = NULL
+                WHERE event_waitlist.status <> 'waiting';
+
+            SELECT COUNT(*) INTO v_position
+            FROM event_waitlist w
+            WHERE w.event_id = p_event_id AND w.status = 'waiting'
+              AND w.created_at <= (SELECT created_at FROM event_waitlist
+                                   WHERE event_id = p_event_id AND student_id = p_student_id);
+
+            RETURN jsonb_build_object('success', true, 'status', 'waitlisted',
+                'message', '''' || v_event.title || ''' is full. You are #' || v_position || ' on the waitlist.',
+                'waitlist_position', v_position, 'event', to_jsonb(v_event));
+        END IF;
+        RETURN jsonb_build_object('success', false, 'status', 'full', 'message', 'Event is full');
+    END IF;
+
+    INSERT INTO event_participation (event_id, student_id, registration_date, attendance_status)
+    VALUES (p_event_id, p_student_id, NOW(), 'registered')
+    ON CONFLICT (event_id, student_id) DO UPDATE
+        SET attendance_status = 'registered', registration_date = NOW()
+        WHERE event_participation.attendance_status = 'cancelled'
+    RETURNING id INTO v_registration_id;
+
+    IF v_registration_id IS NULL THEN
+        -- A concurrent call registered this student first; give the seat back
+        UPDATE events SET registered_count = registered_count - 1 WHERE id = p_event_id;
+        RETURN jsonb_build_object('success', false, 'status', 'already_registered',
+            'message', 'You are already registered for ''' || v_event.title || '''');
+    END IF;
+
+    UPDATE event_waitlist SET status = 'promoted', promoted_at = NOW()
+    WHERE event_id = p_event_id AND student_id = p_student_id AND status = 'waiting';
+
+    v_event.registered_count := v_count;
+    RETURN jsonb_build_object(
+        'success', true,
+        'status', CASE WHEN v_existing = 'cancelled' THEN 'reregistered' ELSE 'registered' END,
+        'registration_id', v_registration_id,
+        'registered_count', v_count,
+        'event', to_jsonb(v_event)
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- ----------------------------------------------------------------------------
+-- cancel_event_registration(event, student)
+-- status: cancelled | left_waitlist | not_registered | started
+-- ----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION cancel_event_registration(
+    p_event_id UUID,
+    p_student_id UUID
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_event events%ROWTYPE;
+    v_registration_id UUID;
+    v_next event_waitlist%ROWTYPE;
+BEGIN
+    SELECT * INTO v_event FROM events WHERE id = p_event_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('success', false, 'status', 'not_registered',
+            'message', 'No active registration found for this event');
+    END IF;
+
+    IF NOW() >= v_event.start_date THEN
+        RETURN jsonb_build_object('success', false, 'status', 'started',
+            'message', 'Cannot cancel registration. Event has already started or ended.');
+    END IF;
+
+    UPDATE event_participation SET attendance_status = 'cancelled'
+    WHERE event_id = p_event_id AND student_id = p_student_id AND attendance_status = 'registered'
+    RETURNING id INTO v_registration_id;
+
+    IF v_registration_id IS NULL THEN
+        UPDATE event_waitlist SET status = 'cancelled'
+        WHERE event_id = p_event_id AND student_id = p_student_id AND status = 'waiting';
+        IF FOUND THEN
+            RETURN jsonb_build_object('success', true, 'status', 'left_waitlist',
+                'message', 'Removed from the waitlist for ''' || v_event.title || '''',
+                'event_title', v_event.title);
+        END IF;
+        RETURN jsonb_build_object('success', false, 'status', 'not_registered',
+            'message', 'No active registration found for this event');
+    END IF;
+
+    -- Hand the seat to the oldest waiting student, otherwise release it
+    SELECT * INTO v_next
+    FROM event_waitlist
+    WHERE event_id = p_event_id AND status = 'waiting'
+    ORDER BY created_at
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED;
+
+    IF FOUND THEN
+        INSERT INTO event_participation (event_id, student_id, registration_date, attendance_status)
+        VALUES (p_event_id, v_next.student_id, NOW(), 'registered')
+        ON CONFLICT (event_id, student_id) DO UPDATE
+            SET attendance_status = 'registered', registration_date = NOW();
+        UPDATE event_waitlist SET status = 'promoted', promoted_at = NOW() WHERE id = v_next.id;
+    ELSE
+        UPDATE events SET registered_count = GREATEST(registered_count - 1, 0) WHERE id = p_event_id;
+    END IF;
+
+    RETURN jsonb_build_object(
+        'success', true,
+        'status', 'cancelled',
+        'message', 'Registration cancelled for ''' || v_event.title || '''',
+        'event_title', v_event.title,
+        'promoted_student_id', v_next.student_id
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION register_for_event(UUID, UUID, BOOLEAN) TO service_role;
+GRANT EXECUTE ON FUNCTION cancel_event_registration(UUID, UUID) TO service_role;
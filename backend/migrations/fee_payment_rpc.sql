@@ -0,0 +1,119 @@
+-- ============================================================================
+-- ATOMIC, IDEMPOTENT FEE PAYMENTS
+-- Run this SQL in your Supabase SQL Editor (after database_schema.sql)
+--
+-- record_fee_payment() records a payment in one transaction: it locks the
+-- fee row (so concurrent payments for the same fee serialize), returns the
+-- original transaction if the idempotency key was already used (so client
+-- retries never double-count), and appends the fee_transactions row. The
+-- existing trigger_update_fee_status trigger then recomputes amount_paid
+-- and payment_status from the successful transactions.
+--
+-- Because that trigger derives amount_paid from the ledger, payments that
+-- were recorded by bumping fees.amount_paid directly are first backfilled
+-- as opening-balance transactions; otherwise the next payment would drop
+-- them from the total.
+-- ============================================================================
+
+ALTER TABLE fee_transactions
+ADD COLUMN IF NOT EXISTS idempotency_key VARCHAR(100);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_fee_transactions_idempotency_key
+ON fee_transactions(idempotency_key) WHERE idempotency_key IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_fee_transactions_fee ON fee_transactions(fee_id);
+
+-- Backfill payments that exist only in fees.amount_paid
+INSERT INTO fee_transactions (fee_id, student_id, amount, transaction_date, payment_status, remarks)
+SELECT f.id, f.student_id, f.amount_paid - COALESCE(t.paid, 0), f.updated_at, 'success',
+       'Opening balance (recorded before the transaction ledger)'
+FROM fees f
+LEFT JOIN (
+    SELECT fee_id, SUM(amount) AS paid
+    FROM fee_transactions
+    WHERE payment_status = 'success'
+    GROUP BY fee_id
+) t ON t.fee_id = f.id
+WHERE f.amount_paid > COALESCE(t.paid, 0);
+
+-- ----------------------------------------------------------------------------
+-- record_fee_payment(fee, amount, idempotency_key, ...)
+-- status: recorded | duplicate
+-- code (on failure): fee_not_found | invalid_amount | invalid_method | key_conflict |
+--                     duplicate_transaction
+-- ----------------------------------------------------------------------------
+CREATE OR REPLACE FUNCTION record_fee_payment(
+    p_fee_id UUID,
+    p_amount DECIMAL(10,2),
+    p_idempotency_key TEXT DEFAULT NULL,
+    p_payment_method TEXT DEFAULT 'cash',
+    p_payment_date DATE DEFAULT NULL,
+    p_transaction_id TEXT DEFAULT NULL,
+    p_remarks TEXT DEFAULT NULL
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_fee fees%ROWTYPE;
+    v_transaction fee_transactions%ROWTYPE;
+BEGIN
+    -- Serialize payments per fee
+    SELECT * INTO v_fee FROM fees WHERE id = p_fee_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('success', false, 'code', 'fee_not_found',
+            'message', 'Fee record not found');
+    END IF;
+
+    IF p_idempotency_key IS NOT NULL THEN
+        SELECT * INTO v_transaction FROM fee_transactions WHERE idempotency_key = p_idempotency_key;
+        IF FOUND THEN
+            IF v_transaction.fee_id <> p_fee_id OR v_transaction.amount <> p_amount THEN
+                RETURN jsonb_build_object('success', false, 'code', 'key_conflict',
+                    'message', 'Idempotency key was already used for a different payment');
+            END IF;
+            RETURN jsonb_build_object('success', true, 'status', 'duplicate',
+                'fee', to_jsonb(v_fee), 'transaction', to_jsonb(v_transaction));
+        END IF;
+    END IF;
+
+    IF p_amount IS NULL OR p_amount <= 0 THEN
+        RETURN jsonb_build_object('success', false, 'code', 'invalid_amount',
+            'message', 'Payment amount must be positive');
+    END IF;
+    IF p_payment_method IS NOT NULL
+       AND p_payment_method NOT IN ('cash', 'card', 'upi', 'netbanking', 'cheque') THEN
+        RETURN jsonb_build_object('success', false, 'code', 'invalid_method',
+            'message', 'Unsupported payment method: ' || p_payment_method);
+    END IF;
+
+    -- trigger_update_fee_status recomputes amount_paid and payment_status
+    BEGIN
+        INSERT INTO fee_transactions (fee_id, student_id, amount, payment_method, transaction_id,
+                                      transaction_date, payment_status, remarks, idempotency_key)
+        VALUES (p_fee_id, v_fee.student_id, p_amount, p_payment_method, p_transaction_id,
+                COALESCE(p_payment_date::timestamptz, NOW()), 'success', p_remarks, p_idempotency_key)
+        RETURNING * INTO v_transaction;
+    EXCEPTION WHEN unique_violation THEN
+        -- The fee lock does not serialize the same key used on another fee:
+        -- a concurrent call committed this key (or transaction_id) first
+        SELECT * INTO v_transaction FROM fee_transactions
+        WHERE p_idempotency_key IS NOT NULL AND idempotency_key = p_idempotency_key;
+        IF FOUND AND v_transaction.fee_id = p_fee_id AND v_transaction.amount = p_amount THEN
+            SELECT * INTO v_fee FROM fees WHERE id = p_fee_id;
+            RETURN jsonb_build_object('success', true, 'status', 'duplicate',
+                'fee', to_jsonb(v_fee), 'transaction', to_jsonb(v_transaction));
+        ELSIF FOUND THEN
+            RETURN jsonb_build_object('success', false, 'code', 'key_conflict',
+                'message', 'Idempotency key was already used for a different payment');
+        END IF;
+        RETURN jsonb_build_object('success', false, 'code', 'duplicate_transaction',
+            'message', 'Transaction ID ' || p_transaction_id || ' is already recorded');
+    END;
+
+    SELECT * INTO v_fee FROM fees WHERE id = p_fee_id;
+
+    RETURN jsonb_build_object('success', true, 'status', 'recorded',
+        'fee', to_jsonb(v_fee), 'transaction', to_jsonb(v_transaction));
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION record_fee_payment(UUID, DECIMAL, TEXT, TEXT, DATE, TEXT, TEXT) TO service_role;
@@ -0,0 +1,104 @@
+-- ============================================================================
+-- ATOMIC LIBRARY RESERVATION
+-- Run this SQL in your Supabase SQL Editor (after database_schema.sql)
+--
+-- reserve_library_book() does the whole reservation in one transaction:
+-- it locks the student row (so one student's concurrent requests cannot
+-- exceed the loan limit) and the book row (so the last copy cannot be
+-- issued twice), checks every rule, and inserts the loan. The existing
+-- trigger_update_book_availability trigger decrements available_copies
+-- on that insert, so the function never touches the counter itself.
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION reserve_library_book(
+    p_student_id UUID,
+    p_book_title TEXT,
+    p_loan_days INTEGER DEFAULT 14,
+    p_max_active_loans INTEGER DEFAULT 3
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_book library_books%ROWTYPE;
+    v_active_loans INTEGER;
+    v_total_fine DECIMAL(10,2);
+    v_loan book_loans%ROWTYPE;
+BEGIN
+    -- Serialize reservations per student
+    PERFORM 1 FROM students WHERE id = p_student_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('success', false, 'code', 'student_not_found',
+            'message', 'Student not found');
+    END IF;
+
+    -- Best title match, preferring a copy that is on the shelf; the row lock
+    -- makes contending reservations for the same book wait here
+    SELECT * INTO v_book
+    FROM library_books
+    WHERE title ILIKE '%' || p_book_title || '%'
+    ORDER BY (available_copies > 0) DESC, title
+    LIMIT 1
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('success', false, 'code', 'book_not_found',
+            'message', 'Book not found: ' || p_book_title);
+    END IF;
+
+    IF v_book.available_copies <= 0 THEN
+        RETURN jsonb_build_object('success', false, 'code', 'unavailable',
+            'message', 'Book ''' || v_book.title || ''' is currently not available. All copies are issued.');
+    END IF;
+
+    IF EXISTS (
+        SELECT 1 FROM book_loans
+        WHERE student_id = p_student_id AND book_id = v_book.id AND loan_status = 'active'
+    ) THEN
+        RETURN jsonb_build_object('success', false, 'code', 'already_issued',
+            'message', 'You already have this book issued. Please return it before borrowing again.');
+    END IF;
+
+    SELECT COUNT(*) INTO v_active_loans
+    FROM book_loans
+    WHERE student_id = p_student_id AND loan_status = 'active';
+
+    IF v_active_loans >= p_max_active_loans THEN
+        RETURN jsonb_build_object('success', false, 'code', 'loan_limit',
+            'message', 'You have reached the maximum limit of ' || p_max_active_loans
+                || ' books. Please return a book before issuing another.');
+    END IF;
+
+    IF EXISTS (
+        SELECT 1 FROM book_loans
+        WHERE student_id = p_student_id AND (loan_status = 'overdue' OR fine_amount > 0)
+    ) THEN
+        SELECT COALESCE(SUM(fine_amount), 0) INTO v_total_fine
+        FROM book_loans
+        WHERE student_id = p_student_id AND (loan_status = 'overdue' OR fine_amount > 0);
+
+        RETURN jsonb_build_object('success', false, 'code', 'pending_fines',
+            'message', 'Cannot issue new books. You have overdue books or pending fines of ₹'
+                || to_char(v_total_fine, 'FM999999990.00') || '. Please clear them first.');
+    END IF;
+
+    -- trigger_update_book_availability decrements available_copies
+    INSERT INTO book_loans (student_id, book_id, issue_date, due_date, loan_status, fine_amount)
+    VALUES (p_student_id, v_book.id, NOW(), CURRENT_DATE + p_loan_days, 'active', 0)
+    RETURNING * INTO v_loan;
+
+    RETURN jsonb_build_object(
+        'success', true,
+        'message', 'Book ''' || v_book.title || ''' has been successfully issued!',
+        'loan_details', jsonb_build_object(
+            'loan_id', v_loan.id,
+            'book_title', v_book.title,
+            'author', v_book.author,
+            'isbn', v_book.isbn,
+            'issue_date', v_loan.issue_date,
+            'due_date', v_loan.due_date,
+            'loan_period_days', p_loan_days
+        )
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+GRANT EXECUTE ON FUNCTION reserve_library_book(UUID, TEXT, INTEGER, INTEGER) TO service_role;
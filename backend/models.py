@@ -348,16 +348,14 @@ class Question(BaseModel):
     Model for chatbot questions with optional conversation history.
     """
     query: str = Field(..., description="The question to ask the AI assistant", min_length=1)
-    conversation_history: Optional[List[dict]] = Field(None, description="Previous conversation messages for context")
+    session_id: Optional[str] = Field(None, description="Server-side chat session to continue (omit to start a new one)")
+    conversation_history: Optional[List[dict]] = Field(None, description="Deprecated: previous messages, only used when no session_id is sent")
     
     class Config:
         json_schema_extra = {
             "example": {
                 "query": "What undergraduate programs does the university offer?",
-                "conversation_history": [
-                    {"role": "user", "content": "Tell me about your university"},
-                    {"role": "assistant", "content": "BharatAce is a leading institution..."}
-                ]
+                "session_id": "5f0c2a9e-8d1b-4c3e-9a7f-2b6d1e4c8a90"
             }
         }
 
@@ -367,11 +365,13 @@ class Answer(BaseModel):
     Model for chatbot responses.
     """
     response: str = Field(..., description="The AI-generated answer to the question")
+    session_id: Optional[str] = Field(None, description="Chat session id to send with the next question")
     
     class Config:
         json_schema_extra = {
             "example": {
-                "response": "The university offers undergraduate programs in Computer Science, Electronics, and Mechanical Engineering."
+                "response": "The university offers undergraduate programs in Computer Science, Electronics, and Mechanical Engineering.",
+                "session_id": "5f0c2a9e-8d1b-4c3e-9a7f-2b6d1e4c8a90"
             }
         }
 
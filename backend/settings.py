@@ -30,10 +30,85 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 hours for development
+    PASSWORD_HASH_WORKERS: int = 4  # bcrypt threads for async handlers (bcrypt releases the GIL)
     
     # CORS Configuration
     CORS_ORIGINS: list = ["http://localhost:3000", "http://localhost:3001"]
-    
+
+    # LLM / Embedding Providers: "gemini" or "mock" (deterministic local fakes for load tests)
+    LLM_PROVIDER: str = "gemini"
+    EMBEDDING_PROVIDER: str = "gemini"
+    MOCK_LLM_LATENCY_MS: float = 400.0  # Median simulated latency per call
+    MOCK_LLM_LATENCY_SIGMA: float = 0.5  # Log-normal spread (0 = fixed latency)
+    MOCK_LLM_SEED: int = 42
+    MOCK_LLM_PLANS_PATH: Optional[str] = None  # JSON list of {keywords, tool, params} plans
+    MOCK_EMBEDDING_LATENCY_MS: float = 0.0
+
+    # Database Backend: "supabase" (live PostgREST) or "fake" (in-memory stand-in, no network)
+    DATABASE_BACKEND: str = "supabase"
+    FAKE_DB_SEED_PATH: Optional[str] = None  # JSON {table: [rows]} loaded into the fake backend
+
+    # Local Store (SQLite file for server-side runtime data)
+    LOCAL_STORE_PATH: str = "bharatace_local.db"
+
+    # Chat Session Configuration
+    CHAT_RECENT_TURNS: int = 3  # Exchanges always kept verbatim in the prompt
+    CHAT_SUMMARY_EVERY_N_TURNS: int = 4  # Compact once this many extra exchanges pile up
+    CHAT_SUMMARY_MAX_CHARS: int = 1200  # Upper bound on the rolling summary
+    CHAT_MESSAGE_MAX_CHARS: int = 800  # Per-message cap when rendering recent turns
+    CHAT_SESSION_RETENTION_DAYS: int = 30  # Sessions idle longer are pruned at startup
+
+    # Agent Planning Mode: "json" (free-form JSON plan) or "function_calling" (native Gemini tools)
+    AGENT_MODE: str = "json"
+
+    # LLM Prompt Cache (single-flight wrapper around the agent LLM)
+    LLM_CACHE_SIZE: int = 512  # Max cached prompt -> completion entries
+    LLM_CACHE_TTL_SECONDS: float = 300.0  # Anonymous answers can be at most this stale
+
+    # Agent Metrics (per-stage latency/token traces in the local store)
+    AGENT_METRICS_RETENTION_DAYS: int = 30  # Older traces are pruned at startup
+
+    # /ask Admission Control
+    ADMISSION_MAX_CONCURRENT: int = 8  # Agent runs in flight at once
+    ADMISSION_MAX_QUEUE: int = 32  # Requests waiting for a slot before 503
+    ADMISSION_MAX_ANONYMOUS_QUEUE: int = 8  # Anonymous share of the queue
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 10.0  # Max wait for a slot before 503
+    STUDENT_RATE_LIMIT_PER_MINUTE: float = 20.0
+    STUDENT_RATE_LIMIT_BURST: int = 5
+    ANON_RATE_LIMIT_PER_MINUTE: float = 10.0  # Per client IP
+    ANON_RATE_LIMIT_BURST: int = 3
+
+    # LLM Deadlines, Hedging and Circuit Breaker (per agent stage)
+    LLM_INTENT_TIMEOUT_SECONDS: float = 8.0
+    LLM_RETRIEVAL_TIMEOUT_SECONDS: float = 12.0
+    LLM_SYNTHESIS_TIMEOUT_SECONDS: float = 15.0
+    LLM_HEDGE_ENABLED: bool = True  # Fire a duplicate call once a stage passes its p95
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 1.0
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5  # Consecutive failures before failing fast
+    LLM_BREAKER_RESET_SECONDS: float = 30.0
+
+    # Batch Jobs (background scheduler started with the app)
+    ATTENDANCE_SHORTAGE_THRESHOLD: float = 75.0  # Minimum attendance percentage
+    ATTENDANCE_SHORTAGE_JOB_INTERVAL_HOURS: float = 24.0  # Campus-wide at-risk report (0 disables)
+    ACADEMIC_TERM_END_DATE: Optional[str] = None  # YYYY-MM-DD, enables end-of-term projections
+    ACADEMIC_TERM_START_DATE: Optional[str] = None  # YYYY-MM-DD, start of the "semester" popular-books window
+    EVENT_COUNT_RECONCILE_INTERVAL_MINUTES: float = 60.0  # events.registered_count drift check (0 disables)
+    ACCRUAL_JOB_INTERVAL_HOURS: float = 24.0  # Late fee / library fine accrual (0 disables)
+    ACCRUAL_JOB_RUN_AT: Optional[str] = "01:00"  # HH:MM UTC the accrual runs are anchored to
+
+    # Timetable Index (in-memory per-semester schedule for next-class/free-slot lookups)
+    TIMETABLE_INDEX_TTL_SECONDS: float = 900.0  # Rebuild after this long even without writes
+
+    # Event Title Index (in-memory fuzzy name -> event resolver for registrations)
+    EVENT_INDEX_TTL_SECONDS: float = 300.0  # Rebuild after this long even without writes
+    EVENTS_FEED_TTL_SECONDS: float = 300.0  # Upcoming-events snapshot refetch interval
+
+    # Popular Books (cached top-K per window over maintained loan counts)
+    POPULAR_BOOKS_TTL_SECONDS: float = 600.0  # Leaderboard refetch interval
+
+    # Admin Auth
+    ADMIN_CACHE_TTL_SECONDS: float = 60.0  # Cached admin role/permissions; profile updates refresh immediately
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -9,8 +9,36 @@ import logging
 from typing import Dict, List, Any, Optional, Tuple
 from llama_index.core.tools.types import BaseTool
 
+from agent_metrics import (
+    STAGE_INTENT,
+    STAGE_RETRIEVAL,
+    STAGE_SYNTHESIS,
+    STAGE_TOOL,
+    finish_trace,
+    record_token_usage,
+    span,
+    start_trace
+)
+from llm_cache import SingleFlightLLM
+from llm_guard import LLMGuard
+
 logger = logging.getLogger(__name__)
 
+AGENT_MODE_JSON = "json"
+AGENT_MODE_FUNCTION_CALLING = "function_calling"
+
+# The RAG step already answers general-knowledge questions, so a structured
+# call to this tool is turned into requires_rag instead of a second RAG round trip
+KNOWLEDGE_TOOL_NAME = "search_general_knowledge"
+
+FALLBACK_INTENT = {
+    "intent": "General query",
+    "requires_tools": False,
+    "requires_rag": True,
+    "tool_calls": [],
+    "complexity": "simple"
+}
+
 
 class SuperSmartAgent:
     """
@@ -20,14 +48,48 @@ class SuperSmartAgent:
     3. Execute tool calls with proper parameters
     4. Synthesize results into natural responses
     5. Handle multi-step reasoning
+    
+    LLM calls (and retrieval) run under an optional LLMGuard: per-stage
+    deadlines, hedged duplicates past the stage's p95, and a circuit breaker.
+    A guarded failure lands in the same fallbacks as any other LLM error.
+    
+    Two planning modes are supported:
+    - "json": the LLM writes a free-form JSON plan that is parsed with a regex
+    - "function_calling": Gemini's native tool calling returns structured
+      tool selections and arguments
     """
     
-    def __init__(self, llm, query_engine, tools: List[BaseTool]):
+    def __init__(
+        self,
+        llm,
+        query_engine,
+        tools: List[BaseTool],
+        mode: str = AGENT_MODE_JSON,
+        guard: Optional[LLMGuard] = None
+    ):
         self.llm = llm
         self.query_engine = query_engine
+        self.guard = guard
+        self.tool_list = list(tools)
         self.tools = {tool.metadata.name: tool for tool in tools}
         self.tool_descriptions = self._build_tool_descriptions()
         
+        if mode == AGENT_MODE_FUNCTION_CALLING and not hasattr(llm, "achat_with_tools"):
+            logger.warning("⚠️  LLM has no native tool calling - falling back to JSON planning")
+            mode = AGENT_MODE_JSON
+        self.mode = mode
+        
+        # Planning counters - a parse failure means the planning call was wasted
+        self.metrics = {
+            "planning_calls": 0,
+            "planning_errors": 0,
+            "parse_failures": 0,
+            "wasted_llm_calls": 0,
+            "rag_fallbacks": 0,
+            "structured_tool_calls": 0,
+            "invalid_tool_calls": 0
+        }
+        
     def _build_tool_descriptions(self) -> str:
         """Build a description of all available tools"""
         descriptions = []
@@ -36,13 +98,60 @@ class SuperSmartAgent:
             descriptions.append(desc)
         return "\n".join(descriptions)
     
-    async def query(self, query: str, student_context: Optional[Dict] = None) -> str:
+    async def _complete(self, prompt: str, cacheable: bool = False, stage: str = STAGE_SYNTHESIS):
+        """
+        Call the LLM, letting the single-flight wrapper cache the result when
+        the prompt carries nothing personal (no student, no conversation)
+        
+        Under the guard, a hedge attempt goes straight to the wrapped LLM -
+        through the single-flight wrapper it would just join the slow call.
+        """
+        single_flight = isinstance(self.llm, SingleFlightLLM)
+        
+        def attempt(number: int):
+            if single_flight and number == 0:
+                return self.llm.acomplete(prompt, cacheable=cacheable)
+            raw_llm = self.llm.wrapped if single_flight else self.llm
+            return raw_llm.acomplete(prompt)
+        
+        if self.guard is None:
+            return await attempt(0)
+        return await self.guard.run(stage, attempt)
+    
+    async def _guarded(self, stage: str, call, hedge: bool = True):
+        """Run a zero-argument coroutine factory under the guard, if any."""
+        if self.guard is None:
+            return await call()
+        return await self.guard.run(stage, lambda number: call(), hedge=hedge)
+    
+    @staticmethod
+    def _is_cacheable(student_context: Optional[Dict], conversation_context: str) -> bool:
+        return student_context is None and not conversation_context
+    
+    async def query(
+        self,
+        query: str,
+        student_context: Optional[Dict] = None,
+        conversation_context: str = ""
+    ) -> str:
         """
         Main query method that orchestrates the entire process
+        
+        conversation_context is the bounded session block (summary + recent
+        turns); it is shown to intent analysis and synthesis but never sent
+        to RAG retrieval.
+        
+        Every stage is timed into a request trace (see agent_metrics) that
+        feeds the admin dashboard's latency and token figures.
         """
+        trace = start_trace("student" if student_context else "anonymous")
+        success = True
         try:
             # Step 1: Analyze the query and determine intent
-            intent_analysis = await self._analyze_intent(query, student_context)
+            if self.mode == AGENT_MODE_FUNCTION_CALLING:
+                intent_analysis = await self._plan_with_function_calling(query, student_context, conversation_context)
+            else:
+                intent_analysis = await self._analyze_intent(query, student_context, conversation_context)
             logger.info(f"🧠 Intent Analysis: {intent_analysis['intent']}")
             logger.info(f"🔧 Requires Tools: {intent_analysis.get('requires_tools', False)}")
             logger.info(f"📚 Requires RAG: {intent_analysis.get('requires_rag', True)}")
@@ -53,15 +162,24 @@ class SuperSmartAgent:
             tool_results = []
             if intent_analysis.get('requires_tools'):
                 for tool_call in intent_analysis['tool_calls']:
-                    result = await self._execute_tool(tool_call, student_context)
+                    with span(STAGE_TOOL, tool_call.get('tool')):
+                        result = await self._execute_tool(tool_call, student_context)
                     tool_results.append(result)
                     logger.info(f"🔧 Tool executed: {tool_call['tool']} -> {result[:100]}...")
             
             # Step 3: Get RAG response for general knowledge
             rag_response = None
             if intent_analysis.get('requires_rag', True):
-                rag_response = await self.query_engine.aquery(query)
-                logger.info(f"📚 RAG Response: {str(rag_response)[:100]}...")
+                try:
+                    with span(STAGE_RETRIEVAL):
+                        rag_response = await self._guarded(
+                            STAGE_RETRIEVAL,
+                            lambda: self.query_engine.aquery(query),
+                            hedge=False
+                        )
+                    logger.info(f"📚 RAG Response: {str(rag_response)[:100]}...")
+                except Exception as e:
+                    logger.error(f"RAG retrieval error: {str(e)}")
             
             # Step 4: Synthesize final response
             final_response = await self._synthesize_response(
@@ -69,16 +187,25 @@ class SuperSmartAgent:
                 intent_analysis, 
                 tool_results, 
                 rag_response, 
-                student_context
+                student_context,
+                conversation_context
             )
             
             return final_response
             
         except Exception as e:
+            success = False
             logger.error(f"Agent error: {str(e)}")
             return f"I apologize, but I encountered an error while processing your question: {str(e)}"
+        finally:
+            finish_trace(trace, success)
     
-    async def _analyze_intent(self, query: str, student_context: Optional[Dict] = None) -> Dict:
+    async def _analyze_intent(
+        self,
+        query: str,
+        student_context: Optional[Dict] = None,
+        conversation_context: str = ""
+    ) -> Dict:
         """
         Analyze the user's query to determine intent and required tools
         """
@@ -92,13 +219,23 @@ Student Context:
 - Semester: {student_context.get('semester', 'Unknown')}
 - Department: {student_context.get('department', 'Unknown')}
 - CGPA: {student_context.get('cgpa', 'Unknown')}
+"""
+
+        history_info = ""
+        if conversation_context:
+            history_info = f"""
+Conversation So Far:
+{conversation_context}
+
+The user query may be a FOLLOW-UP that refers to the topic above. Example: after
+"What's my attendance?", "how many do I need to get to 90" is about attendance, not marks.
 """
 
         analysis_prompt = f"""
 You are an intelligent query analyzer for a student assistant system. Analyze the following query and determine what actions are needed.
 
 {context_info}
-
+{history_info}
 Available Tools:
 {self.tool_descriptions}
 
@@ -150,35 +287,136 @@ General Knowledge:
 Respond ONLY with valid JSON.
 """
 
+        self.metrics["planning_calls"] += 1
         try:
-            response = await self.llm.acomplete(analysis_prompt)
-            response_text = str(response).strip()
-            
-            # Extract JSON from response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                analysis = json.loads(json_match.group())
-            else:
-                # Fallback analysis
-                analysis = {
-                    "intent": "General query",
-                    "requires_tools": False,
-                    "requires_rag": True,
-                    "tool_calls": [],
-                    "complexity": "simple"
-                }
-                
-            return analysis
-            
+            with span(STAGE_INTENT) as record:
+                response = await self._complete(
+                    analysis_prompt,
+                    cacheable=self._is_cacheable(student_context, conversation_context),
+                    stage=STAGE_INTENT
+                )
+                record_token_usage(record, response, analysis_prompt)
         except Exception as e:
             logger.error(f"Intent analysis error: {str(e)}")
-            return {
-                "intent": "General query",
-                "requires_tools": False,
-                "requires_rag": True,
-                "tool_calls": [],
-                "complexity": "simple"
-            }
+            self.metrics["planning_errors"] += 1
+            self.metrics["rag_fallbacks"] += 1
+            return dict(FALLBACK_INTENT)
+        
+        response_text = str(response).strip()
+        
+        # Extract JSON from response
+        json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+        try:
+            if not json_match:
+                raise ValueError("no JSON object in response")
+            analysis = json.loads(json_match.group())
+            if not isinstance(analysis, dict):
+                raise ValueError("JSON plan is not an object")
+        except ValueError as e:
+            # json.JSONDecodeError is a ValueError too
+            logger.warning(f"⚠️  Intent JSON parse failure ({str(e)}) - falling back to RAG only")
+            self.metrics["parse_failures"] += 1
+            self.metrics["wasted_llm_calls"] += 1
+            self.metrics["rag_fallbacks"] += 1
+            return dict(FALLBACK_INTENT)
+        
+        analysis.setdefault("intent", "General query")
+        analysis.setdefault("tool_calls", [])
+        return analysis
+    
+    async def _plan_with_function_calling(
+        self,
+        query: str,
+        student_context: Optional[Dict] = None,
+        conversation_context: str = ""
+    ) -> Dict:
+        """
+        Plan tool usage with Gemini's native function calling.
+        
+        Returns the same intent dictionary as _analyze_intent, but tool names
+        and arguments come back structured instead of being regex-parsed.
+        """
+        context_info = ""
+        if student_context:
+            context_info = f"""The user is an authenticated student.
+- Name: {student_context.get('full_name', 'Unknown')}
+- Student ID: {student_context.get('id', 'Unknown')}
+- Semester: {student_context.get('semester', 'Unknown')}
+- Department: {student_context.get('department', 'Unknown')}
+Pass this Student ID as student_id to any tool that needs it.
+"""
+        else:
+            context_info = "The user is anonymous - only use tools that do not need a student_id.\n"
+        
+        history_info = ""
+        if conversation_context:
+            history_info = f"""
+Conversation so far (the question may be a follow-up to it):
+{conversation_context}
+"""
+        
+        planning_prompt = f"""You are the planning step of a campus assistant. Decide which tools (if any) are needed
+to answer the question below and call them with the right arguments. Call several tools
+if the question needs several kinds of data. For general college information, call
+{KNOWLEDGE_TOOL_NAME}. Do not answer the question yourself.
+
+{context_info}{history_info}
+Question: {query}
+"""
+        
+        self.metrics["planning_calls"] += 1
+        try:
+            with span(STAGE_INTENT) as record:
+                response = await self._guarded(
+                    STAGE_INTENT,
+                    lambda: self.llm.achat_with_tools(
+                        self.tool_list,
+                        user_msg=planning_prompt,
+                        allow_parallel_tool_calls=True
+                    )
+                )
+                record_token_usage(record, response, planning_prompt)
+            selections = self.llm.get_tool_calls_from_response(response, error_on_no_tool_call=False)
+        except Exception as e:
+            logger.error(f"Function-calling planning error: {str(e)}")
+            self.metrics["planning_errors"] += 1
+            self.metrics["rag_fallbacks"] += 1
+            return dict(FALLBACK_INTENT)
+        
+        tool_calls = []
+        requires_rag = not selections
+        for selection in selections:
+            if selection.tool_name == KNOWLEDGE_TOOL_NAME:
+                requires_rag = True
+                continue
+            if selection.tool_name not in self.tools or not isinstance(selection.tool_kwargs, dict):
+                logger.warning(f"⚠️  Model called unknown tool or bad arguments: {selection.tool_name}")
+                self.metrics["invalid_tool_calls"] += 1
+                continue
+            tool_calls.append({"tool": selection.tool_name, "params": dict(selection.tool_kwargs)})
+        
+        if selections and not tool_calls and not requires_rag:
+            # Every structured call was unusable - the planning call was wasted
+            self.metrics["wasted_llm_calls"] += 1
+            self.metrics["rag_fallbacks"] += 1
+            requires_rag = True
+        
+        self.metrics["structured_tool_calls"] += len(tool_calls)
+        
+        return {
+            "intent": ", ".join(tc["tool"] for tc in tool_calls) or "General query",
+            "requires_tools": bool(tool_calls),
+            "requires_rag": requires_rag,
+            "tool_calls": tool_calls,
+            "complexity": "complex" if len(tool_calls) > 1 else "simple"
+        }
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Planning counters (and guard stats) for the current process."""
+        metrics = {"mode": self.mode, **self.metrics}
+        if self.guard is not None:
+            metrics["llm_guard"] = self.guard.get_stats()
+        return metrics
     
     async def _execute_tool(self, tool_call: Dict, student_context: Optional[Dict] = None) -> str:
         """
@@ -211,7 +449,8 @@ Respond ONLY with valid JSON.
         intent: Dict, 
         tool_results: List[str], 
         rag_response: Any, 
-        student_context: Optional[Dict] = None
+        student_context: Optional[Dict] = None,
+        conversation_context: str = ""
     ) -> str:
         """
         Synthesize all information into a coherent, natural response
@@ -228,11 +467,17 @@ Respond ONLY with valid JSON.
         if rag_response:
             rag_info = f"Knowledge Base: {str(rag_response)}"
         
+        history_info = ""
+        if conversation_context:
+            history_info = f"Conversation So Far:\n{conversation_context}"
+        
         synthesis_prompt = f"""
 You are a helpful student assistant. Create a natural, personalized response based on the following information:
 
 {context_info}
 
+{history_info}
+
 Original Query: "{query}"
 Intent: {intent.get('intent', 'Unknown')}
 
@@ -277,7 +522,13 @@ Response:
 """
 
         try:
-            response = await self.llm.acomplete(synthesis_prompt)
+            with span(STAGE_SYNTHESIS) as record:
+                response = await self._complete(
+                    synthesis_prompt,
+                    cacheable=self._is_cacheable(student_context, conversation_context),
+                    stage=STAGE_SYNTHESIS
+                )
+                record_token_usage(record, response, synthesis_prompt)
             return str(response).strip()
         except Exception as e:
             logger.error(f"Synthesis error: {str(e)}")
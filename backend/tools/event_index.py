@@ -0,0 +1,220 @@
+"""
+Event Title Index
+In-memory fuzzy resolver from event names to upcoming events.
+
+Titles of upcoming events are split into tokens and pg_trgm-style
+trigrams once, with an inverted trigram index for candidate lookup.
+Resolving a name scores only the events sharing a trigram with it, by
+combining per-token similarity (so typos like "hakathon" still match)
+with whole-title trigram similarity, and returns ranked candidates.
+
+The index is rebuilt after EVENT_INDEX_TTL_SECONDS, or immediately when
+event writers call invalidate_event_index(). Events that have started
+since the last build are skipped at query time.
+"""
+
+import logging
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from database import get_supabase_admin
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+# A best match must score at least this much...
+MIN_SCORE = 0.45
+# ...and beat the runner-up by this margin, otherwise the name is ambiguous
+AMBIGUITY_MARGIN = 0.12
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(text: str) -> List[str]:
+    return _WORD.findall((text or "").lower())
+
+
+def _trigrams(token: str) -> FrozenSet[str]:
+    padded = f"  {token} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _dice(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def parse_event_time(value: Any) -> datetime:
+    """Timezone-aware datetime for an event timestamp (ISO string or datetime)."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class _IndexedEvent:
+    __slots__ = ("event", "title", "tokens", "token_grams", "grams", "start")
+
+    def __init__(self, event: Dict[str, Any]):
+        self.event = event
+        self.title = " ".join(_tokens(event.get("title", "")))
+        self.tokens = self.title.split()
+        self.token_grams = [_trigrams(token) for token in self.tokens]
+        self.grams = frozenset().union(*self.token_grams) if self.token_grams else frozenset()
+        self.start = parse_event_time(event["start_date"])
+
+
+class EventTitleIndex:
+    """
+    Token and trigram index over upcoming event titles.
+
+    Args:
+        events: Event rows (id, title, start_date, ...)
+    """
+
+    def __init__(self, events: List[Dict[str, Any]]):
+        self.built_at = time.monotonic()
+        self._entries = [_IndexedEvent(event) for event in events if event.get("title")]
+        self._postings: Dict[str, List[int]] = {}
+        for position, entry in enumerate(self._entries):
+            for gram in entry.grams:
+                self._postings.setdefault(gram, []).append(position)
+
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.built_at
+
+    def upcoming(self, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Indexed events that have not started yet, soonest first."""
+        now = now or datetime.now(timezone.utc)
+        return [entry.event for entry in self._entries if entry.start >= now]
+
+    def _score(self, entry: _IndexedEvent, query: str, query_tokens: List[str],
+               query_token_grams: List[FrozenSet[str]], query_grams: FrozenSet[str]) -> float:
+        if query == entry.title:
+            return 1.0
+
+        # Each query word against its closest title word (exact > prefix > trigram)
+        token_total = 0.0
+        for token, grams in zip(query_tokens, query_token_grams):
+            best = 0.0
+            for title_token, title_grams in zip(entry.tokens, entry.token_grams):
+                if token == title_token:
+                    best = 1.0
+                    break
+                if len(token) >= 3 and title_token.startswith(token):
+                    best = max(best, 0.9)
+                else:
+                    best = max(best, _dice(grams, title_grams))
+            token_total += best
+        token_score = token_total / len(query_tokens)
+
+        score = 0.6 * token_score + 0.4 * _dice(query_grams, entry.grams)
+        if query in entry.title:
+            score = max(score, 0.8 + 0.2 * len(query) / len(entry.title))
+        return score
+
+    def search(self, name: str, limit: int = 5, now: Optional[datetime] = None) -> List[Tuple[float, Dict[str, Any]]]:
+        """
+        Rank upcoming events by how well their title matches `name`.
+
+        Args:
+            name: Event name as the student typed it
+            limit: Maximum number of candidates
+            now: Reference time for "upcoming" (defaults to now)
+
+        Returns:
+            (score, event) pairs, best first, score in [0, 1]
+        """
+        query_tokens = _tokens(name)
+        if not query_tokens:
+            return []
+        query = " ".join(query_tokens)
+        query_token_grams = [_trigrams(token) for token in query_tokens]
+        query_grams = frozenset().union(*query_token_grams)
+
+        candidates = set()
+        for gram in query_grams:
+            candidates.update(self._postings.get(gram, ()))
+
+        now = now or datetime.now(timezone.utc)
+        scored = []
+        for position in candidates:
+            entry = self._entries[position]
+            if entry.start < now:
+                continue
+            score = self._score(entry, query, query_tokens, query_token_grams, query_grams)
+            if score > 0:
+                scored.append((round(score, 4), entry.start, position))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [(score, self._entries[position].event) for score, _, position in scored[:limit]]
+
+    def resolve(self, name: str, limit: int = 5) -> Dict[str, Any]:
+        """
+        Resolve a name to a single event when the match is clear.
+
+        Returns:
+            {"event": event or None, "ambiguous": bool, "candidates": [...]}
+        """
+        ranked = self.search(name, limit=limit)
+        candidates = [
+            {"id": event["id"], "title": event["title"], "start_date": event["start_date"], "score": score}
+            for score, event in ranked
+            if score >= MIN_SCORE
+        ]
+        if not candidates:
+            return {"event": None, "ambiguous": False, "candidates": []}
+        if len(candidates) > 1 and candidates[0]["score"] - candidates[1]["score"] < AMBIGUITY_MARGIN:
+            close = [c for c in candidates if candidates[0]["score"] - c["score"] < AMBIGUITY_MARGIN]
+            return {"event": None, "ambiguous": True, "candidates": close}
+        return {"event": ranked[0][1], "ambiguous": False, "candidates": candidates}
+
+
+PAGE_SIZE = 1000  # PostgREST's default max rows per response
+
+_index: Optional[EventTitleIndex] = None
+_lock = threading.Lock()
+
+
+def _build() -> EventTitleIndex:
+    supabase = get_supabase_admin()
+    now = datetime.now(timezone.utc).isoformat()
+    rows: List[Dict[str, Any]] = []
+    offset = 0
+    while True:
+        page = supabase.table("events")\
+            .select("id, title, event_type, start_date, location, event_status")\
+            .gte("start_date", now)\
+            .order("id")\
+            .range(offset, offset + PAGE_SIZE - 1)\
+            .execute().data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            break
+        offset += PAGE_SIZE
+    rows.sort(key=lambda e: parse_event_time(e["start_date"]))
+    events = [e for e in rows if e.get("event_status") not in ("completed", "cancelled")]
+    logger.info(f"🗂️  Built event title index ({len(events)} upcoming events)")
+    return EventTitleIndex(events)
+
+
+def get_event_index() -> EventTitleIndex:
+    """Get the event title index, building it on first use or once it expires."""
+    global _index
+    index = _index
+    if index is not None and index.age_seconds() < settings.EVENT_INDEX_TTL_SECONDS:
+        return index
+
+    with _lock:
+        if _index is None or _index.age_seconds() >= settings.EVENT_INDEX_TTL_SECONDS:
+            _index = _build()
+        return _index
+
+
+def invalidate_event_index() -> None:
+    """Drop the index after events are created, updated or deleted."""
+    global _index
+    with _lock:
+        _index = None
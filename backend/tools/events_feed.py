@@ -0,0 +1,204 @@
+"""
+Upcoming Events Feed
+Shared in-memory snapshot of upcoming events, pre-bucketed for reads.
+
+Every future event is fetched once (paged past PostgREST's row limit)
+and kept sorted by start time. The
+today / this_week / this_month buckets (relative to now, as
+get_upcoming_events has always defined them) are precomputed for the
+default 30-day window, both for all events and per event_type, so the
+common read is a dictionary lookup.
+
+Buckets only change when an event starts, when an event crosses the
+7- or 30-day horizon, or at midnight UTC. The snapshot records the
+earliest of those moments and re-buckets its cached rows in memory once
+it passes; rows are refetched after EVENTS_FEED_TTL_SECONDS or when
+event writers call invalidate_events_feed().
+
+Returned views are shared between callers and must be treated as read-only.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from database import get_supabase_admin
+from settings import settings
+from .event_index import parse_event_time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DAYS_AHEAD = 30
+WEEK = timedelta(days=7)
+MONTH = timedelta(days=30)
+
+
+def _categorize(events: List[Dict[str, Any]], starts: List[datetime], now: datetime) -> Dict[str, List[Dict[str, Any]]]:
+    categorized = {"today": [], "this_week": [], "this_month": [], "later": []}
+    week_end = now + WEEK
+    month_end = now + MONTH
+    for event, start in zip(events, starts):
+        if start.date() == now.date():
+            categorized["today"].append(event)
+        elif start <= week_end:
+            categorized["this_week"].append(event)
+        elif start <= month_end:
+            categorized["this_month"].append(event)
+        else:
+            categorized["later"].append(event)
+    return categorized
+
+
+def _view(events: List[Dict[str, Any]], starts: List[datetime], now: datetime) -> Dict[str, Any]:
+    return {
+        "events": events,
+        "categorized": _categorize(events, starts, now),
+        "total_events": len(events),
+    }
+
+
+class EventsSnapshot:
+    """
+    Upcoming events sorted by start time, with precomputed default views.
+
+    Args:
+        events: Event rows with start_date on or after the fetch time
+    """
+
+    def __init__(self, events: List[Dict[str, Any]]):
+        self.fetched_at = time.monotonic()
+        pairs = sorted(((parse_event_time(e["start_date"]), e) for e in events), key=lambda p: p[0])
+        self._starts = [start for start, _ in pairs]
+        self._events = [event for _, event in pairs]
+        self._lock = threading.Lock()
+        self._views: Dict[Optional[str], Dict[str, Any]] = {}
+        self._valid_until = datetime.min.replace(tzinfo=timezone.utc)
+
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.fetched_at
+
+    def _window(self, now: datetime, days_ahead: int) -> range:
+        first = bisect.bisect_left(self._starts, now)
+        last = bisect.bisect_right(self._starts, now + timedelta(days=days_ahead))
+        return range(first, last)
+
+    def _next_change(self, now: datetime) -> datetime:
+        """Earliest moment at which any default-window bucket would differ."""
+        # "today" is a calendar day
+        candidates = [datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)]
+        # The next event to start leaves the feed just after its start time
+        position = bisect.bisect_left(self._starts, now)
+        if position < len(self._starts):
+            candidates.append(self._starts[position] + timedelta(microseconds=1))
+        # The next events beyond the 7- and 30-day marks move into this_week / the window
+        for horizon in (WEEK, MONTH):
+            position = bisect.bisect_right(self._starts, now + horizon)
+            if position < len(self._starts):
+                candidates.append(self._starts[position] - horizon)
+        return min(candidates)
+
+    def _rebucket(self, now: datetime) -> None:
+        window = self._window(now, DEFAULT_DAYS_AHEAD)
+        events = self._events[window.start:window.stop]
+        starts = self._starts[window.start:window.stop]
+
+        by_type: Dict[str, tuple] = {}
+        for event, start in zip(events, starts):
+            bucket = by_type.setdefault(event.get("event_type"), ([], []))
+            bucket[0].append(event)
+            bucket[1].append(start)
+
+        views: Dict[Optional[str], Dict[str, Any]] = {None: _view(events, starts, now)}
+        for event_type, (typed_events, typed_starts) in by_type.items():
+            views[event_type] = _view(typed_events, typed_starts, now)
+        self._views = views
+        self._valid_until = self._next_change(now)
+
+    def view(self, event_type: Optional[str] = None, days_ahead: int = DEFAULT_DAYS_AHEAD,
+             now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Upcoming events within `days_ahead`, optionally of one type.
+
+        Args:
+            event_type: Optional event_type filter
+            days_ahead: Look-ahead window in days (30 is precomputed)
+            now: Reference time (defaults to now, UTC)
+
+        Returns:
+            {"events": [...], "categorized": {...}, "total_events": n}
+        """
+        now = now or datetime.now(timezone.utc)
+        if days_ahead != DEFAULT_DAYS_AHEAD:
+            window = self._window(now, days_ahead)
+            pairs = [
+                (self._events[i], self._starts[i]) for i in window
+                if event_type is None or self._events[i].get("event_type") == event_type
+            ]
+            return _view([e for e, _ in pairs], [s for _, s in pairs], now)
+
+        if now >= self._valid_until:
+            with self._lock:
+                if now >= self._valid_until:
+                    self._rebucket(now)
+        views = self._views
+        return views.get(event_type) or _view([], [], now)
+
+
+PAGE_SIZE = 1000  # PostgREST's default max rows per response
+
+_snapshot: Optional[EventsSnapshot] = None
+_lock = threading.Lock()
+
+
+def _fetch() -> EventsSnapshot:
+    supabase = get_supabase_admin()
+    now = datetime.now(timezone.utc).isoformat()
+    rows: List[Dict[str, Any]] = []
+    offset = 0
+    while True:
+        page = supabase.table("events")\
+            .select("*")\
+            .gte("start_date", now)\
+            .order("id")\
+            .range(offset, offset + PAGE_SIZE - 1)\
+            .execute().data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            break
+        offset += PAGE_SIZE
+    logger.info(f"📅 Refreshed upcoming events snapshot ({len(rows)} events)")
+    return EventsSnapshot(rows)
+
+
+def get_events_snapshot() -> EventsSnapshot:
+    """Get the upcoming-events snapshot, refetching on first use or once it expires."""
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.age_seconds() < settings.EVENTS_FEED_TTL_SECONDS:
+        return snapshot
+
+    with _lock:
+        if _snapshot is None or _snapshot.age_seconds() >= settings.EVENTS_FEED_TTL_SECONDS:
+            _snapshot = _fetch()
+        return _snapshot
+
+
+def get_upcoming_feed(days_ahead: int = DEFAULT_DAYS_AHEAD, event_type: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Upcoming events, categorized by date, from the shared snapshot.
+
+    Args:
+        days_ahead: Look-ahead window in days
+        event_type: Optional event_type filter
+    """
+    return get_events_snapshot().view(event_type=event_type or None, days_ahead=days_ahead)
+
+
+def invalidate_events_feed() -> None:
+    """Drop the snapshot after events are created, updated or deleted."""
+    global _snapshot
+    with _lock:
+        _snapshot = None
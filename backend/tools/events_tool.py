@@ -5,8 +5,10 @@ Manages college events, registrations, and participation.
 
 from typing import Dict, Any, List, Optional
 import logging
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from database import get_supabase_admin
+from .event_index import get_event_index
+from .events_feed import get_upcoming_feed, invalidate_events_feed
 import uuid
 
 logger = logging.getLogger(__name__)
@@ -31,69 +33,15 @@ def get_upcoming_events(days_ahead: int = 30, event_type: Optional[str] = None)
         Dictionary containing upcoming events categorized by date
     """
     try:
-        supabase = get_supabase_admin()
-        
-        # Calculate date range with timezone-aware datetime
-        today = datetime.now(timezone.utc).isoformat()
-        future_date = (datetime.now(timezone.utc) + timedelta(days=days_ahead)).isoformat()
+        # Served from the shared snapshot (bucketed once, refreshed on event writes)
+        feed = get_upcoming_feed(days_ahead=days_ahead, event_type=event_type)
         
-        # Build query
-        query = supabase.table("events")\
-            .select("*")\
-            .gte("start_date", today)\
-            .lte("start_date", future_date)\
-            .order("start_date")
-        
-        if event_type:
-            query = query.eq("event_type", event_type)
-        
-        response = query.execute()
-        
-        events = response.data
-        
-        # Categorize events
-        categorized = {
-            "today": [],
-            "this_week": [],
-            "this_month": [],
-            "later": []
-        }
-        
-        # Use timezone-aware datetime to match database format
-        now = datetime.now(timezone.utc)
-        week_end = now + timedelta(days=7)
-        month_end = now + timedelta(days=30)
-        
-        for event in events:
-            # Parse timezone-aware datetime from database
-            event_date_str = event['start_date']
-            if isinstance(event_date_str, str):
-                # Remove 'Z' suffix and add '+00:00' for UTC
-                if event_date_str.endswith('Z'):
-                    event_date_str = event_date_str[:-1] + '+00:00'
-                event_date = datetime.fromisoformat(event_date_str)
-            else:
-                event_date = event_date_str
-            
-            # Ensure event_date is timezone-aware
-            if event_date.tzinfo is None:
-                event_date = event_date.replace(tzinfo=timezone.utc)
-            
-            if event_date.date() == now.date():
-                categorized["today"].append(event)
-            elif event_date <= week_end:
-                categorized["this_week"].append(event)
-            elif event_date <= month_end:
-                categorized["this_month"].append(event)
-            else:
-                categorized["later"].append(event)
-        
-        logger.info(f"Retrieved {len(events)} upcoming events")
+        logger.info(f"Retrieved {feed['total_events']} upcoming events")
         
         return {
-            "events": events,
-            "categorized": categorized,
-            "total_events": len(events),
+            "events": feed['events'],
+            "categorized": feed['categorized'],
+            "total_events": feed['total_events'],
             "success": True
         }
         
@@ -134,13 +82,8 @@ def get_event_details(event_id: str) -> Dict[str, Any]:
         
         event = event_response.data[0]
         
-        # Get participant count
-        participants_response = supabase.table("event_participation")\
-            .select("*")\
-            .eq("event_id", event_id)\
-            .execute()
-        
-        registered_count = len(participants_response.data)
+        # Maintained by register_for_event / cancel_event_registration
+        registered_count = event.get('registered_count') or 0
         max_participants = event.get('max_participants')
         
         # Check registration status
@@ -186,15 +129,21 @@ def get_event_details(event_id: str) -> Dict[str, Any]:
         }
 
 
-def register_for_event(student_id: str, event_id: str) -> Dict[str, Any]:
+def register_for_event(student_id: str, event_id: str, join_waitlist: bool = False) -> Dict[str, Any]:
     """
     Register a student for an event.
     
     This is an ACTION tool - it writes data.
     
+    Registration is one call to the register_for_event() Postgres function
+    (migrations/event_registration_rpc.sql), which claims a seat from the
+    event's registered_count with a capacity-checked update, so a flash
+    crowd can never push an event past max_participants.
+    
     Args:
         student_id: The student's database ID
         event_id: The event's database ID
+        join_waitlist: If the event is full, join its waitlist instead of failing
         
     Returns:
         Dictionary with registration confirmation
@@ -202,65 +151,42 @@ def register_for_event(student_id: str, event_id: str) -> Dict[str, Any]:
     try:
         supabase = get_supabase_admin()
         
-        # Get event details first
-        event_details = get_event_details(event_id)
+        result = supabase.rpc("register_for_event", {
+            "p_event_id": event_id,
+            "p_student_id": student_id,
+            "p_join_waitlist": join_waitlist
+        }).execute().data or {}
         
-        if not event_details['success']:
-            return event_details
+        status = result.get("status")
+        event = result.get("event") or {}
         
-        if not event_details['registration_open']:
+        if status in ("registered", "reregistered"):
+            # The feed snapshot carries registered_count
+            invalidate_events_feed()
+        
+        if status == "reregistered":
             return {
-                "success": False,
-                "message": event_details['registration_message']
+                "success": True,
+                "message": f"Re-registered for '{event['title']}'!",
+                "event_title": event['title'],
+                "event_date": event['start_date']
             }
         
-        event = event_details['event']
-        
-        # Check if already registered
-        existing_registration = supabase.table("event_participation")\
-            .select("*")\
-            .eq("student_id", student_id)\
-            .eq("event_id", event_id)\
-            .execute()
-        
-        if existing_registration.data:
-            registration = existing_registration.data[0]
-            if registration['attendance_status'] == 'cancelled':
-                # Re-activate cancelled registration
-                supabase.table("event_participation")\
-                    .update({"attendance_status": "registered"})\
-                    .eq("id", registration['id'])\
-                    .execute()
-                
-                return {
-                    "success": True,
-                    "message": f"Re-registered for '{event['title']}'!",
-                    "event_title": event['title'],
-                    "event_date": event['start_date']
-                }
-            else:
-                return {
-                    "success": False,
-                    "message": f"You are already registered for '{event['title']}'"
-                }
-        
-        # Create registration
-        registration_data = {
-            "id": str(uuid.uuid4()),
-            "event_id": event_id,
-            "student_id": student_id,
-            "registration_date": datetime.now(timezone.utc).isoformat(),
-            "attendance_status": "registered"
-        }
-        
-        registration_response = supabase.table("event_participation")\
-            .insert(registration_data)\
-            .execute()
+        if status == "waitlisted":
+            logger.info(f"Student {student_id} waitlisted for event {event_id}")
+            return {
+                "success": True,
+                "waitlisted": True,
+                "message": result['message'],
+                "event_title": event.get('title'),
+                "waitlist_position": result['waitlist_position'],
+                "note": "You will be registered automatically if a seat frees up."
+            }
         
-        if not registration_response.data:
+        if status != "registered":
             return {
                 "success": False,
-                "message": "Failed to register for event"
+                "message": result.get("message") or "Failed to register for event"
             }
         
         logger.info(f"Student {student_id} registered for event {event_id}")
@@ -275,7 +201,7 @@ def register_for_event(student_id: str, event_id: str) -> Dict[str, Any]:
                 "location": event['location'],
                 "organizer": event['organizer']
             },
-            "registration_id": registration_data['id'],
+            "registration_id": result['registration_id'],
             "note": "You can view this event in 'My Events' section. No email confirmation is sent - check the app for details."
         }
         
@@ -360,7 +286,10 @@ def get_student_events(student_id: str, include_past: bool = False) -> Dict[str,
 
 def cancel_event_registration(student_id: str, event_id: str) -> Dict[str, Any]:
     """
-    Cancel a student's registration for an event.
+    Cancel a student's registration (or waitlist place) for an event.
+    
+    The freed seat goes to the oldest waitlisted student in the same
+    transaction (cancel_event_registration() Postgres function).
     
     Args:
         student_id: The student's database ID
@@ -372,49 +301,26 @@ def cancel_event_registration(student_id: str, event_id: str) -> Dict[str, Any]:
     try:
         supabase = get_supabase_admin()
         
-        # Find the registration
-        registration_response = supabase.table("event_participation")\
-            .select("*, events(title, start_date)")\
-            .eq("student_id", student_id)\
-            .eq("event_id", event_id)\
-            .eq("attendance_status", "registered")\
-            .execute()
-        
-        if not registration_response.data:
-            return {
-                "success": False,
-                "message": "No active registration found for this event"
-            }
-        
-        registration = registration_response.data[0]
-        event = registration['events']
+        result = supabase.rpc("cancel_event_registration", {
+            "p_event_id": event_id,
+            "p_student_id": student_id
+        }).execute().data or {}
         
-        # Check if event has already started (with timezone-aware comparison)
-        event_date_str = event['start_date']
-        if event_date_str.endswith('Z'):
-            event_date_str = event_date_str[:-1] + '+00:00'
-        event_date = datetime.fromisoformat(event_date_str)
-        if event_date.tzinfo is None:
-            event_date = event_date.replace(tzinfo=timezone.utc)
-        
-        if datetime.now(timezone.utc) >= event_date:
+        if not result.get("success"):
             return {
                 "success": False,
-                "message": "Cannot cancel registration. Event has already started or ended."
+                "message": result.get("message") or "No active registration found for this event"
             }
         
-        # Update registration status
-        supabase.table("event_participation")\
-            .update({"attendance_status": "cancelled"})\
-            .eq("id", registration['id'])\
-            .execute()
-        
         logger.info(f"Student {student_id} cancelled registration for event {event_id}")
+        invalidate_events_feed()
+        if result.get("promoted_student_id"):
+            logger.info(f"Promoted student {result['promoted_student_id']} from the waitlist for event {event_id}")
         
         return {
             "success": True,
-            "message": f"Registration cancelled for '{event['title']}'",
-            "event_title": event['title']
+            "message": result['message'],
+            "event_title": result['event_title']
         }
         
     except Exception as e:
@@ -473,13 +379,14 @@ def search_events(
         }
 
 
-def smart_register_for_event(student_id: str, event_identifier: str) -> Dict[str, Any]:
+def smart_register_for_event(student_id: str, event_identifier: str, join_waitlist: bool = False) -> Dict[str, Any]:
     """
     Smart event registration that handles both event names and UUIDs.
     
     This is a wrapper around register_for_event that automatically:
     1. Accepts either event name (e.g., "Career Guidance Seminar") or UUID
-    2. If it's a name, searches upcoming events to find the matching event
+    2. If it's a name, fuzzy-matches it against the cached upcoming-event
+       titles (typos tolerated; near-ties are reported as ambiguous)
     3. Extracts the UUID and registers the student
     
     This is an ACTION tool - it writes data.
@@ -487,6 +394,7 @@ def smart_register_for_event(student_id: str, event_identifier: str) -> Dict[str
     Args:
         student_id: The student's database ID (UUID)
         event_identifier: Either the event name or event UUID
+        join_waitlist: If the event is full, join its waitlist instead of failing
         
     Returns:
         Dictionary with registration confirmation
@@ -501,58 +409,50 @@ def smart_register_for_event(student_id: str, event_identifier: str) -> Dict[str
             uuid.UUID(event_identifier)
             # It's a valid UUID, use it directly
             logger.info(f"Event identifier is UUID: {event_identifier}")
-            return register_for_event(student_id, event_identifier)
+            return register_for_event(student_id, event_identifier, join_waitlist)
         except ValueError:
             # It's not a UUID, treat as event name
             logger.info(f"Event identifier is name: {event_identifier}")
             pass
         
-        # Get upcoming events
-        upcoming = get_upcoming_events()
+        # Resolve the name against the in-memory title index (no query)
+        index = get_event_index()
+        match = index.resolve(event_identifier)
         
-        if not upcoming['success'] or not upcoming['events']:
+        if match['ambiguous']:
+            # Several events score about the same - ask user to be more specific
+            titles = [c['title'] for c in match['candidates']]
             return {
                 "success": False,
-                "message": "No upcoming events found"
+                "message": f"Multiple events match '{event_identifier}': {', '.join(titles)}. Please be more specific.",
+                "candidates": match['candidates']
             }
         
-        # Find matching event by name (case-insensitive, partial match)
-        event_identifier_lower = event_identifier.lower()
-        matching_events = []
-        
-        for event in upcoming['events']:
-            event_title = event.get('title', '').lower()
-            if event_identifier_lower in event_title or event_title in event_identifier_lower:
-                matching_events.append(event)
-        
-        if not matching_events:
+        if match['event'] is None:
             # Try to provide helpful suggestions
-            available_events = [e.get('title') for e in upcoming['events'][:5]]
+            available_events = [e.get('title') for e in index.upcoming()[:5]]
+            if not available_events:
+                return {
+                    "success": False,
+                    "message": "No upcoming events found"
+                }
             return {
                 "success": False,
                 "message": f"No event found matching '{event_identifier}'. Available events: {', '.join(available_events)}"
             }
         
-        if len(matching_events) > 1:
-            # Multiple matches - ask user to be more specific
-            titles = [e.get('title') for e in matching_events]
-            return {
-                "success": False,
-                "message": f"Multiple events match '{event_identifier}': {', '.join(titles)}. Please be more specific."
-            }
-        
-        # Exactly one match - proceed with registration
-        event = matching_events[0]
+        # One clear match - proceed with registration
+        event = match['event']
         event_id = event['id']
         event_title = event['title']
         
         logger.info(f"Found matching event: '{event_title}' (ID: {event_id})")
         
         # Call the actual registration function
-        result = register_for_event(student_id, event_id)
+        result = register_for_event(student_id, event_id, join_waitlist)
         
         # Enhance the response with clear, accurate information
-        if result.get('success'):
+        if result.get('success') and not result.get('waitlisted'):
             result['event_title'] = event_title
             result['message'] = f"✅ Successfully registered for '{event_title}'! Your registration has been saved in the system."
             result['note'] = "You can view this event in your 'My Events' section."
@@ -11,6 +11,22 @@ from database import get_supabase_admin
 logger = logging.getLogger(__name__)
 
 
+def _late_fee(fee_record: Dict[str, Any], days_overdue: int, outstanding: float, today: date) -> float:
+    """Late fee for an overdue record: the stored value if accrued today, else computed."""
+    if str(fee_record.get('late_fee_accrued_on') or '')[:10] == today.isoformat():
+        # Already priced today by the accrual job (batch/accruals.py)
+        return float(fee_record.get('late_fee') or 0)
+    
+    # Late fee calculation: ₹100 per day for first 7 days, then ₹200 per day
+    if days_overdue <= 7:
+        late_fee = days_overdue * 100
+    else:
+        late_fee = (7 * 100) + ((days_overdue - 7) * 200)
+    
+    # Cap late fee at 20% of outstanding amount
+    return min(late_fee, outstanding * 0.20)
+
+
 def get_student_fee_status(student_id: str, semester: Optional[int] = None) -> Dict[str, Any]:
     """
     Get fee payment status for a student.
@@ -43,7 +59,8 @@ def get_student_fee_status(student_id: str, semester: Optional[int] = None) -> D
                     "total_due": 0.0,
                     "total_paid": 0.0,
                     "balance": 0.0,
-                    "overdue_amount": 0.0
+                    "overdue_amount": 0.0,
+                    "late_fees": 0.0
                 },
                 "message": "No fee records found",
                 "success": True
@@ -59,6 +76,7 @@ def get_student_fee_status(student_id: str, semester: Optional[int] = None) -> D
         # Calculate overdue amount
         today = date.today()
         overdue_amount = 0.0
+        late_fees = 0.0
         overdue_fees = []
         
         for record in records:
@@ -66,11 +84,14 @@ def get_student_fee_status(student_id: str, semester: Optional[int] = None) -> D
                 due_date = datetime.fromisoformat(record['due_date']).date()
                 if due_date < today:
                     outstanding = float(record['total_amount']) - float(record['amount_paid'])
+                    late_fee = _late_fee(record, (today - due_date).days, outstanding, today)
                     overdue_amount += outstanding
+                    late_fees += late_fee
                     overdue_fees.append({
                         "semester": record['semester'],
                         "academic_year": record['academic_year'],
                         "amount": outstanding,
+                        "late_fee": late_fee,
                         "due_date": record['due_date'],
                         "days_overdue": (today - due_date).days
                     })
@@ -84,6 +105,7 @@ def get_student_fee_status(student_id: str, semester: Optional[int] = None) -> D
                 "total_paid": round(total_paid, 2),
                 "balance": round(balance, 2),
                 "overdue_amount": round(overdue_amount, 2),
+                "late_fees": round(late_fees, 2),
                 "payment_percentage": round((total_paid / total_due * 100) if total_due > 0 else 100.0, 2)
             },
             "overdue_fees": overdue_fees,
@@ -192,16 +214,7 @@ def calculate_late_fee(student_id: str, fee_id: str) -> Dict[str, Any]:
         
         days_overdue = (today - due_date).days
         outstanding = float(fee_record['total_amount']) - float(fee_record['amount_paid'])
-        
-        # Late fee calculation: ₹100 per day for first 7 days, then ₹200 per day
-        if days_overdue <= 7:
-            late_fee = days_overdue * 100
-        else:
-            late_fee = (7 * 100) + ((days_overdue - 7) * 200)
-        
-        # Cap late fee at 20% of outstanding amount
-        max_late_fee = outstanding * 0.20
-        late_fee = min(late_fee, max_late_fee)
+        late_fee = _late_fee(fee_record, days_overdue, outstanding, today)
         
         return {
             "late_fee": round(late_fee, 2),
@@ -315,6 +328,7 @@ def check_fee_clearance(student_id: str) -> Dict[str, Any]:
             "balance": balance,
             "has_overdue": has_overdue,
             "overdue_amount": fee_status['summary']['overdue_amount'],
+            "late_fees": fee_status['summary']['late_fees'],
             "message": "All fees cleared" if is_cleared else f"Outstanding balance: ₹{balance:.2f}",
             "eligible_for_exam": is_cleared or balance < 1000.0,  # Allow small balance
             "success": True
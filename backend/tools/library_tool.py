@@ -5,9 +5,9 @@ Manages library books, searches, loans, and reservations.
 
 from typing import Dict, Any, List, Optional
 import logging
-from datetime import datetime, timedelta, date
+from datetime import datetime, date
 from database import get_supabase_admin
-import uuid
+from .popular_books import get_popular_books_board, invalidate_popular_books
 
 logger = logging.getLogger(__name__)
 
@@ -171,12 +171,21 @@ def get_student_book_loans(student_id: str, status: Optional[str] = None) -> Dic
         }
 
 
+LOAN_PERIOD_DAYS = 14
+MAX_ACTIVE_LOANS = 3
+
+
 def reserve_library_book(student_id: str, book_title: str) -> Dict[str, Any]:
     """
     Reserve/issue a library book to a student.
     
     This is an ACTION tool - it writes data, not just reads.
     
+    The whole reservation runs server-side in the reserve_library_book()
+    Postgres function (migrations/library_reservation_rpc.sql): one round
+    trip that locks the student and book rows, checks the loan rules and
+    inserts the loan, so the last copy can never be issued twice.
+    
     Args:
         student_id: The student's database ID
         book_title: Title of the book to reserve
@@ -187,102 +196,28 @@ def reserve_library_book(student_id: str, book_title: str) -> Dict[str, Any]:
     try:
         supabase = get_supabase_admin()
         
-        # Search for the book
-        book_response = supabase.table("library_books")\
-            .select("*")\
-            .ilike("title", f"%{book_title}%")\
-            .execute()
-        
-        if not book_response.data:
-            return {
-                "success": False,
-                "message": f"Book not found: {book_title}"
-            }
-        
-        book = book_response.data[0]
-        
-        # Check if book is available
-        if book['available_copies'] <= 0:
-            return {
-                "success": False,
-                "message": f"Book '{book['title']}' is currently not available. All copies are issued."
-            }
-        
-        # Check if student already has this book
-        existing_loan = supabase.table("book_loans")\
-            .select("*")\
-            .eq("student_id", student_id)\
-            .eq("book_id", book['id'])\
-            .eq("loan_status", "active")\
-            .execute()
-        
-        if existing_loan.data:
-            return {
-                "success": False,
-                "message": f"You already have this book issued. Please return it before borrowing again."
-            }
-        
-        # Check student's current active loans (limit to 3 books)
-        active_loans = supabase.table("book_loans")\
-            .select("*")\
-            .eq("student_id", student_id)\
-            .eq("loan_status", "active")\
-            .execute()
-        
-        if len(active_loans.data) >= 3:
-            return {
-                "success": False,
-                "message": "You have reached the maximum limit of 3 books. Please return a book before issuing another."
-            }
-        
-        # Check for overdue books or unpaid fines
-        overdue_check = supabase.table("book_loans")\
-            .select("*")\
-            .eq("student_id", student_id)\
-            .or_("loan_status.eq.overdue,fine_amount.gt.0")\
-            .execute()
-        
-        if overdue_check.data:
-            total_fine = sum(float(l['fine_amount']) for l in overdue_check.data)
-            return {
-                "success": False,
-                "message": f"Cannot issue new books. You have overdue books or pending fines of ₹{total_fine:.2f}. Please clear them first."
-            }
-        
-        # Create the loan record
-        due_date = (date.today() + timedelta(days=14)).isoformat()  # 14-day loan period
-        
-        loan_data = {
-            "id": str(uuid.uuid4()),
-            "student_id": student_id,
-            "book_id": book['id'],
-            "issue_date": datetime.now().isoformat(),
-            "due_date": due_date,
-            "loan_status": "active",
-            "fine_amount": 0.0
-        }
-        
-        loan_response = supabase.table("book_loans").insert(loan_data).execute()
+        response = supabase.rpc("reserve_library_book", {
+            "p_student_id": student_id,
+            "p_book_title": book_title,
+            "p_loan_days": LOAN_PERIOD_DAYS,
+            "p_max_active_loans": MAX_ACTIVE_LOANS
+        }).execute()
         
-        if not loan_response.data:
+        result = response.data or {}
+        if not result.get("success"):
             return {
                 "success": False,
-                "message": "Failed to create loan record"
+                "message": result.get("message") or "Failed to create loan record"
             }
         
-        logger.info(f"Book '{book['title']}' issued to student {student_id}")
+        logger.info(f"Book '{result['loan_details']['book_title']}' issued to student {student_id}")
+        # The new loan bumps book_loan_daily_counts; returns leave the counts alone
+        invalidate_popular_books()
         
         return {
             "success": True,
-            "message": f"Book '{book['title']}' has been successfully issued!",
-            "loan_details": {
-                "book_title": book['title'],
-                "author": book['author'],
-                "isbn": book['isbn'],
-                "issue_date": loan_data['issue_date'],
-                "due_date": due_date,
-                "loan_period_days": 14
-            }
+            "message": result["message"],
+            "loan_details": result["loan_details"]
         }
         
     except Exception as e:
@@ -361,44 +296,37 @@ def return_book(student_id: str, book_id: str) -> Dict[str, Any]:
         }
 
 
-def get_popular_books(limit: int = 10) -> Dict[str, Any]:
+def get_popular_books(limit: int = 10, window: str = "all_time") -> Dict[str, Any]:
     """
     Get most popular books based on loan history.
     
     Args:
         limit: Number of books to return
+        window: 'last_30_days', 'semester' or 'all_time'
         
     Returns:
         Dictionary with popular books list
     """
     try:
-        supabase = get_supabase_admin()
-        
-        # This is a simplified version - in production, you'd use a proper aggregation query
-        loans_response = supabase.table("book_loans")\
-            .select("book_id, library_books(title, author, category)")\
-            .execute()
-        
-        # Count loans per book
-        book_counts = {}
-        for loan in loans_response.data:
-            book_id = loan['book_id']
-            if book_id not in book_counts:
-                book_counts[book_id] = {
-                    "count": 0,
-                    "book_info": loan['library_books']
+        # Maintained per-book loan counts, served from the cached leaderboard
+        board = get_popular_books_board(window=window, limit=limit)
+        
+        popular = [
+            {
+                "book_id": row['book_id'],
+                "count": row['loan_count'],
+                "book_info": {
+                    "title": row['title'],
+                    "author": row['author'],
+                    "category": row['category']
                 }
-            book_counts[book_id]["count"] += 1
-        
-        # Sort by count
-        popular = sorted(
-            book_counts.values(),
-            key=lambda x: x['count'],
-            reverse=True
-        )[:limit]
+            }
+            for row in board
+        ]
         
         return {
             "popular_books": popular,
+            "window": window,
             "success": True
         }
         
@@ -0,0 +1,93 @@
+"""
+Popular Books Leaderboard
+Cached top-K most borrowed books per time window.
+
+Loan counts are maintained per book and issue day by a trigger on
+book_loans (migrations/book_loan_counts.sql), and popular_books() sums
+them over a window server-side. This module keeps the top TOP_K rows for
+each window in memory and refetches them after POPULAR_BOOKS_TTL_SECONDS,
+so reads are a slice of a cached list.
+
+Windows:
+- last_30_days
+- semester: since ACADEMIC_TERM_START_DATE, or the last SEMESTER_DAYS days
+- all_time
+"""
+
+import logging
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from database import get_supabase_admin
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+TOP_K = 50  # Rows cached per window; larger limits go to the database
+SEMESTER_DAYS = 182  # Semester window when no term start date is configured
+
+WINDOWS = ("last_30_days", "semester", "all_time")
+
+
+def window_start(window: str, today: Optional[date] = None) -> Optional[date]:
+    """First loan date counted by a window (None = all time)."""
+    today = today or date.today()
+    if window == "last_30_days":
+        return today - timedelta(days=30)
+    if window == "semester":
+        if settings.ACADEMIC_TERM_START_DATE:
+            return date.fromisoformat(settings.ACADEMIC_TERM_START_DATE)
+        return today - timedelta(days=SEMESTER_DAYS)
+    if window == "all_time":
+        return None
+    raise ValueError(f"Unknown window '{window}', expected one of {', '.join(WINDOWS)}")
+
+
+def _fetch(window: str, limit: int) -> List[Dict[str, Any]]:
+    since = window_start(window)
+    response = get_supabase_admin().rpc("popular_books", {
+        "p_since": since.isoformat() if since else None,
+        "p_limit": limit,
+    }).execute()
+    return response.data or []
+
+
+_boards: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+_lock = threading.Lock()
+
+
+def get_popular_books_board(window: str = "all_time", limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Most borrowed books in a window, best first.
+
+    Args:
+        window: One of WINDOWS
+        limit: Number of books
+
+    Returns:
+        Rows with book_id, title, author, category, loan_count (shared, read-only)
+    """
+    window_start(window)  # validates the window name
+    if limit > TOP_K:
+        return _fetch(window, limit)
+
+    entry = _boards.get(window)
+    if entry is None or time.monotonic() - entry[0] >= settings.POPULAR_BOOKS_TTL_SECONDS:
+        with _lock:
+            entry = _boards.get(window)
+            if entry is None or time.monotonic() - entry[0] >= settings.POPULAR_BOOKS_TTL_SECONDS:
+                entry = (time.monotonic(), _fetch(window, TOP_K))
+                _boards[window] = entry
+                logger.info(f"📚 Refreshed popular books ({window}, {len(entry[1])} books)")
+    return entry[1][:limit]
+
+
+def invalidate_popular_books(window: Optional[str] = None) -> None:
+    """Drop one window's cached leaderboard (or all of them)."""
+    with _lock:
+        if window is None:
+            _boards.clear()
+        else:
+            _boards.pop(window, None)
@@ -0,0 +1,279 @@
+"""
+Timetable Conflict Detection
+Room and instructor clash checks for timetable writes.
+
+Entries are grouped by (day, room) and (day, instructor) and each group is
+loaded into a static centered interval tree, so validating n entries costs
+O(n log n + k) for k clashes instead of comparing every pair. The same
+trees answer "which rooms are free for this slot" queries.
+
+Times are half-open [start, end): a class ending at 10:00 does not clash
+with one starting at 10:00.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from database import get_supabase_admin
+from .timetable_index import seconds_to_time, time_to_seconds
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+
+Interval = Tuple[int, int, Any]
+
+
+class IntervalTree:
+    """
+    Static centered interval tree over half-open [start, end) intervals.
+
+    Args:
+        intervals: (start, end, payload) triples; empty intervals are ignored
+    """
+
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, intervals: Iterable[Interval]):
+        self._build(sorted((i for i in intervals if i[1] > i[0]), key=lambda i: i[0]))
+
+    def _build(self, intervals: List[Interval]) -> None:
+        self.left: Optional[IntervalTree] = None
+        self.right: Optional[IntervalTree] = None
+        if not intervals:
+            self.center = 0
+            self.by_start: List[Interval] = []
+            self.by_end: List[Interval] = []
+            return
+
+        # Median start keeps the tree balanced; intervals stay start-sorted when partitioned
+        self.center = intervals[len(intervals) // 2][0]
+        left, here, right = [], [], []
+        for interval in intervals:
+            if interval[1] <= self.center:
+                left.append(interval)
+            elif interval[0] > self.center:
+                right.append(interval)
+            else:
+                here.append(interval)
+
+        self.by_start = here
+        self.by_end = sorted(here, key=lambda i: i[1], reverse=True)
+        if left:
+            self.left = IntervalTree.__new__(IntervalTree)
+            self.left._build(left)
+        if right:
+            self.right = IntervalTree.__new__(IntervalTree)
+            self.right._build(right)
+
+    def overlapping(self, start: int, end: int) -> List[Interval]:
+        """Every stored interval that overlaps [start, end)."""
+        found: List[Interval] = []
+        if end <= start:
+            # An empty interval overlaps nothing, just as empty ones are never stored
+            return found
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if end <= node.center:
+                for interval in node.by_start:
+                    if interval[0] >= end:
+                        break
+                    found.append(interval)
+                if node.left:
+                    stack.append(node.left)
+            elif start > node.center:
+                for interval in node.by_end:
+                    if interval[1] <= start:
+                        break
+                    found.append(interval)
+                if node.right:
+                    stack.append(node.right)
+            else:
+                found.extend(node.by_start)
+                if node.left:
+                    stack.append(node.left)
+                if node.right:
+                    stack.append(node.right)
+        return found
+
+
+def _room_key(entry: Dict[str, Any]) -> Optional[str]:
+    room = (entry.get("room_number") or "").strip()
+    return room.lower() or None
+
+
+def _instructor_key(entry: Dict[str, Any]) -> Optional[str]:
+    instructor = (entry.get("instructor_email") or entry.get("instructor_name") or "").strip()
+    return instructor.lower() or None
+
+
+def _normalize(row: Dict[str, Any], subject: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Flatten a timetable row (with optional embedded subject) for clash checks."""
+    subject = subject or row.get("subjects") or {}
+    return {
+        "id": row.get("id"),
+        "subject_id": row.get("subject_id"),
+        "subject_code": subject.get("subject_code"),
+        "instructor_name": subject.get("instructor_name"),
+        "instructor_email": subject.get("instructor_email"),
+        "semester": row.get("semester"),
+        "day_of_week": row["day_of_week"],
+        "start_time": row["start_time"],
+        "end_time": row["end_time"],
+        "room_number": row.get("room_number"),
+        "start": time_to_seconds(row["start_time"]),
+        "end": time_to_seconds(row["end_time"]),
+    }
+
+
+def _summary(entry: Dict[str, Any]) -> Dict[str, Any]:
+    summary = {
+        key: entry.get(key)
+        for key in ("id", "subject_code", "semester", "start_time", "end_time", "room_number", "instructor_name")
+    }
+    if "position" in entry:
+        # Index into the submitted batch, for entries that are not stored yet
+        summary["position"] = entry["position"]
+    return summary
+
+
+def load_timetable_entries(semester: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Fetch current timetable rows with their subject's instructor, fresh from the database.
+
+    Args:
+        semester: Optional semester filter (clashes span semesters, so writes check all)
+    """
+    supabase = get_supabase_admin()
+    entries: List[Dict[str, Any]] = []
+    offset = 0
+    while True:
+        query = supabase.table("timetable")\
+            .select("*, subjects(subject_code, instructor_name, instructor_email)")
+        if semester is not None:
+            query = query.eq("semester", semester)
+        page = query.order("id").range(offset, offset + PAGE_SIZE - 1).execute().data or []
+        entries.extend(_normalize(row) for row in page)
+        if len(page) < PAGE_SIZE:
+            return entries
+        offset += PAGE_SIZE
+
+
+def normalize_new_entries(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Attach each subject's instructor to rows that are about to be inserted.
+
+    Args:
+        rows: Timetable rows as they will be written (subject_id, day_of_week, times, room)
+    """
+    subject_ids = list({row["subject_id"] for row in rows if row.get("subject_id")})
+    subjects: Dict[str, Dict[str, Any]] = {}
+    if subject_ids:
+        response = get_supabase_admin().table("subjects")\
+            .select("id, subject_code, instructor_name, instructor_email")\
+            .in_("id", subject_ids)\
+            .execute()
+        subjects = {subject["id"]: subject for subject in response.data or []}
+
+    entries = []
+    for position, row in enumerate(rows):
+        entry = _normalize(row, subjects.get(row.get("subject_id")))
+        entry["position"] = position
+        entries.append(entry)
+    return entries
+
+
+def find_conflicts(
+    existing: List[Dict[str, Any]],
+    new: Optional[List[Dict[str, Any]]] = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Find room and instructor clashes.
+
+    Args:
+        existing: Normalized entries already in the timetable
+        new: Normalized entries about to be written. When given, only clashes
+            involving at least one new entry are reported; otherwise every
+            clash within `existing` is.
+
+    Returns:
+        {"room": [...], "instructor": [...]}, each clash naming the shared
+        room/instructor, the day, the overlapping window and both entries
+    """
+    candidates = new if new is not None else existing
+    everything = existing + (new or [])
+    # Position in `everything` identifies an entry and lets each pair be reported once
+    is_candidate = [new is None] * len(existing) + [True] * len(new or [])
+
+    report: Dict[str, List[Dict[str, Any]]] = {"room": [], "instructor": []}
+    for kind, key_of in (("room", _room_key), ("instructor", _instructor_key)):
+        groups: Dict[Tuple[int, str], List[Interval]] = {}
+        for position, entry in enumerate(everything):
+            key = key_of(entry)
+            if key is not None:
+                groups.setdefault((entry["day_of_week"], key), []).append((entry["start"], entry["end"], position))
+        trees = {group: IntervalTree(intervals) for group, intervals in groups.items()}
+
+        offset = len(existing) if new is not None else 0
+        for position, entry in enumerate(candidates, start=offset):
+            key = key_of(entry)
+            if key is None:
+                continue
+            for other_start, other_end, other in trees[(entry["day_of_week"], key)].overlapping(entry["start"], entry["end"]):
+                # Skip self, and new/new pairs already reported from the lower position
+                if other == position or (is_candidate[other] and other < position):
+                    continue
+                other_entry = everything[other]
+                shared = entry.get("room_number") if kind == "room" \
+                    else entry.get("instructor_name") or entry.get("instructor_email")
+                report[kind].append({
+                    kind: shared,
+                    "day_of_week": entry["day_of_week"],
+                    "overlap_start": seconds_to_time(max(entry["start"], other_start)),
+                    "overlap_end": seconds_to_time(min(entry["end"], other_end)),
+                    "entry": _summary(entry),
+                    "conflicts_with": _summary(other_entry),
+                })
+
+    logger.info(f"🔎 Checked {len(candidates)} timetable entries: "
+                f"{len(report['room'])} room / {len(report['instructor'])} instructor clashes")
+    return report
+
+
+def find_free_rooms(
+    entries: List[Dict[str, Any]],
+    day_of_week: int,
+    start_time: str,
+    end_time: str,
+    rooms: Optional[Iterable[str]] = None
+) -> Dict[str, List[str]]:
+    """
+    Rooms with no class overlapping a slot.
+
+    Args:
+        entries: Normalized timetable entries
+        day_of_week: 0=Sunday ... 6=Saturday
+        start_time: Slot start ("HH:MM[:SS]")
+        end_time: Slot end
+        rooms: Candidate rooms (defaults to every room used in the timetable,
+            since there is no rooms table)
+
+    Returns:
+        {"free_rooms": [...], "busy_rooms": [...]}, both sorted
+    """
+    names: Dict[str, str] = {}
+    for room in (rooms if rooms is not None else (entry.get("room_number") for entry in entries)):
+        if room and room.strip():
+            names.setdefault(room.strip().lower(), room.strip())
+
+    tree = IntervalTree(
+        (entry["start"], entry["end"], _room_key(entry))
+        for entry in entries
+        if entry["day_of_week"] == day_of_week and _room_key(entry)
+    )
+    busy = {key for _, _, key in tree.overlapping(time_to_seconds(start_time), time_to_seconds(end_time))}
+    return {
+        "free_rooms": sorted(name for key, name in names.items() if key not in busy),
+        "busy_rooms": sorted(name for key, name in names.items() if key in busy),
+    }
@@ -0,0 +1,216 @@
+"""
+Timetable Index
+In-memory weekly timetable per semester for zero-query schedule lookups.
+
+The timetable barely changes during a term, so each semester's rows are
+fetched once and kept as per-day lists sorted by start time (with a
+parallel list of start offsets for bisection). Next-class, day schedule
+and free-slot queries are then answered from memory. An index is rebuilt
+after TIMETABLE_INDEX_TTL_SECONDS, or immediately when the code that
+writes timetable rows calls invalidate_timetable_index().
+"""
+
+import bisect
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from database import get_supabase_admin
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+# day_of_week follows the schema: 0=Sunday, 1=Monday, ..., 6=Saturday
+WEEK_ORDER = [1, 2, 3, 4, 5, 6, 0]
+
+COLLEGE_START = "08:00:00"
+COLLEGE_END = "18:00:00"
+MIN_FREE_SLOT_MINUTES = 30
+
+
+def time_to_seconds(value: str) -> int:
+    """Seconds since midnight for an "HH:MM[:SS]" time string."""
+    parts = [int(float(p)) for p in str(value).split(":")]
+    parts += [0] * (3 - len(parts))
+    return parts[0] * 3600 + parts[1] * 60 + parts[2]
+
+
+def seconds_to_time(value: int) -> str:
+    return f"{value // 3600:02d}:{value % 3600 // 60:02d}:{value % 60:02d}"
+
+
+def _entry(row: Dict[str, Any]) -> Dict[str, Any]:
+    subject = row.get("subjects") or {}
+    return {
+        "id": row.get("id"),
+        "subject_id": row.get("subject_id"),
+        "subject_name": subject.get("subject_name"),
+        "subject_code": subject.get("subject_code"),
+        "instructor": subject.get("instructor_name"),
+        "department": subject.get("department"),
+        "start_time": row["start_time"],
+        "end_time": row["end_time"],
+        "room_number": row.get("room_number"),
+        "session_type": row.get("session_type"),
+        "semester": row.get("semester"),
+    }
+
+
+class TimetableIndex:
+    """
+    Sorted per-day class lists for one semester (or the whole college).
+
+    Args:
+        semester: Semester the rows belong to (None = every semester)
+        rows: Timetable rows with the embedded `subjects` record
+    """
+
+    def __init__(self, semester: Optional[int], rows: List[Dict[str, Any]]):
+        self.semester = semester
+        self.built_at = time.monotonic()
+        self.total_entries = len(rows)
+        self._days: Dict[int, List[Dict[str, Any]]] = {}
+        self._starts: Dict[int, List[int]] = {}
+        self._ends: Dict[int, List[int]] = {}
+        self._free_cache: Dict[Tuple[int, str, str, int], List[Dict[str, Any]]] = {}
+
+        keyed = sorted(
+            ((row["day_of_week"], time_to_seconds(row["start_time"]), time_to_seconds(row["end_time"]), row)
+             for row in rows),
+            key=lambda item: (item[0], item[1])
+        )
+        for day, start, end, row in keyed:
+            self._days.setdefault(day, []).append(_entry(row))
+            self._starts.setdefault(day, []).append(start)
+            self._ends.setdefault(day, []).append(end)
+
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.built_at
+
+    def day(self, day_of_week: int) -> List[Dict[str, Any]]:
+        """Classes on a day, ordered by start time."""
+        return list(self._days.get(day_of_week, ()))
+
+    def week(self, day_names: Dict[int, str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Non-empty days keyed by name, in day_of_week order."""
+        return {day_names.get(day, "Unknown"): list(entries) for day, entries in sorted(self._days.items())}
+
+    def next_class(self, day_of_week: int, seconds: int) -> Optional[Tuple[Dict[str, Any], int, int]]:
+        """
+        First class starting strictly after `seconds` on `day_of_week`,
+        otherwise the first class of the next day that has any.
+
+        Returns:
+            (entry, day_of_week, days_away) or None when the week is empty
+        """
+        starts = self._starts.get(day_of_week)
+        if starts:
+            position = bisect.bisect_right(starts, seconds)
+            if position < len(starts):
+                return self._days[day_of_week][position], day_of_week, 0
+
+        for offset in range(1, 8):
+            day = (day_of_week + offset) % 7
+            if self._days.get(day):
+                return self._days[day][0], day, offset
+        return None
+
+    def free_slots(
+        self,
+        day_of_week: int,
+        start_time: str = COLLEGE_START,
+        end_time: str = COLLEGE_END,
+        min_minutes: int = MIN_FREE_SLOT_MINUTES
+    ) -> List[Dict[str, Any]]:
+        """Gaps of at least `min_minutes` between classes within the given hours."""
+        key = (day_of_week, start_time, end_time, min_minutes)
+        cached = self._free_cache.get(key)
+        if cached is not None:
+            return list(cached)
+
+        cursor = time_to_seconds(start_time)
+        day_end = time_to_seconds(end_time)
+        slots = []
+
+        def add_gap(gap_start: int, gap_end: int) -> None:
+            minutes = (gap_end - gap_start) // 60
+            if minutes >= min_minutes:
+                slots.append({
+                    "start_time": seconds_to_time(gap_start),
+                    "end_time": seconds_to_time(gap_end),
+                    "duration_minutes": minutes
+                })
+
+        for start, end in zip(self._starts.get(day_of_week, ()), self._ends.get(day_of_week, ())):
+            if start >= day_end:
+                break
+            if start > cursor:
+                add_gap(cursor, start)
+            cursor = max(cursor, end)
+        if cursor < day_end:
+            add_gap(cursor, day_end)
+
+        self._free_cache[key] = slots
+        return list(slots)
+
+
+PAGE_SIZE = 1000  # PostgREST's default max rows per response
+
+_indexes: Dict[Optional[int], TimetableIndex] = {}
+_lock = threading.Lock()
+
+
+def _build(semester: Optional[int]) -> TimetableIndex:
+    supabase = get_supabase_admin()
+    rows: List[Dict[str, Any]] = []
+    offset = 0
+    while True:
+        query = supabase.table("timetable")\
+            .select("*, subjects(subject_name, subject_code, instructor_name, department)")
+        if semester is not None:
+            query = query.eq("semester", semester)
+        page = query.order("id").range(offset, offset + PAGE_SIZE - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < PAGE_SIZE:
+            break
+        offset += PAGE_SIZE
+    logger.info(f"🗓️  Built timetable index for semester {semester if semester is not None else 'all'} "
+                f"({len(rows)} entries)")
+    return TimetableIndex(semester, rows)
+
+
+def get_timetable_index(semester: Optional[int] = None) -> TimetableIndex:
+    """
+    Get the index for a semester, building it on first use or once it expires.
+
+    Args:
+        semester: Semester number (None indexes the whole college timetable)
+    """
+    index = _indexes.get(semester)
+    if index is not None and index.age_seconds() < settings.TIMETABLE_INDEX_TTL_SECONDS:
+        return index
+
+    with _lock:
+        index = _indexes.get(semester)
+        if index is None or index.age_seconds() >= settings.TIMETABLE_INDEX_TTL_SECONDS:
+            index = _build(semester)
+            _indexes[semester] = index
+        return index
+
+
+def invalidate_timetable_index(semester: Optional[int] = None) -> None:
+    """
+    Drop cached indexes after timetable rows change.
+
+    Args:
+        semester: Semester whose rows changed (None drops every index).
+            The college-wide index is always dropped, since it contains
+            every semester.
+    """
+    with _lock:
+        if semester is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(semester, None)
+            _indexes.pop(None, None)
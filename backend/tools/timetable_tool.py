@@ -6,6 +6,7 @@ Retrieves college and student-specific timetable information.
 from typing import Dict, Any, List, Optional
 import logging
 from database import get_supabase_admin
+from .timetable_index import WEEK_ORDER, get_timetable_index
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,12 @@ DAYS_MAP = {
     6: "Saturday"
 }
 
+_DAY_NUMBERS = {name.lower(): num for num, name in DAYS_MAP.items()}
+
+
+def _day_number(day: str) -> Optional[int]:
+    return _DAY_NUMBERS.get(day.strip().lower())
+
 
 def get_full_timetable(semester: Optional[int] = None) -> Dict[str, Any]:
     """
@@ -31,53 +38,20 @@ def get_full_timetable(semester: Optional[int] = None) -> Dict[str, Any]:
         Dictionary containing timetable organized by day and time
     """
     try:
-        supabase = get_supabase_admin()
-        
-        # Build query
-        query = supabase.table("timetable")\
-            .select("*, subjects(subject_name, subject_code, instructor_name, department)")\
-            .order("day_of_week")\
-            .order("start_time")
-        
-        if semester:
-            query = query.eq("semester", semester)
+        index = get_timetable_index(semester or None)
         
-        response = query.execute()
-        
-        if not response.data:
+        if not index.total_entries:
             return {
                 "timetable": {},
                 "message": "No timetable found",
                 "success": True
             }
         
-        # Organize by day of week
-        timetable_by_day = {}
-        
-        for entry in response.data:
-            day_num = entry['day_of_week']
-            day_name = DAYS_MAP.get(day_num, "Unknown")
-            
-            if day_name not in timetable_by_day:
-                timetable_by_day[day_name] = []
-            
-            timetable_by_day[day_name].append({
-                "subject_name": entry['subjects']['subject_name'],
-                "subject_code": entry['subjects']['subject_code'],
-                "instructor": entry['subjects']['instructor_name'],
-                "department": entry['subjects']['department'],
-                "start_time": entry['start_time'],
-                "end_time": entry['end_time'],
-                "room_number": entry['room_number'],
-                "session_type": entry['session_type'],
-                "semester": entry['semester']
-            })
-        
-        logger.info(f"Retrieved timetable with {len(response.data)} entries")
+        logger.info(f"Retrieved timetable with {index.total_entries} entries")
         
         return {
-            "timetable": timetable_by_day,
-            "total_entries": len(response.data),
+            "timetable": index.week(DAYS_MAP),
+            "total_entries": index.total_entries,
             "success": True
         }
         
@@ -153,11 +127,7 @@ def get_timetable_for_day(day: str, semester: Optional[int] = None) -> Dict[str,
     """
     try:
         # Convert day name to number
-        day_num = None
-        for num, name in DAYS_MAP.items():
-            if name.lower() == day.lower():
-                day_num = num
-                break
+        day_num = _day_number(day)
         
         if day_num is None:
             return {
@@ -166,30 +136,7 @@ def get_timetable_for_day(day: str, semester: Optional[int] = None) -> Dict[str,
                 "message": f"Invalid day: {day}. Use Monday, Tuesday, etc."
             }
         
-        supabase = get_supabase_admin()
-        
-        query = supabase.table("timetable")\
-            .select("*, subjects(subject_name, subject_code, instructor_name)")\
-            .eq("day_of_week", day_num)\
-            .order("start_time")
-        
-        if semester:
-            query = query.eq("semester", semester)
-        
-        response = query.execute()
-        
-        schedule = []
-        for entry in response.data:
-            schedule.append({
-                "subject_name": entry['subjects']['subject_name'],
-                "subject_code": entry['subjects']['subject_code'],
-                "instructor": entry['subjects']['instructor_name'],
-                "start_time": entry['start_time'],
-                "end_time": entry['end_time'],
-                "room_number": entry['room_number'],
-                "session_type": entry['session_type'],
-                "semester": entry['semester']
-            })
+        schedule = get_timetable_index(semester or None).day(day_num)
         
         return {
             "day": day.capitalize(),
@@ -218,53 +165,47 @@ def get_next_class(student_id: str) -> Dict[str, Any]:
         Dictionary with next class information
     """
     try:
-        from datetime import datetime, time
+        from datetime import datetime
         
-        # Get current day and time
+        # Get current day and time (day_of_week: 0=Sunday, 1=Monday, ...)
         now = datetime.now()
-        current_day = now.weekday() + 1  # Monday = 1, Sunday = 0
-        current_time = now.time()
-        
-        # Get student's timetable
-        timetable_result = get_student_timetable(student_id)
+        current_day = (now.weekday() + 1) % 7
+        current_seconds = now.hour * 3600 + now.minute * 60 + now.second
         
-        if not timetable_result['success']:
-            return timetable_result
+        # Get student's semester
+        supabase = get_supabase_admin()
+        student_response = supabase.table("students")\
+            .select("semester")\
+            .eq("id", student_id)\
+            .execute()
         
-        timetable = timetable_result['timetable']
-        current_day_name = DAYS_MAP.get(current_day, "Unknown")
+        if not student_response.data:
+            return {
+                "next_class": None,
+                "success": False,
+                "message": "Student not found"
+            }
         
-        # Find next class today
-        if current_day_name in timetable:
-            for class_entry in timetable[current_day_name]:
-                class_start = datetime.strptime(class_entry['start_time'], "%H:%M:%S").time()
-                if class_start > current_time:
-                    return {
-                        "next_class": class_entry,
-                        "day": current_day_name,
-                        "is_today": True,
-                        "success": True
-                    }
+        index = get_timetable_index(student_response.data[0]['semester'])
+        found = index.next_class(current_day, current_seconds)
         
-        # If no class today, find next class in upcoming days
-        for day_offset in range(1, 8):
-            next_day_num = (current_day + day_offset) % 7
-            next_day_name = DAYS_MAP.get(next_day_num)
-            
-            if next_day_name in timetable and len(timetable[next_day_name]) > 0:
-                return {
-                    "next_class": timetable[next_day_name][0],
-                    "day": next_day_name,
-                    "is_today": False,
-                    "days_away": day_offset,
-                    "success": True
-                }
+        if found is None:
+            return {
+                "next_class": None,
+                "message": "No upcoming classes found",
+                "success": True
+            }
         
-        return {
-            "next_class": None,
-            "message": "No upcoming classes found",
+        class_entry, day_num, days_away = found
+        result = {
+            "next_class": class_entry,
+            "day": DAYS_MAP.get(day_num, "Unknown"),
+            "is_today": days_away == 0,
             "success": True
         }
+        if days_away:
+            result["days_away"] = days_away
+        return result
         
     except Exception as e:
         logger.error(f"Error getting next class: {str(e)}")
@@ -287,17 +228,18 @@ def find_free_slots(semester: int, day: Optional[str] = None) -> Dict[str, Any]:
         Dictionary with free slots information
     """
     try:
-        # Define college hours (8 AM to 6 PM)
-        college_start = "08:00:00"
-        college_end = "18:00:00"
+        index = get_timetable_index(semester)
         
         if day:
-            timetable_result = get_timetable_for_day(day, semester)
-            if not timetable_result['success']:
-                return timetable_result
+            day_num = _day_number(day)
+            if day_num is None:
+                return {
+                    "free_slots": [],
+                    "success": False,
+                    "message": f"Invalid day: {day}. Use Monday, Tuesday, etc."
+                }
             
-            schedule = timetable_result['schedule']
-            free_slots = calculate_free_slots(schedule, college_start, college_end)
+            free_slots = index.free_slots(day_num)
             
             return {
                 "day": day,
@@ -306,15 +248,11 @@ def find_free_slots(semester: int, day: Optional[str] = None) -> Dict[str, Any]:
                 "success": True
             }
         else:
-            # Get full week timetable
-            full_timetable = get_full_timetable(semester)
-            if not full_timetable['success']:
-                return full_timetable
-            
+            # Days that have classes, as before
             weekly_free_slots = {}
-            for day_name, schedule in full_timetable['timetable'].items():
-                free_slots = calculate_free_slots(schedule, college_start, college_end)
-                weekly_free_slots[day_name] = free_slots
+            for day_num in WEEK_ORDER:
+                if index.day(day_num):
+                    weekly_free_slots[DAYS_MAP[day_num]] = index.free_slots(day_num)
             
             return {
                 "weekly_free_slots": weekly_free_slots,
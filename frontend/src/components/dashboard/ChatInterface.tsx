@@ -20,6 +20,7 @@ export default function ChatInterface() {
   ]);
   const [input, setInput] = useState('');
   const [loading, setLoading] = useState(false);
+  const [sessionId, setSessionId] = useState<string | null>(null);
   const messagesEndRef = useRef<HTMLDivElement>(null);
   const { token, user } = useAuth();
 
@@ -54,22 +55,12 @@ export default function ChatInterface() {
     setLoading(true);
 
     try {
-      // Send conversation history to maintain context
-      const conversationHistory = messages
-        .filter(msg => msg.role !== 'assistant' || !msg.content.includes('Hello! I\'m your AI campus assistant'))
-        .map(msg => ({
-          role: msg.role,
-          content: msg.content
-        }));
-      
-      // Add current user message
-      conversationHistory.push({
-        role: 'user',
-        content: currentInput
-      });
-
-      const response = await apiClient.chat.ask(currentInput, conversationHistory);
+      // Conversation context is kept server-side; just continue the session
+      const response = await apiClient.chat.ask(currentInput, sessionId);
       const data = response.data;
+      if (data.session_id) {
+        setSessionId(data.session_id);
+      }
 
       const assistantMessage: Message = {
         role: 'assistant',
@@ -92,6 +83,7 @@ export default function ChatInterface() {
   };
 
   const handleNewChat = () => {
+    setSessionId(null);
     setMessages([
       {
         role: 'assistant',
@@ -87,8 +87,8 @@ export const apiClient = {
 
   // AI Chat endpoint - For complex questions only
   chat: {
-    ask: (query: string, conversationHistory?: Array<{role: string, content: string}>) => 
-      api.post('/ask', { query, conversation_history: conversationHistory }),
+    ask: (query: string, sessionId?: string | null) => 
+      api.post('/ask', { query, session_id: sessionId || undefined }),
   },
 };
 